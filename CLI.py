@@ -1,6 +1,17 @@
 import argparse
+import glob
+import json
 import os
-from algorithm import compute_rankings
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from implementation.graph_store import load_cached
+from implementation.components import rank_components
+from implementation.pagerank import teleport_vector
+from implementation.profiler import profiling
+from implementation.result_cache import default_cache, rank_key
+from implementation.solvers import SOLVERS
+from implementation.standings import StandingsIndex
 
 
 
@@ -20,47 +31,247 @@ def validate_file(path: str) -> str:
 
     return path
 
-def read_matches(filepath: str) -> list[tuple[str, str]]:
+def expand_inputs(inputs: list[str]) -> list[str]:
     """
-    Зчитує файл вручну без CSV-модуля.
-    Формат кожного рядка: Winner Loser
+    Розгортає шляхи, теки та glob-шаблони (app/data/*.csv) у список CSV-файлів.
     """
-    matches = []
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matched = sorted(glob.glob(os.path.join(item, "*.csv")))
+        elif glob.has_magic(item):
+            matched = sorted(glob.glob(item))
+        else:
+            matched = [validate_file(item)]
+        files.extend(p for p in matched if os.path.isfile(p))
 
-    with open(filepath, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
+    return list(dict.fromkeys(files))
 
-            parts = line.split()
-            if len(parts) != 2:
-                raise ValueError(f"Неправильний формат рядка: '{line}'. ""Очікується: Winner Loser")
+def load_prior(path: str) -> dict[str, float]:
+    """
+    Апріорні ваги команд для телепорту, напр. рейтинг минулого сезону:
+    .json ({team: score} або вихід цього CLI) чи .csv (колонки team, score).
+    """
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            data = {row["team"]: row["score"] for row in data[0]["standings"]}
+        return {str(team): float(score) for team, score in data.items()}
+
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    if {"team", "score"} <= set(df.columns):
+        df = df[["team", "score"]]
+    return {str(team).strip(): float(score)
+            for team, score in zip(df.iloc[:, 0], df.iloc[:, 1])}
+
+def rank_file(path: str, margin: bool = False, half_life: float | None = None,
+              solver: str = "auto", max_iter: int = 1000,
+              time_budget: float | None = None, prior: dict | None = None,
+              use_cache: bool = True) -> dict:
+    """
+    Рахує рейтинг одного файлу (виконується у процесі-воркері).
+    margin/half_life — ваги матчів (див. MatchTable.match_weights),
+    solver/max_iter/time_budget — розв'язувач і його обмеження (див. solvers.rank),
+    prior — апріорні ваги команд для персоналізованого телепорту,
+    use_cache — брати/класти зійдений розв'язок у дисковий кеш результатів.
+    Повертає рейтинг, час завантаження/розв'язку і статистику збіжності.
+    """
+    result = {"file": path}
+    cache = default_cache() if use_cache else None
+    try:
+        start = time.perf_counter()
+        table = load_cached(path)
+        loaded = time.perf_counter()
+        teleport = None if prior is None else teleport_vector(table.teams, prior)
+        key = rank_key(table.fingerprint(), margin, half_life, solver, max_iter, teleport)
+        hit = cache.get(key) if cache is not None else None
+        if hit is not None:
+            scores, stats = hit[0]["scores"], hit[1]
+        else:
+            solution = rank_components(table.graph(margin=margin, half_life=half_life),
+                                       solver=solver, max_iter=max_iter,
+                                       time_budget=time_budget, teleport=teleport)
+            scores = solution.scores
+            stats = {"solver": solution.solver, "iterations": solution.iterations,
+                     "residual": solution.residual, "converged": solution.converged,
+                     "components": solution.components}
+            if cache is not None and solution.converged:
+                cache.put(key, {"scores": scores}, stats)
+        solved = time.perf_counter()
+    except (OSError, ValueError) as e:
+        result["error"] = str(e)
+        return result
+
+    index = StandingsIndex(table.teams, scores)
+    result.update({
+        "num_matches": len(table),
+        "num_teams": table.num_teams,
+        "load_seconds": loaded - start,
+        "solve_seconds": solved - loaded,
+        **stats,
+        "cached": hit is not None,
+        "standings": index.top(len(index)),
+    })
+    return result
+
+def rank_files(files: list[str], workers: int | None = None,
+               margin: bool = False, half_life: float | None = None,
+               solver: str = "auto", max_iter: int = 1000,
+               time_budget: float | None = None, prior: dict | None = None,
+               use_cache: bool = True) -> list[dict]:
+    """Рахує всі файли пулом процесів (по одному інтерпретатору на ядро)."""
+    job = partial(rank_file, margin=margin, half_life=half_life, solver=solver,
+                  max_iter=max_iter, time_budget=time_budget, prior=prior,
+                  use_cache=use_cache)
+    if len(files) == 1 or workers == 1:
+        return [job(path) for path in files]
+
+    chunksize = max(1, len(files) // (4 * (workers or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(job, files, chunksize=chunksize))
 
-            winner, loser = parts
-            matches.append((winner, loser))
+def write_results(results: list[dict], output: str):
+    """
+    Записує зведений рейтинг усіх файлів у .csv, .json або .parquet.
+    """
+    ext = os.path.splitext(output)[1].lower()
+
+    if ext == ".json":
+        payload = []
+        for res in results:
+            item = dict(res)
+            if "standings" in item:
+                item["standings"] = [{"rank": rank, "team": team, "score": score}
+                                     for rank, (team, score) in enumerate(res["standings"], 1)]
+            payload.append(item)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        return
 
-    return matches
+    import pandas as pd
 
+    rows = []
+    for res in results:
+        if "error" in res:
+            continue
+        for rank, (team, score) in enumerate(res["standings"], 1):
+            rows.append((res["file"], rank, team, score, res["num_matches"],
+                         res["load_seconds"], res["solve_seconds"]))
+    df = pd.DataFrame(rows, columns=["file", "rank", "team", "score", "num_matches",
+                                     "load_seconds", "solve_seconds"])
 
-def print_standings(ratings: dict[str, float]):
-    """Красивий вивід результатів."""
-    sorted_items = sorted(ratings.items(), key=lambda x: x[1], reverse=True)
+    if ext == ".csv":
+        df.to_csv(output, index=False)
+    elif ext == ".parquet":
+        df.to_parquet(output, index=False)
+    else:
+        raise ValueError(f"Невідомий формат '{ext}'. Підтримуються .csv, .json, .parquet")
 
+def print_standings(standings: list[tuple[str, float]], limit: int | None = None):
+    """Красивий вивід результатів (standings уже впорядковані, limit — скільки рядків)."""
     print("\n=== FINAL TOURNAMENT STANDINGS ===")
     print(f"{'Team':20} | Rating")
 
-    for team, rating in sorted_items:
+    for team, rating in standings[:limit]:
         print(f"{team:20} | {rating:.4f}")
+    if limit is not None and len(standings) > limit:
+        print(f"... ще {len(standings) - limit} команд (див. --top або -o)")
+
+def print_summary(results: list[dict], wall_seconds: float):
+    """Короткий звіт по кожному файлу з часом обробки."""
+    print(f"\n=== BATCH: {len(results)} files in {wall_seconds:.3f}s ===")
+    for res in results:
+        if "error" in res:
+            print(f"{res['file']}: ПОМИЛКА — {res['error']}")
+            continue
+        leader = res["standings"][0][0] if res["standings"] else "-"
+        print(f"{res['file']}: {res['num_teams']} teams, {res['num_matches']} matches, "
+              f"{res['components']} components, "
+              f"load {res['load_seconds']:.4f}s, solve {res['solve_seconds']:.4f}s "
+              f"({res['solver']}, {res['iterations']} it, residual {res['residual']:.1e}"
+              f"{', cached' if res['cached'] else ''}), "
+              f"leader {leader}")
+        if not res["converged"]:
+            print("  УВАГА: розв'язок не зійшовся в межах --max-iter / --time-budget")
 
 
 def main():
     parser = argparse.ArgumentParser(description="Compute optimized tournament standings.")
-    parser.add_argument("file", type=str,help="Шлях до файлу з результатами матчів")
+    parser.add_argument("files", nargs="+",
+                        help="Файли, теки або glob-шаблони з результатами матчів (напр. app/data/*.csv)")
+    parser.add_argument("-o", "--output", help="Зведений результат: .csv, .json або .parquet")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Кількість процесів (за замовчуванням — кількість ядер)")
+    parser.add_argument("--margin", action="store_true",
+                        help="Брати вагу матчу з третьої колонки CSV (напр. різниця в рахунку)")
+    parser.add_argument("--half-life", type=float, default=None,
+                        help="Згасання ваги старих матчів: вага вдвічі менша кожні N матчів")
+    parser.add_argument("--solver", choices=SOLVERS, default="auto",
+                        help="Метод розв'язку PageRank (за замовчуванням auto)")
+    parser.add_argument("--max-iter", type=int, default=1000,
+                        help="Максимальна кількість ітерацій")
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="Ліміт часу на розв'язок одного файлу, секунди")
+    parser.add_argument("--prior",
+                        help="Апріорний рейтинг (напр. минулого сезону): .csv з team,score або .json")
+    parser.add_argument("--top", type=int, default=None,
+                        help="Скільки перших місць вивести (за замовчуванням усі)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Не використовувати дисковий кеш результатів")
+    parser.add_argument("--profile", nargs="?", const="", metavar="TRACE.json",
+                        help="Вивести профіль (таймери, лічильники); з шляхом — ще й trace-event JSON")
     args = parser.parse_args()
-    matches = read_matches(args.file)
-    ratings = compute_rankings(matches)
-    print_standings(ratings)
+
+    try:
+        files = expand_inputs(args.files)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    if not files:
+        parser.error("Не знайдено жодного CSV-файлу.")
+
+    prior = None
+    if args.prior:
+        try:
+            prior = load_prior(validate_file(args.prior))
+        except (argparse.ArgumentTypeError, OSError, ValueError, KeyError) as e:
+            parser.error(f"Не вдалося прочитати --prior: {e}")
+
+    workers = args.workers
+    if args.profile is not None:
+        # Профайлер бачить лише свій процес, тож файли рахуються тут же
+        workers = 1
+    with profiling(enabled=args.profile is not None) as prof:
+        start = time.perf_counter()
+        results = rank_files(files, workers, args.margin, args.half_life,
+                             args.solver, args.max_iter, args.time_budget, prior,
+                             not args.no_cache)
+        wall_seconds = time.perf_counter() - start
+
+    if args.output:
+        write_results(results, args.output)
+        print(f"Результат записано у {args.output}")
+
+    if len(results) == 1 and not args.output:
+        res = results[0]
+        if "error" in res:
+            parser.error(res["error"])
+        print_standings(res["standings"], args.top)
+        print(f"\nSolver: {res['solver']}, {res['iterations']} iterations, "
+              f"residual {res['residual']:.1e}{' (cached)' if res['cached'] else ''}")
+        if not res["converged"]:
+            print("УВАГА: розв'язок не зійшовся в межах --max-iter / --time-budget")
+    else:
+        print_summary(results, wall_seconds)
+
+    if args.profile is not None:
+        print("\n=== PROFILE ===")
+        print(prof.report())
+        if args.profile:
+            prof.write_trace(args.profile)
+            print(f"Trace-event JSON записано у {args.profile}")
 
 if __name__ == "__main__":
     main()
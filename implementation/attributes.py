@@ -0,0 +1,82 @@
+'''
+Візуальні атрибути кадру: радіус, ярус кольору і позиція кожної команди.
+
+Усі атрибути рахуються з вектора рейтингу кількома numpy-операціями
+на крок (без циклу по командах), а таблиця cos/sin для кола з n команд
+кешується, тож тисячі кадрів з тією самою кількістю команд не рахують
+тригонометрію заново. Спільне для matplotlib (visual.py) і Plotly (dashboard.py).
+'''
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from implementation.standings import StandingsIndex
+
+
+# Розміри вузлів і кола: радіуси min_r..max_r, радіус кола — max(min_ring, n * max_r * spread)
+VisualStyle = namedtuple("VisualStyle", ["min_r", "max_r", "min_ring", "spread"])
+
+FRAME_STYLE = VisualStyle(18, 55, 90, 0.6)
+WEB_STYLE = VisualStyle(15, 50, 100, 0.7)
+
+# Кольори сфер для ярусів StandingsIndex.tiers (верхня, середня, нижня третина)
+TIER_COLORS = (
+    {"inner": "#7DFF7A", "outer": "#1F8A0A"},
+    {"inner": "#FFE66D", "outer": "#E1B800"},
+    {"inner": "#FF4C4C", "outer": "#8A0000"},
+)
+
+
+@lru_cache(maxsize=64)
+def ring_table(n):
+    """(cos, sin) для n рівновіддалених точок кола, починаючи зверху; тільки для читання."""
+    theta = 2 * np.pi * np.arange(n) / n - np.pi / 2
+    table = np.column_stack((np.cos(theta), np.sin(theta)))
+    table.flags.writeable = False
+    return table
+
+
+def scale_radii(scores, min_r, max_r):
+    """Радіус min_r..max_r за коренем нормованого рейтингу (рівні рейтинги — середина)."""
+    scores = np.asarray(scores, dtype=np.float64)
+    if len(scores) == 0:
+        return np.zeros(0)
+    lo, span = scores.min(), np.ptp(scores)
+    norm = (scores - lo) / span if span > 0 else np.full(len(scores), 0.5)
+    return min_r + np.sqrt(norm) * (max_r - min_r)
+
+
+def ring_positions(order, max_radius, min_ring, spread):
+    """Координати (n, 2): команда order[k] — k-та точка кола (лідер зверху)."""
+    n = len(order)
+    positions = np.zeros((n, 2))
+    if n > 1:
+        positions[order] = max(min_ring, n * max_radius * spread) * ring_table(n)
+    return positions
+
+
+class VisualAttributes:
+    """
+    Атрибути всіх команд одного кадру, вирівняні з вектором scores:
+    radii, tiers (індекс у TIER_COLORS), positions (n, 2), order — від лідера.
+    """
+
+    __slots__ = ("scores", "order", "radii", "tiers", "positions")
+
+    def __init__(self, scores, style=FRAME_STYLE, standings=None):
+        if standings is None:
+            standings = StandingsIndex(None, scores)
+        self.scores = standings.scores
+        self.order = standings.order
+        self.tiers = standings.tiers
+        self.radii = scale_radii(self.scores, style.min_r, style.max_r)
+        max_radius = self.radii.max() if len(self.radii) else style.max_r
+        self.positions = ring_positions(self.order, max_radius, style.min_ring, style.spread)
+
+    def __len__(self):
+        return len(self.scores)
+
+    def colors(self):
+        """Кольори сфер для кожної команди (спільні словники з TIER_COLORS)."""
+        return [TIER_COLORS[t] for t in self.tiers.tolist()]
@@ -0,0 +1,306 @@
+'''
+Бенчмарки рейтингу, розкладки та рендеру на синтетичних турнірах.
+
+Запуск:
+    python -m implementation.benchmark -o bench.json
+    python -m implementation.benchmark --sizes 10 1000 100000 --baseline old.json
+
+Для кожного генератора (implementation.generators) і розміру вимірюються
+етапи: зчитування CSV, .tgraph-кеш, побудова графа, PageRank (цілим графом
+і по компонентах), розсування вузлів, рендер кадру та фігура веб-дашборду.
+Результат — JSON, який можна порівняти з попереднім запуском (--baseline),
+щоб ловити регресії.
+'''
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+from implementation.components import rank_components
+from implementation.generators import GENERATORS, generate, write_csv
+from implementation.graph_store import load_cached
+from implementation.loader import load_matches
+from implementation.pagerank import aggregate_edges, power_iteration
+from implementation.solvers import rank
+
+
+DEFAULT_SIZES = [10, 100, 1000, 10_000, 100_000, 1_000_000]
+
+# Генератори з квадратичною кількістю матчів мають власну межу
+GENERATOR_LIMITS = {"round_robin": 3000}
+
+# Повтори вимірювання припиняються, коли один прогін довший за це
+SLOW_RUN_SECONDS = 5.0
+
+
+def _ingest(table, workdir):
+    path = os.path.join(workdir, "matches.csv")
+    write_csv(table, path)
+    return lambda: load_matches(path), {}
+
+
+def _cached(table, workdir):
+    path = os.path.join(workdir, "matches.csv")
+    if not os.path.exists(path):
+        write_csv(table, path)
+    load_cached(path)
+    return lambda: load_cached(path), {}
+
+
+def _graph(table, workdir):
+    return table.graph, {}
+
+
+def _pagerank(table, workdir):
+    graph = table.graph()
+    result = rank(graph)
+    info = {"edges": graph.num_edges, "solver": result.solver,
+            "iterations": result.iterations, "residual": result.residual}
+    return lambda: rank(graph), info
+
+
+def _components(table, workdir):
+    graph = table.graph()
+    result = rank_components(graph)
+    info = {"components": result.components, "solver": result.solver,
+            "iterations": result.iterations, "residual": result.residual}
+    return lambda: rank_components(graph), info
+
+
+def _final_scene(table):
+    """Рейтинг, радіуси і координати кінцевого стану, як у visual.py."""
+    from implementation.visual import compute_radii, get_circular_positions
+
+    scores = dict(zip(table.teams, power_iteration(table.graph())[0].tolist()))
+    radii = compute_radii(scores)
+    return scores, radii, get_circular_positions(scores, radii)
+
+
+def _layout(table, workdir):
+    from implementation.layout import resolve_overlaps
+
+    _, radii, coords = _final_scene(table)
+    pos = np.array(list(coords.values()))
+    r = np.array([radii[t] for t in coords])
+    _, iterations = resolve_overlaps(pos, r)
+    return lambda: resolve_overlaps(pos, r), {"iterations": iterations}
+
+
+def _render(table, workdir):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from implementation.visual import draw_frame, resolve_collisions
+
+    scores, radii, coords = _final_scene(table)
+    coords = resolve_collisions(coords, radii)
+    history = list(table.pairs())
+
+    def run():
+        fig = Figure(figsize=(16, 9), dpi=100)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        draw_frame(ax, scores, history, coords, radii, len(history),
+                   is_final_static=True, match_num=len(history), fast=True)
+        buf = io.BytesIO()
+        with warnings.catch_warnings():
+            # Емодзі в підписах відсутні у шрифті за замовчуванням
+            warnings.simplefilter("ignore", UserWarning)
+            fig.savefig(buf, format="png", facecolor=fig.get_facecolor())
+        return buf
+
+    run()  # прогрів: кеш шрифтів і спрайтів
+    return run, {}
+
+
+def _web(table, workdir):
+    from implementation.attributes import WEB_STYLE, VisualAttributes
+    from implementation.dashboard import create_stylish_graph
+    from implementation.standings import StandingsIndex
+
+    scores = dict(zip(table.teams, power_iteration(table.graph())[0].tolist()))
+    names = np.array(table.teams, dtype=object)
+
+    def run():
+        # Те саме, що web_app.py робить на кожному кроці слайдера
+        standings = StandingsIndex.from_dict(scores)
+        attrs = VisualAttributes(standings.scores, WEB_STYLE, standings)
+        e_w, e_l, counts = aggregate_edges(table.winners, table.losers, table.num_teams)
+        fig = create_stylish_graph(scores, (names[e_w], names[e_l], counts), attrs.positions,
+                                   attrs.radii, label_top_k=20, max_nodes=1000, max_edges=5000)
+        return fig.to_json()
+
+    run()  # прогрів: шаблон plotly_dark завантажується при першому виклику
+    return run, {}
+
+
+# Етап: (підготовка, межа за кількістю команд, межа за кількістю матчів)
+STAGES = {
+    "ingest": (_ingest, None, 5_000_000),
+    "cached": (_cached, None, 5_000_000),
+    "graph": (_graph, None, 20_000_000),
+    "pagerank": (_pagerank, None, 20_000_000),
+    "components": (_components, None, 20_000_000),
+    "layout": (_layout, 1_000_000, None),
+    "render": (_render, 1000, 20_000),
+    "web": (_web, 1_000_000, 20_000_000),
+}
+
+
+def time_call(fn, repeat=3):
+    """Час кожного з repeat прогонів fn (секунди); повільні прогони не повторюються."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+        if runs[-1] > SLOW_RUN_SECONDS:
+            break
+    return runs
+
+
+def _fits(stage, n, matches):
+    _, max_teams, max_matches = STAGES[stage]
+    return ((max_teams is None or n <= max_teams)
+            and (max_matches is None or matches <= max_matches))
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, timeout=5,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment():
+    """Опис середовища для JSON: версії бібліотек, платформа, коміт."""
+    import matplotlib
+    import pandas
+    import scipy
+
+    return {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "pandas": pandas.__version__,
+        "matplotlib": matplotlib.__version__,
+        "commit": _git_commit(),
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, generators=None, stages=None,
+                   repeat=3, seed=0, verbose=True):
+    """
+    Виконує всі комбінації генератор × розмір × етап.
+    Повертає словник {"meta": ..., "results": [...]} для JSON.
+    """
+    generators = list(generators or GENERATORS)
+    stages = list(stages or STAGES)
+    results = []
+
+    for kind in generators:
+        for n in sizes:
+            if n > GENERATOR_LIMITS.get(kind, n):
+                continue
+            table = generate(kind, n, seed=seed)
+            with tempfile.TemporaryDirectory(prefix="standings-bench-") as workdir:
+                for stage in stages:
+                    if not _fits(stage, n, len(table)):
+                        continue
+                    prepare = STAGES[stage][0]
+                    run, info = prepare(table, workdir)
+                    runs = time_call(run, repeat)
+                    row = {
+                        "generator": kind,
+                        "teams": n,
+                        "matches": len(table),
+                        "stage": stage,
+                        "best": min(runs),
+                        "median": statistics.median(runs),
+                        "runs": runs,
+                        **info,
+                    }
+                    results.append(row)
+                    if verbose:
+                        print(f"{kind:<13} {n:>9} {stage:<10} {row['best'] * 1000:>11.2f} мс")
+
+    meta = environment()
+    meta.update({"seed": seed, "repeat": repeat, "sizes": list(sizes)})
+    return {"meta": meta, "results": results}
+
+
+def _key(row):
+    return row["generator"], row["teams"], row["stage"]
+
+
+def compare_results(current, baseline, tolerance=0.25, min_seconds=1e-3):
+    """
+    Порівнює два запуски за найкращим часом.
+    Регресія — якщо етап повільніший більш ніж на tolerance і щонайменше на min_seconds.
+    Повертає список (key, old, new, ratio) регресій.
+    """
+    old = {_key(row): row["best"] for row in baseline["results"]}
+    regressions = []
+    for row in current["results"]:
+        before = old.get(_key(row))
+        if before is None:
+            continue
+        after = row["best"]
+        ratio = after / before if before > 0 else float("inf")
+        if ratio > 1 + tolerance and after - before > min_seconds:
+            regressions.append((_key(row), before, after, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки рейтингу, розкладки та рендеру.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Кількість команд (за замовчуванням 10 ... 10^6)")
+    parser.add_argument("--generators", nargs="+", choices=list(GENERATORS),
+                        help="Типи турнірів (за замовчуванням усі)")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES),
+                        help="Етапи (за замовчуванням усі)")
+    parser.add_argument("--repeat", type=int, default=3, help="Повтори кожного вимірювання")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="benchmark.json", help="JSON з результатами")
+    parser.add_argument("--baseline", help="JSON попереднього запуску для порівняння")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Допустиме сповільнення (0.25 = +25%%)")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, args.generators, args.stages,
+                            max(1, args.repeat), args.seed)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nРезультати збережено у {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(report, baseline, args.tolerance)
+        if not regressions:
+            print("Регресій не знайдено.")
+            return
+        print(f"\nРегресії (> +{args.tolerance:.0%}):")
+        for (kind, n, stage), before, after, ratio in regressions:
+            print(f"  {kind:<13} {n:>9} {stage:<10} {before * 1000:.2f} -> {after * 1000:.2f} мс (x{ratio:.2f})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,38 @@
-import time
-from backend import *
+from implementation.generators import power_law, write_csv
+from implementation.loader import load_matches
+from implementation.pagerank import build_graph, power_iteration
+from implementation.profiler import profiling, span
 
-def ranking_table_while(matches: dict, all_teams: set, coef = 0.85, epsilon = 1e-8) -> dict:
-    num_of_command = len(all_teams)
-    base_bonus = (1 - coef)/num_of_command
 
-    start_leaderboard = {name: 1/num_of_command for name in all_teams}
-    iterations = 0
+def generate_random_table(path="new_table.csv", teams=26, seed=None):
+    write_csv(power_law(teams, seed=seed), path)
+
+
+def read_matches(path):
+    table = load_matches(path)
+    matches = {}
+    for w_nam, name in table.pairs():
+        matches.setdefault(name, set()).add(w_nam)
+    return matches, set(table.teams)
+
+def ranking_table(matches: dict, all_teams: set, coef = 0.85, iterations = 100) -> dict:
+    pairs = [(w_nam, name) for name, winners in matches.items() for w_nam in winners]
+    graph = build_graph(pairs, all_teams)
+    n = len(graph)
+    scores = [1.0 / n] * n
+    for _ in range(iterations):
+        dangling_sum = sum(s for s, d in zip(scores, graph.dangling) if d)
+        shares = graph.matrix.dot(scores)
+        scores = [(1 - coef) / n + coef * (x + dangling_sum / n) for x in shares]
 
-    while True:
-        new_leaderboard = {name: base_bonus for name in all_teams}
-        for name, winners in matches.items():
-            loser_points = start_leaderboard[name]
-            loser_loos = len(winners)
-            share = (loser_points / loser_loos) * coef
-            for w_nam in winners:
-                new_leaderboard[w_nam] += share
-        delta = sum(abs(new_leaderboard[n] - start_leaderboard[n]) for n in all_teams)
-        start_leaderboard = new_leaderboard
-        iterations += 1
+    return dict(zip(graph.teams, scores))
 
-        if delta < epsilon:
-            break
+def ranking_table_while(matches: dict, all_teams: set, coef = 0.85, epsilon = 1e-8) -> dict:
+    pairs = [(w_nam, name) for name, winners in matches.items() for w_nam in winners]
+    graph = build_graph(pairs, all_teams)
+    scores, iterations, _ = power_iteration(graph, coef, epsilon)
 
-    return start_leaderboard, iterations
+    return dict(zip(graph.teams, scores.tolist())), iterations
 
 
 if __name__ == "__main__":
@@ -33,17 +42,17 @@ if __name__ == "__main__":
         print(f"\nЗавантажено команд: {len(teams_data)}")
         print("-" * 30)
 
-        start_time = time.time()
-        res_for = ranking_table(matches_data, teams_data)
-        time_for = time.time() - start_time
-        print(f"FOR (100 ітерацій): {time_for:.5f} сек")
-        print(f"Кількість ітерацій FOR: 100")
+        with profiling() as prof:
+            with span("compare.for"):
+                res_for = ranking_table(matches_data, teams_data)
+            with span("compare.while"):
+                res_while, iterations_while = ranking_table_while(matches_data, teams_data)
+        seconds = {row["name"]: row["total_ms"] / 1000 for row in prof.summary()}
 
-        start_time = time.time()
-        res_while, iterations_while = ranking_table_while(matches_data, teams_data)
-        time_while = time.time() - start_time
-        print(f"WHILE (авто-стоп):  {time_while:.5f} сек")
+        print(f"FOR (100 ітерацій): {seconds['compare.for']:.5f} сек")
+        print(f"Кількість ітерацій FOR: 100")
+        print(f"WHILE (авто-стоп):  {seconds['compare.while']:.5f} сек")
         print(f"Кількість ітерацій WHILE: {iterations_while}")
 
         print("-" * 30)
-
+        print(prof.report())
@@ -0,0 +1,114 @@
+'''
+Розв'язок PageRank окремо для кожної слабко зв'язної компоненти.
+
+Турніри з кількох ліг (disconnected_graphs.csv, сезони з дивізіонами)
+розпадаються на незалежні блоки. Вектор PageRank пропорційний
+y = (I - d*M)^{-1} v (v — вектор телепорту), а матриця блочно-діагональна,
+тож кожен блок розв'язується окремо (великі — паралельно), а потім
+масштабується і нормується разом з рештою. Результат точно збігається
+з розв'язком для всього графа.
+'''
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy.sparse import csgraph
+
+from implementation.pagerank import MatchGraph
+from implementation.profiler import timed
+from implementation.solvers import rank, residual
+
+
+# Компонента з такою кількістю команд + ребер розв'язується окремою задачею;
+# менші об'єднуються в один блок (розклад точний для будь-якого об'єднання)
+BLOCK_MIN = 50_000
+
+
+def components(graph):
+    """(кількість компонент, мітка компоненти для кожної команди)."""
+    return csgraph.connected_components(graph.matrix, directed=True, connection="weak")
+
+
+def split_blocks(graph, min_block=BLOCK_MIN):
+    """
+    Групує компоненти у блоки: кожна велика — окремо, решта — разом.
+    Повертає (кількість компонент, список масивів ID команд блоків).
+    """
+    count, labels = components(graph)
+    if count <= 1:
+        return count, [np.arange(len(graph))]
+
+    size = (np.bincount(labels, minlength=count)
+            + np.bincount(labels[graph.winners], minlength=count))
+    big = np.flatnonzero(size >= min_block)
+    blocks = [np.flatnonzero(labels == c) for c in big]
+
+    rest = ~np.isin(labels, big)
+    if rest.any():
+        blocks.append(np.flatnonzero(rest))
+    return count, blocks
+
+
+def subgraph(graph, members):
+    """MatchGraph лише з команд members (і ребер між ними)."""
+    local = np.full(len(graph), -1, dtype=np.int64)
+    local[members] = np.arange(len(members))
+    keep = local[graph.winners] >= 0
+    teams = [graph.teams[i] for i in members.tolist()]
+    return MatchGraph(teams, local[graph.winners[keep]], local[graph.losers[keep]],
+                      graph.weights[keep])
+
+
+@timed("pagerank.components")
+def rank_components(graph, damping=0.85, epsilon=1e-8, solver="auto", max_iter=1000,
+                    time_budget=None, teleport=None, workers=None, min_block=BLOCK_MIN):
+    """
+    Як solvers.rank, але кожен блок компонент розв'язується окремо
+    (паралельно в потоках, якщо блоків кілька). Повертає RankResult
+    з глобально нормованим вектором; iterations — максимум по блоках.
+    """
+    t0 = time.perf_counter()
+    count, blocks = split_blocks(graph, min_block)
+    options = dict(damping=damping, epsilon=epsilon, solver=solver,
+                   max_iter=max_iter, time_budget=time_budget)
+    if len(blocks) <= 1:
+        return rank(graph, teleport=teleport, **options)._replace(components=max(count, 1))
+
+    n = len(graph)
+    v = np.full(n, 1.0 / n) if teleport is None else np.asarray(teleport, dtype=np.float64)
+    mass = [v[members].sum() for members in blocks]
+    # Блок без ваги телепорту отримує нульовий рейтинг — розв'язувати нічого
+    tasks = [(subgraph(graph, members), v[members] / m)
+             for members, m in zip(blocks, mass) if m > 0]
+
+    def solve(task):
+        sub, local_teleport = task
+        return rank(sub, teleport=local_teleport, **options)
+
+    if workers is None:
+        workers = min(len(tasks), os.cpu_count() or 1)
+    if workers <= 1:
+        results = [solve(task) for task in tasks]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(solve, tasks))
+
+    # Нормований x_b блоку задовольняє (I - d*M_b) x_b = c_b * v_b / |v_b|,
+    # де c_b = 1 - d + d * маса команд без поразок, тож y_b = x_b * |v_b| / c_b
+    y = np.zeros(n)
+    solved = [(members, m) for members, m in zip(blocks, mass) if m > 0]
+    for (members, m), (sub, _), res in zip(solved, tasks, results):
+        c = 1 - damping + damping * res.scores.take(sub.dangling_index).sum()
+        y[members] = res.scores * (m / c)
+    scores = y / y.sum()
+
+    largest = max(range(len(tasks)), key=lambda k: len(tasks[k][0]))
+    return results[largest]._replace(
+        scores=scores,
+        iterations=max(res.iterations for res in results),
+        residual=residual(graph, scores, damping, teleport),
+        seconds=time.perf_counter() - t0,
+        converged=all(res.converged for res in results),
+        components=count,
+    )
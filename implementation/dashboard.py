@@ -0,0 +1,135 @@
+'''
+Plotly-граф турніру для веб-дашборду.
+
+Винесено з web_app.py, щоб фігуру можна було будувати (і вимірювати
+в бенчмарках) без запуску Streamlit-скрипта.
+'''
+import numpy as np
+import plotly.graph_objects as go
+
+from implementation.attributes import WEB_STYLE, ring_positions, scale_radii
+from implementation.profiler import timed
+
+
+# (верхня межа ваги ребра, не включно; товщина лінії) — ваги дробові через згасання й margin
+EDGE_WIDTH_BUCKETS = [(2, 1.0), (4, 2.0), (None, 3.5)]
+
+
+def edge_buckets(counts):
+    """Індекс у EDGE_WIDTH_BUCKETS для кожного ребра (кожне потрапляє рівно в один)."""
+    bounds = [hi for hi, _ in EDGE_WIDTH_BUCKETS if hi is not None]
+    return np.searchsorted(bounds, np.asarray(counts, dtype=np.float64), side="right")
+
+
+def node_radii(scores):
+    """Радіус вузла: 15..50 за коренем нормованого рейтингу."""
+    vals = np.fromiter(scores.values(), dtype=np.float64, count=len(scores))
+    return dict(zip(scores, scale_radii(vals, WEB_STYLE.min_r, WEB_STYLE.max_r).tolist()))
+
+
+def ring_layout(scores, radii):
+    """Команди по колу в порядку рейтингу (лідер — зверху)."""
+    vals = np.fromiter(scores.values(), dtype=np.float64, count=len(scores))
+    order = np.argsort(-vals, kind="stable")
+    max_r = max(radii.values()) if radii else 30
+    return dict(zip(scores, ring_positions(order, max_r, WEB_STYLE.min_ring, WEB_STYLE.spread)))
+
+
+def _segments(pos_xy, src, dst):
+    """x/y для Scattergl: відрізки src->dst, розділені NaN."""
+    k = len(src)
+    xs = np.full(3 * k, np.nan)
+    ys = np.full(3 * k, np.nan)
+    xs[0::3], ys[0::3] = pos_xy[src, 0], pos_xy[src, 1]
+    xs[1::3], ys[1::3] = pos_xy[dst, 0], pos_xy[dst, 1]
+    return xs, ys
+
+
+@timed("plotly.figure")
+def create_stylish_graph(scores, edges, pos, radii, label_top_k=20,
+                         max_nodes=None, max_edges=None):
+    """
+    WebGL-граф (Scattergl).
+    edges — (winners, losers, counts) з назвами команд; повторні матчі вже злиті.
+    pos/radii — словники {team: ...} або масиви у порядку scores (VisualAttributes).
+    Підписи показуються лише для top-k команд, max_nodes/max_edges обмежують розмір.
+    """
+    fig = go.Figure()
+
+    teams = np.array(list(scores.keys()), dtype=object)
+    vals = np.fromiter(scores.values(), dtype=np.float64, count=len(teams))
+    order = np.argsort(-vals, kind='stable')
+    if max_nodes:
+        order = order[:max_nodes]
+    teams, vals = teams[order], vals[order]
+
+    index = {t: i for i, t in enumerate(teams)}
+    if isinstance(pos, dict):
+        pos_xy = np.array([pos[t] for t in teams], dtype=np.float64).reshape(-1, 2)
+        node_size = np.array([radii[t] for t in teams]) * 2.2
+    else:
+        pos_xy = np.asarray(pos, dtype=np.float64).reshape(-1, 2)[order]
+        node_size = np.asarray(radii, dtype=np.float64)[order] * 2.2
+
+    e_w, e_l, counts = edges
+    src = np.fromiter((index.get(t, -1) for t in e_w), dtype=np.int64, count=len(e_w))
+    dst = np.fromiter((index.get(t, -1) for t in e_l), dtype=np.int64, count=len(e_l))
+    keep = (src >= 0) & (dst >= 0)
+    src, dst, counts = src[keep], dst[keep], np.asarray(counts)[keep]
+    if max_edges and len(counts) > max_edges:
+        top = np.argsort(-counts, kind='stable')[:max_edges]
+        src, dst, counts = src[top], dst[top], counts[top]
+
+    buckets = edge_buckets(counts)
+    for bucket, (_, width) in enumerate(EDGE_WIDTH_BUCKETS):
+        mask = buckets == bucket
+        if not mask.any():
+            continue
+        edge_x, edge_y = _segments(pos_xy, src[mask], dst[mask])
+        fig.add_trace(go.Scattergl(
+            x=edge_x, y=edge_y,
+            mode='lines',
+            line=dict(color='#444', width=width),
+            hoverinfo='none',
+            opacity=0.5
+        ))
+
+    node_text = [f"<b>{t}</b><br>Score: {v:.4f}" for t, v in zip(teams, vals)]
+
+    fig.add_trace(go.Scattergl(
+        x=pos_xy[:, 0], y=pos_xy[:, 1],
+        mode='markers',
+        marker=dict(
+            size=node_size,
+            color=vals,
+            colorscale='Viridis',
+            showscale=False,
+            line=dict(color='white', width=1.5)
+        ),
+        hovertext=node_text,
+        hoverinfo='text'
+    ))
+
+    k = min(label_top_k, len(teams))
+    if k:
+        fig.add_trace(go.Scatter(
+            x=pos_xy[:k, 0], y=pos_xy[:k, 1],
+            mode='text',
+            text=list(teams[:k]),
+            textposition="middle center",
+            textfont=dict(size=12, color='white', family="Arial"),
+            hoverinfo='skip'
+        ))
+
+    fig.update_layout(
+        template="plotly_dark",
+        showlegend=False,
+        margin=dict(l=0, r=0, t=30, b=0),
+        xaxis=dict(showgrid=False, visible=False),
+        yaxis=dict(showgrid=False, visible=False),
+        height=650,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        dragmode='pan'
+    )
+    return fig
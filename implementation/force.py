@@ -0,0 +1,257 @@
+'''
+Силова розкладка графа (Fruchterman–Reingold) з теплим стартом між кроками.
+
+Відштовхування рахується лише між вузлами, ближчими за cutoff (сітковий
+варіант FR; сусіди шукаються KD-деревом), притягання — вздовж ребер,
+а слабка гравітація тримає окремі компоненти разом. Позиції зберігаються
+за ID команди: на наступному кроці рухаються лише нові команди та учасники
+нових матчів, решта графа стоїть на місці, тож повтор не «стрибає»,
+коли команди міняються місцями в рейтингу.
+'''
+import numpy as np
+from scipy.spatial import cKDTree
+
+from implementation.layout import OVERLAP_TOL, resolve_overlaps
+from implementation.profiler import count, timed
+
+
+# Найбільша сторона сітки далекого відштовхування (клітинок)
+GRID_MAX = 16
+
+
+class ForceLayout:
+    """
+    k — бажана довжина ребра (у пікселях), cutoff — радіус відштовхування в одиницях k,
+    padding — мінімальний зазор між колами після розкладки.
+    layout() повертає позиції для поточного кадру і запам'ятовує їх для наступного.
+    """
+
+    def __init__(self, k=150.0, iterations=80, warm_iterations=20, gravity=1.0,
+                 cutoff=2.0, padding=8.0, seed=0):
+        self.k = k
+        self.iterations = iterations
+        self.warm_iterations = warm_iterations
+        self.gravity = gravity
+        self.cutoff = cutoff
+        self.padding = padding
+        self.last_iterations = 0
+        self.last_moved = 0
+        self._rng = np.random.default_rng(seed)
+        # Остання позиція кожної команди за ID (команди, що вибули з кадру, її зберігають)
+        self._pos = np.zeros((0, 2))
+        self._known = np.zeros(0, dtype=bool)
+
+    def _grow(self, size):
+        if size > len(self._known):
+            extra = max(size, 2 * len(self._known)) - len(self._known)
+            self._pos = np.concatenate((self._pos, np.zeros((extra, 2))))
+            self._known = np.concatenate((self._known, np.zeros(extra, dtype=bool)))
+
+    def _place_new(self, pos, new, placed, src, dst):
+        """
+        Нова команда стає біля центру вже розміщених суперників,
+        без них — на випадкову точку кільця довкола графа.
+        """
+        both = np.concatenate((src, dst))
+        other = np.concatenate((dst, src))
+        keep = new[both] & placed[other]
+        counts = np.bincount(both[keep], minlength=len(pos))
+        sums = np.column_stack([np.bincount(both[keep], weights=pos[other[keep], axis],
+                                            minlength=len(pos)) for axis in (0, 1)])
+
+        near = np.flatnonzero(new & (counts > 0))
+        jitter = self._rng.normal(scale=0.3 * self.k, size=(len(near), 2))
+        pos[near] = sums[near] / counts[near, None] + jitter
+
+        lonely = np.flatnonzero(new & (counts == 0))
+        if len(lonely):
+            if placed.any():
+                ring = np.hypot(*pos[placed].T).max() + self.k
+            else:
+                ring = 0.5 * self.k * np.sqrt(len(pos))
+            angle = self._rng.uniform(0, 2 * np.pi, len(lonely))
+            radius = ring * np.sqrt(self._rng.uniform(0.0 if not placed.any() else 1.0, 1.0,
+                                                      len(lonely)))
+            pos[lonely] = np.column_stack((radius * np.cos(angle), radius * np.sin(angle)))
+
+    @staticmethod
+    def _neighbours(pos, mobile, fixed_tree, fixed, reach):
+        """
+        Пари (i, j) ближчі за reach: i — індекс серед рухомих, j — будь-який вузол.
+        Пара двох рухомих вузлів повертається в обох напрямках.
+        """
+        tree = cKDTree(pos[mobile])
+        parts = []
+        pairs = tree.query_pairs(reach, output_type="ndarray")
+        if len(pairs):
+            a, b = pairs[:, 0], pairs[:, 1]
+            parts.append((np.concatenate((a, b)), mobile[np.concatenate((b, a))]))
+        if fixed_tree is not None:
+            near = tree.sparse_distance_matrix(fixed_tree, reach, output_type="ndarray")
+            if len(near):
+                parts.append((near["i"].astype(np.int64), fixed[near["j"]]))
+        if not parts:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    def _repulsion(self, pos, radii, mobile, fixed_tree, fixed):
+        """Сумарне відштовхування на рухомі вузли від усіх сусідів у межах cutoff."""
+        force = np.zeros((len(mobile), 2))
+        i, j = self._neighbours(pos, mobile, fixed_tree, fixed, self.cutoff * self.k)
+        if len(i) == 0:
+            return force
+        diff = pos[mobile[i]] - pos[j]
+        dist = np.hypot(diff[:, 0], diff[:, 1])
+        # Відстань між краями кіл: великі вузли відштовхуються раніше
+        gap = np.maximum(dist - radii[mobile[i]] - radii[j], 0.05 * self.k)
+        scale = np.divide(self.k ** 2 / gap, dist, out=np.zeros_like(dist), where=dist > 0)
+        force[:, 0] = np.bincount(i, weights=diff[:, 0] * scale, minlength=len(mobile))
+        force[:, 1] = np.bincount(i, weights=diff[:, 1] * scale, minlength=len(mobile))
+        return force
+
+    def _far_field(self, pos, mobile):
+        """
+        Відштовхування від далеких вузлів, наближене сіткою: кожна непорожня
+        клітинка діє як одна маса в центрі своїх вузлів (ближчі за cutoff — точно, у _repulsion).
+        """
+        side = int(np.clip(np.sqrt(len(pos)) / 3, 2, GRID_MAX))
+        lo = pos.min(axis=0)
+        span = np.ptp(pos, axis=0).max() + 1e-9
+        cell = np.minimum(((pos - lo) / span * side).astype(np.int64), side - 1)
+        key = cell[:, 0] * side + cell[:, 1]
+        mass = np.bincount(key, minlength=side * side)
+        occupied = np.flatnonzero(mass)
+        mass = mass[occupied]
+        centroid = np.column_stack([np.bincount(key, weights=pos[:, axis],
+                                                minlength=side * side)[occupied]
+                                    for axis in (0, 1)]) / mass[:, None]
+
+        dx = pos[mobile, 0, None] - centroid[None, :, 0]
+        dy = pos[mobile, 1, None] - centroid[None, :, 1]
+        dist2 = dx * dx + dy * dy
+        far = dist2 > (self.cutoff * self.k) ** 2
+        scale = np.divide(mass * self.k ** 2, dist2, out=np.zeros_like(dist2), where=far)
+        return np.column_stack(((dx * scale).sum(axis=1), (dy * scale).sum(axis=1)))
+
+    def _separate(self, pos, radii, mobile, fixed_tree, fixed, iterations=60):
+        """
+        Розсуває кола, що перекриваються, зсуваючи лише рухомі вузли:
+        від нерухомих — на все перекриття, два рухомі — кожен на половину.
+        """
+        reach = 2 * radii.max() + self.padding
+        is_mobile = np.zeros(len(pos), dtype=bool)
+        is_mobile[mobile] = True
+        for _ in range(iterations):
+            i, j = self._neighbours(pos, mobile, fixed_tree, fixed, reach)
+            diff = pos[mobile[i]] - pos[j]
+            dist = np.hypot(diff[:, 0], diff[:, 1])
+            overlap = radii[mobile[i]] + radii[j] + self.padding - dist
+            hit = (overlap > OVERLAP_TOL) & (dist > 0)
+            if not hit.any():
+                return
+            i, diff, dist, overlap = i[hit], diff[hit], dist[hit], overlap[hit]
+            share = np.where(is_mobile[j[hit]], 0.5, 1.0)
+            push = diff * (overlap * share / dist)[:, None]
+            delta = np.zeros((len(mobile), 2))
+            np.add.at(delta, i, push)
+            pos[mobile] += delta
+
+    def _attraction(self, pos, slot, src, dst, strength, size):
+        """Притягання вздовж ребер для рухомих кінців (slot — індекс серед рухомих або -1)."""
+        force = np.zeros((size, 2))
+        if len(src) == 0:
+            return force
+        diff = pos[dst] - pos[src]
+        dist = np.hypot(diff[:, 0], diff[:, 1])
+        pull = diff * (strength * dist / self.k)[:, None]
+        for ends, sign in ((src, 1.0), (dst, -1.0)):
+            s = slot[ends]
+            keep = s >= 0
+            for axis in (0, 1):
+                force[:, axis] += sign * np.bincount(s[keep], weights=pull[keep, axis],
+                                                     minlength=size)
+        return force
+
+    @timed("layout.force")
+    def layout(self, ids, winners, losers, weights=None, radii=None, changed=None):
+        """
+        ids — ID команд кадру; winners/losers/weights — злиті ребра в тих самих ID
+        (ребра до команд поза кадром ігноруються); radii — радіуси вузлів у порядку ids.
+        changed — ID команд, чиї матчі змінилися з попереднього кадру: рухаються лише
+        вони і нові команди; None — розслабляється весь граф (з теплого старту).
+        Повертає позиції (len(ids), 2).
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        n = len(ids)
+        if n == 0:
+            return np.zeros((0, 2))
+        winners = np.asarray(winners, dtype=np.int64)
+        losers = np.asarray(losers, dtype=np.int64)
+        radii = np.zeros(n) if radii is None else np.asarray(radii, dtype=np.float64)
+
+        size = int(max(ids.max(), winners.max(initial=-1), losers.max(initial=-1))) + 1
+        self._grow(size)
+        local = np.full(size, -1, dtype=np.int64)
+        local[ids] = np.arange(n)
+        src, dst = local[losers], local[winners]
+        keep = (src >= 0) & (dst >= 0) & (src != dst)
+        src, dst = src[keep], dst[keep]
+        w = np.ones(len(src)) if weights is None else np.asarray(weights, np.float64)[keep]
+        # Повторні матчі тягнуть сильніше, але лише логарифмічно; притягання ділиться
+        # на середній степінь кінців, щоб щільні турніри не стискалися в клубок
+        strength = 1.0 + np.log2(np.maximum(w, 1.0))
+        degree = np.bincount(np.concatenate((src, dst)), minlength=n)
+        strength /= np.sqrt(degree[src] * degree[dst])
+
+        placed = self._known[ids]
+        pos = self._pos[ids].copy()
+        new = ~placed
+        self._place_new(pos, new, placed, src, dst)
+
+        if changed is None or new.sum() * 2 > n:
+            moving = np.ones(n, dtype=bool)
+        else:
+            moving = new.copy()
+            changed = np.asarray(changed, dtype=np.int64)
+            changed = changed[(changed >= 0) & (changed < size)]
+            moving[local[changed][local[changed] >= 0]] = True
+        mobile = np.flatnonzero(moving)
+        fixed = np.flatnonzero(~moving)
+
+        cold = not placed.any() or new.sum() * 2 > n
+        iterations = self.iterations if cold else self.warm_iterations
+        start_temp = self.k * (np.sqrt(n) if cold else 0.5)
+        self.last_moved = len(mobile)
+
+        if len(mobile):
+            slot = np.full(n, -1, dtype=np.int64)
+            slot[mobile] = np.arange(len(mobile))
+            fixed_tree = cKDTree(pos[fixed]) if len(fixed) else None
+            # Ребра, що не торкаються рухомих вузлів, сил не дають
+            touch = moving[src] | moving[dst]
+            e_src, e_dst, e_strength = src[touch], dst[touch], strength[touch]
+
+            for it in range(iterations):
+                temp = start_temp * (1 - it / iterations) + 0.02 * self.k
+                disp = self._repulsion(pos, radii, mobile, fixed_tree, fixed)
+                disp += self._far_field(pos, mobile)
+                disp += self._attraction(pos, slot, e_src, e_dst, e_strength, len(mobile))
+                # Гравітація сталої величини: не стискає граф, лише не дає компонентам розбігтися
+                centre = np.hypot(pos[mobile, 0], pos[mobile, 1])
+                disp -= pos[mobile] * np.divide(self.gravity * self.k, centre,
+                                                out=np.zeros_like(centre),
+                                                where=centre > 0)[:, None]
+                length = np.hypot(disp[:, 0], disp[:, 1])
+                step = np.divide(np.minimum(length, temp), length,
+                                 out=np.zeros_like(length), where=length > 0)
+                pos[mobile] += disp * step[:, None]
+            count("layout.force_iterations", iterations)
+            if cold:
+                pos, _ = resolve_overlaps(pos, radii, self.padding)
+            else:
+                self._separate(pos, radii, mobile, fixed_tree, fixed)
+        self.last_iterations = iterations if len(mobile) else 0
+        self._pos[ids] = pos
+        self._known[ids] = True
+        return pos.copy()
@@ -0,0 +1,314 @@
+'''
+Рейтинг форми: останні N матчів (ковзне вікно) та/або експоненційне згасання.
+
+Вікно рухається вздовж турніру: нові матчі додають вагу своїм ребрам,
+матчі, що випали з вікна, її знімають, тож граф ніколи не перебудовується,
+а розв'язок стартує з попереднього вектора. Згасання реалізоване
+зростанням ваги нових матчів (PageRank не залежить від спільного множника
+ваг), з періодичним перемасштабуванням, щоб не вийти за межі float64.
+
+    python -m implementation.form app/data/league.csv --window 50 --every 10 -o form.csv
+'''
+import argparse
+import time
+
+import numpy as np
+from scipy import sparse
+
+from implementation.incremental import StepStats
+from implementation.pagerank import converge, dangling_mask
+from implementation.profiler import count, timed
+
+
+# Після такого зростання (у степенях двійки) ваги перемасштабовуються
+_RESCALE_BITS = 512
+
+
+class FormRanking:
+    """
+    Рейтинг на кроці step (після перших step матчів table) лише за матчами
+    вікна [step - window, step) із вагою, що згасає вдвічі кожні half_life матчів.
+    window=None — усі матчі від початку, half_life=None — без згасання.
+    Рейтинг мають лише команди, що грали у вікні; решта — 0.
+    """
+
+    def __init__(self, table, window=None, half_life=None, margin=False,
+                 damping=0.85, epsilon=1e-8):
+        if window is not None and window < 1:
+            raise ValueError("Вікно має містити хоча б один матч")
+        if half_life is not None and half_life <= 0:
+            raise ValueError("half_life має бути додатним")
+        self.table = table
+        self.window = window
+        self.half_life = half_life
+        self.damping = damping
+        self.epsilon = epsilon
+        self.history = []
+
+        self.teams = table.teams
+        self._w = np.asarray(table.winners, dtype=np.int64)
+        self._l = np.asarray(table.losers, dtype=np.int64)
+        self._base = (np.asarray(table.weights, dtype=np.float64)
+                      if margin and table.weights is not None else None)
+
+        n = table.num_teams
+        self._scores = np.zeros(n)
+        self._games = np.zeros(n, dtype=np.int64)
+        # Позиція ребра кожного матчу (заповнюється при першому додаванні)
+        self._match_edge = np.full(len(table), -1, dtype=np.int64)
+        self._pairs = {}
+        self._winners = np.zeros(0, dtype=np.int64)
+        self._losers = np.zeros(0, dtype=np.int64)
+        self._reset()
+
+    def _reset(self):
+        """Порожнє вікно (ребра, знайдені раніше, лишаються з нульовою вагою)."""
+        self.start = 0
+        self.step = 0
+        self._origin = 0
+        self._games[:] = 0
+        self._weights = np.zeros(len(self._winners))
+        self._counts = np.zeros(len(self._winners), dtype=np.int64)
+
+    def __len__(self):
+        return int(np.count_nonzero(self._games))
+
+    @property
+    def active(self):
+        """Маска команд, що грали у вікні."""
+        return self._games > 0
+
+    @property
+    def scores(self):
+        """Вектор рейтингу по всіх командах table (0 — не грала у вікні)."""
+        return self._scores
+
+    def scores_dict(self):
+        ids = np.flatnonzero(self.active)
+        return dict(zip([self.teams[i] for i in ids.tolist()], self._scores[ids].tolist()))
+
+    def edges(self):
+        """Злиті ребра вікна (winners, losers, weights) з ненульовою вагою."""
+        live = self._counts > 0
+        return self._winners[live], self._losers[live], self._weights[live]
+
+    def _match_weights(self, lo, hi):
+        """Поточні ваги матчів lo..hi-1 з урахуванням згасання."""
+        weights = np.ones(hi - lo) if self._base is None else self._base[lo:hi].copy()
+        if self.half_life:
+            weights *= np.exp2((np.arange(lo, hi) - self._origin) / self.half_life)
+        return weights
+
+    def _edge_positions(self, lo, hi):
+        """Ребра матчів lo..hi-1; нові пари дописуються в кінець масивів."""
+        pos = self._match_edge[lo:hi]
+        missing = np.flatnonzero(pos < 0)
+        if len(missing):
+            w, l = self._w[lo:hi][missing], self._l[lo:hi][missing]
+            found = np.fromiter((self._pairs.get(key, -1)
+                                 for key in zip(l.tolist(), w.tolist())),
+                                dtype=np.int64, count=len(missing))
+            new = np.flatnonzero(found < 0)
+            if len(new):
+                # Повторні нові пари в межах порції отримують одне ребро
+                keys, first, inverse = np.unique(l[new] * len(self.teams) + w[new],
+                                                 return_index=True, return_inverse=True)
+                m = len(self._winners)
+                self._winners = np.concatenate((self._winners, w[new][first]))
+                self._losers = np.concatenate((self._losers, l[new][first]))
+                self._weights = np.concatenate((self._weights, np.zeros(len(keys))))
+                self._counts = np.concatenate((self._counts,
+                                               np.zeros(len(keys), dtype=np.int64)))
+                self._pairs.update(zip(zip(l[new][first].tolist(), w[new][first].tolist()),
+                                       range(m, m + len(keys))))
+                found[new] = m + inverse.ravel()
+            pos[missing] = found
+        return pos
+
+    def _add(self, lo, hi):
+        if hi <= lo:
+            return
+        pos = self._edge_positions(lo, hi)
+        np.add.at(self._weights, pos, self._match_weights(lo, hi))
+        np.add.at(self._counts, pos, 1)
+        np.add.at(self._games, self._w[lo:hi], 1)
+        np.add.at(self._games, self._l[lo:hi], 1)
+
+    def _retire(self, lo, hi):
+        if hi <= lo:
+            return
+        pos = self._match_edge[lo:hi]
+        np.subtract.at(self._weights, pos, self._match_weights(lo, hi))
+        np.subtract.at(self._counts, pos, 1)
+        np.subtract.at(self._games, self._w[lo:hi], 1)
+        np.subtract.at(self._games, self._l[lo:hi], 1)
+        # Ребро без матчів у вікні — рівно нуль, без залишку округлення
+        self._weights[pos[self._counts[pos] == 0]] = 0.0
+
+    def _compact(self):
+        """Викидає ребра без матчів у вікні, коли їх стає більше, ніж живих."""
+        live = self._counts > 0
+        num_live = int(live.sum())
+        if len(live) - num_live <= max(num_live, 1024):
+            return
+        remap = np.full(len(live), -1, dtype=np.int64)
+        remap[live] = np.arange(num_live)
+        self._winners = self._winners[live]
+        self._losers = self._losers[live]
+        self._weights = self._weights[live]
+        self._counts = self._counts[live]
+        self._pairs = dict(zip(zip(self._losers.tolist(), self._winners.tolist()),
+                               range(num_live)))
+        # Поза вікном позиції забуваються: такі матчі знайдуть ребро заново
+        known = self._match_edge >= 0
+        self._match_edge[known] = remap[self._match_edge[known]]
+        self._match_edge[:self.start] = -1
+
+    def _rescale(self, step):
+        """Зсуває початок відліку згасання, щоб ваги лишалися в межах float64."""
+        if not self.half_life or (step - self._origin) / self.half_life < _RESCALE_BITS:
+            return
+        shift = step - self._origin
+        self._weights *= np.exp2(-shift / self.half_life)
+        self._origin = step
+
+    @timed("form.advance")
+    def advance(self, step, solve=True):
+        """
+        Пересуває кінець вікна на крок step (1..len(table)).
+        Вперед — лише додає нові і знімає старі матчі; назад чи стрибок
+        довший за вікно — вікно збирається заново з останніх window матчів.
+        """
+        if not 0 <= step <= len(self.table):
+            raise IndexError(f"Крок {step} поза межами 0..{len(self.table)}")
+        start = 0 if self.window is None else max(0, step - self.window)
+
+        if step < self.step or start >= self.step:
+            # Вікна не перетинаються: стан збирається з нуля (вектор — як теплий старт)
+            self._reset()
+            self.start = self.step = self._origin = start
+        self._rescale(step)
+        self._add(self.step, step)
+        self._retire(self.start, start)
+        count("form.matches", step - self.step + start - self.start)
+        self.start, self.step = start, step
+        self._compact()
+
+        if solve:
+            return self.solve()
+        stats = StepStats(step, 0, 0.0, 0.0, [])
+        self.history.append(stats)
+        return stats
+
+    def solve(self):
+        """Доводить рейтинг вікна до збіжності з теплого старту."""
+        started = time.perf_counter()
+        active = self.active
+        n = int(active.sum())
+        if n == 0:
+            self._scores[:] = 0.0
+            iterations, delta = 0, 0.0
+        else:
+            # Розв'язок лише на командах і ребрах вікна (CSR, як у MatchGraph)
+            ids = np.flatnonzero(active)
+            local = np.full(len(self.teams), -1, dtype=np.int64)
+            local[ids] = np.arange(n)
+            live = self._counts > 0
+            winners = local[self._winners[live]]
+            losers = local[self._losers[live]]
+            weights = self._weights[live]
+            out_degree = np.bincount(losers, weights=weights, minlength=n)
+            dangling = dangling_mask(out_degree)
+            coef = np.divide(weights, out_degree[losers], out=np.zeros(len(weights)),
+                             where=~dangling[losers])
+            matrix = sparse.csr_matrix((coef, (winners, losers)), shape=(n, n))
+
+            start = self._scores[ids]
+            start[start <= 0] = 1.0 / n
+            start /= start.sum()
+            scores, iterations, delta = converge(
+                matrix.dot, np.flatnonzero(dangling), start,
+                self.damping, self.epsilon)
+            self._scores[:] = 0.0
+            self._scores[ids] = scores
+
+        stats = StepStats(self.step, iterations, float(delta),
+                          time.perf_counter() - started, [])
+        self.history.append(stats)
+        return stats
+
+    def scores_at(self, step):
+        """Вектор рейтингу по всіх командах на кроці step (пересуває вікно)."""
+        self.advance(step)
+        return self._scores.copy()
+
+    def rolling(self, steps):
+        """Генератор (step, scores) для зростаючої послідовності кроків."""
+        for step in steps:
+            yield step, self.scores_at(step)
+
+
+def rolling_form(table, steps, window=None, half_life=None, margin=False):
+    """
+    Таблиці форми на кроках steps: float32-матриця «кроки × команди»,
+    NaN — команда не грала у вікні.
+    """
+    steps = list(steps)
+    form = FormRanking(table, window, half_life, margin)
+    matrix = np.full((len(steps), table.num_teams), np.nan, dtype=np.float32)
+    for row, (step, scores) in enumerate(form.rolling(steps)):
+        active = form.active
+        matrix[row, active] = scores[active]
+    return matrix
+
+
+def main():
+    import pandas as pd
+
+    from implementation.graph_store import load_cached
+
+    parser = argparse.ArgumentParser(description="Rolling form tables for a tournament.")
+    parser.add_argument("csv_path", help="CSV з матчами (Winner, Loser)")
+    parser.add_argument("--window", type=int, default=None,
+                        help="Рейтинг лише за останніми N матчами")
+    parser.add_argument("--half-life", type=float, default=None,
+                        help="Згасання ваги старих матчів: вага вдвічі менша кожні N матчів")
+    parser.add_argument("--every", type=int, default=None,
+                        help="Крок таблиць у матчах (за замовчуванням — лише фінальна)")
+    parser.add_argument("--margin", action="store_true",
+                        help="Брати вагу матчу з третьої колонки CSV")
+    parser.add_argument("-o", "--output", help="Записати таблиці у .csv (step, team, rank, score)")
+    args = parser.parse_args()
+    if args.window is None and args.half_life is None:
+        parser.error("Потрібно задати --window та/або --half-life")
+
+    table = load_cached(args.csv_path)
+    total = len(table)
+    steps = list(range(args.every, total + 1, args.every)) if args.every else []
+    if not steps or steps[-1] != total:
+        steps.append(total)
+
+    start = time.perf_counter()
+    matrix = rolling_form(table, steps, args.window, args.half_life, args.margin)
+    elapsed = time.perf_counter() - start
+    print(f"{len(steps)} таблиць форми за {elapsed:.2f} с")
+
+    if args.output:
+        rows = []
+        for step, scores in zip(steps, matrix):
+            ids = np.flatnonzero(~np.isnan(scores))
+            order = ids[np.argsort(-scores[ids], kind="stable")]
+            rows.extend((step, table.teams[i], rank, float(scores[i]))
+                        for rank, i in enumerate(order.tolist(), 1))
+        pd.DataFrame(rows, columns=["step", "team", "rank", "score"]).to_csv(args.output,
+                                                                             index=False)
+        print(f"Результат записано у {args.output}")
+    else:
+        final = matrix[-1]
+        ids = np.flatnonzero(~np.isnan(final))
+        for rank, i in enumerate(ids[np.argsort(-final[ids], kind="stable")].tolist(), 1):
+            print(f"{rank}. {table.teams[i]}: {final[i]*100:.2f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+'''
+Синтетичні турніри для бенчмарків і тестів продуктивності.
+
+Кожен генератор детермінований (seed) і одразу повертає MatchTable
+з int32 ID, тож навіть мільйон команд генерується без Python-циклу
+по матчах. Результат матчу визначається прихованою "силою" команд:
+сильніша перемагає з імовірністю s_a / (s_a + s_b).
+'''
+import numpy as np
+import pandas as pd
+
+from implementation.loader import MatchTable
+
+
+def team_names(n):
+    return [f"Team {i}" for i in range(n)]
+
+
+def _strengths(rng, n):
+    return rng.lognormal(0.0, 1.0, n)
+
+
+def _play(rng, strength, a, b):
+    """Результати матчів a[i] проти b[i]: повертає (winners, losers)."""
+    p_a = strength[a] / (strength[a] + strength[b])
+    a_wins = rng.random(len(a)) < p_a
+    winners = np.where(a_wins, a, b).astype(np.int32)
+    losers = np.where(a_wins, b, a).astype(np.int32)
+    return winners, losers
+
+
+def _table(n, winners, losers, rng, shuffle=True):
+    """
+    MatchTable з ID у порядку першої появи (як у load_matches);
+    команди, що не зіграли жодного матчу, до таблиці не потрапляють.
+    """
+    if shuffle:
+        order = rng.permutation(len(winners))
+        winners, losers = winners[order], losers[order]
+    # Чергуємо winner/loser, як loader, щоб нумерація збігалася з прочитаним CSV
+    ids = np.empty(2 * len(winners), dtype=np.int64)
+    ids[0::2] = winners
+    ids[1::2] = losers
+    codes, uniques = pd.factorize(ids)
+    names = team_names(n)
+    return MatchTable([names[i] for i in uniques.tolist()],
+                      np.ascontiguousarray(codes[0::2], dtype=np.int32),
+                      np.ascontiguousarray(codes[1::2], dtype=np.int32))
+
+
+def round_robin(n, rounds=1, seed=0):
+    """Кожна пара команд грає rounds разів: rounds * n(n-1)/2 матчів."""
+    rng = np.random.default_rng(seed)
+    strength = _strengths(rng, n)
+    a, b = np.triu_indices(n, k=1)
+    a, b = np.tile(a, rounds), np.tile(b, rounds)
+    winners, losers = _play(rng, strength, a, b)
+    return _table(n, winners, losers, rng)
+
+
+def swiss(n, rounds=None, seed=0):
+    """
+    Швейцарська система: у кожному турі команди сортуються за очками
+    і грають із сусідом у таблиці. За замовчуванням ceil(log2 n) + 1 турів.
+    """
+    rng = np.random.default_rng(seed)
+    strength = _strengths(rng, n)
+    if rounds is None:
+        rounds = int(np.ceil(np.log2(max(n, 2)))) + 1
+
+    points = np.zeros(n)
+    winners_parts, losers_parts = [], []
+    for _ in range(rounds):
+        # Випадковий tie-break, щоб пари не повторювались детерміновано
+        order = np.lexsort((rng.random(n), -points))
+        m = n // 2 * 2
+        a, b = order[0:m:2], order[1:m:2]
+        w, l = _play(rng, strength, a, b)
+        points[w] += 1
+        winners_parts.append(w)
+        losers_parts.append(l)
+
+    # Порядок турів зберігається — це хронологія турніру
+    return _table(n, np.concatenate(winners_parts), np.concatenate(losers_parts),
+                  rng, shuffle=False)
+
+
+def knockout(n, seed=0):
+    """Олімпійська система: n - 1 матч, переможець проходить далі."""
+    rng = np.random.default_rng(seed)
+    strength = _strengths(rng, n)
+    alive = rng.permutation(n)
+    winners_parts, losers_parts = [], []
+    while len(alive) > 1:
+        m = len(alive) // 2 * 2
+        w, l = _play(rng, strength, alive[0:m:2], alive[1:m:2])
+        winners_parts.append(w)
+        losers_parts.append(l)
+        # Непарна команда проходить без гри
+        alive = np.concatenate((w, alive[m:]))
+
+    if not winners_parts:
+        return _table(n, np.zeros(0), np.zeros(0), rng, shuffle=False)
+    return _table(n, np.concatenate(winners_parts), np.concatenate(losers_parts),
+                  rng, shuffle=False)
+
+
+def power_law(n, matches=None, alpha=1.2, seed=0):
+    """
+    Популярність команд за законом Ципфа: кілька команд грають дуже часто,
+    більшість — рідко. За замовчуванням 10 * n матчів.
+    """
+    rng = np.random.default_rng(seed)
+    strength = _strengths(rng, n)
+    if matches is None:
+        matches = 10 * n
+
+    popularity = 1.0 / np.arange(1, n + 1) ** alpha
+    popularity /= popularity.sum()
+    popularity = popularity[rng.permutation(n)]
+
+    a = rng.choice(n, size=matches, p=popularity)
+    b = rng.choice(n, size=matches, p=popularity)
+    keep = a != b
+    winners, losers = _play(rng, strength, a[keep], b[keep])
+    return _table(n, winners, losers, rng, shuffle=False)
+
+
+def disconnected_leagues(n, leagues=None, matches_per_team=5, seed=0):
+    """
+    Ліги, що не грають між собою (як disconnected_graphs.csv):
+    граф розпадається на leagues компонент. За замовчуванням ~sqrt(n) ліг.
+    """
+    rng = np.random.default_rng(seed)
+    strength = _strengths(rng, n)
+    if leagues is None:
+        leagues = max(1, int(np.sqrt(n)))
+    league = rng.integers(0, leagues, n)
+
+    # Суперник — випадкова команда з тієї ж ліги
+    order = np.argsort(league, kind="stable")
+    starts = np.searchsorted(league[order], np.arange(leagues))
+    sizes = np.bincount(league, minlength=leagues)
+
+    a = np.repeat(np.arange(n), matches_per_team)
+    own = league[a]
+    b = order[starts[own] + (rng.random(len(a)) * sizes[own]).astype(np.int64)]
+    keep = a != b
+    winners, losers = _play(rng, strength, a[keep], b[keep])
+    return _table(n, winners, losers, rng)
+
+
+GENERATORS = {
+    "round_robin": round_robin,
+    "swiss": swiss,
+    "knockout": knockout,
+    "power_law": power_law,
+    "disconnected": disconnected_leagues,
+}
+
+
+def generate(kind, n, seed=0):
+    """Турнір типу kind з n командами (назва з GENERATORS)."""
+    if kind not in GENERATORS:
+        raise ValueError(f"Невідомий генератор '{kind}'. Доступні: {', '.join(GENERATORS)}")
+    return GENERATORS[kind](n, seed=seed)
+
+
+def write_csv(table, path):
+    """Записує MatchTable у CSV з заголовком winner,loser."""
+    names = np.array(table.teams, dtype=object)
+    frame = pd.DataFrame({"winner": names[table.winners], "loser": names[table.losers]})
+    frame.to_csv(path, index=False)
@@ -0,0 +1,198 @@
+'''
+Бінарний формат графа турніру (.tgraph) з memory-mapped завантаженням.
+
+Файл пишеться поруч із CSV (або в кеш-теку, якщо тека з даними лише
+для читання) і містить таблицю назв команд та int32-масиви ребер.
+CSV перечитується лише тоді, коли змінився його вміст.
+
+Структура файлу:
+    [0, 4096)      magic + JSON-заголовок, доповнений пробілами
+    names          назви команд у UTF-8, розділені '\\0'
+    winners        int32[num_matches], вирівняно на 8 байт
+    losers         int32[num_matches]
+    weights        float32[num_matches], лише якщо в CSV є колонка ваги
+'''
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from implementation.loader import MatchTable, load_matches
+from implementation.profiler import timed
+
+
+MAGIC = b"TGRAPH1\n"
+VERSION = 2
+HEADER_SIZE = 4096
+SUFFIX = ".tgraph"
+
+
+def file_digest(path, block_size=1 << 20):
+    """Потоковий blake2b-хеш вмісту файлу."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_dir():
+    """Тека для кешу, якщо поруч із CSV писати не можна."""
+    path = os.getenv("STANDINGS_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "standings")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def store_path(csv_path):
+    """Шлях .tgraph: поруч із CSV, інакше в cache_dir()."""
+    csv_path = os.path.abspath(csv_path)
+    folder = os.path.dirname(csv_path)
+    if os.access(folder, os.W_OK):
+        return csv_path + SUFFIX
+    key = hashlib.blake2b(csv_path.encode("utf-8"), digest_size=8).hexdigest()
+    return os.path.join(cache_dir(), f"{os.path.basename(csv_path)}.{key}{SUFFIX}")
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _source_stat(csv_path):
+    st = os.stat(csv_path)
+    return st.st_size, st.st_mtime_ns
+
+
+def write_store(path, table, source_hash, source_stat):
+    """Записує MatchTable у .tgraph атомарно (через тимчасовий файл)."""
+    names = "\0".join(table.teams).encode("utf-8")
+    num_matches = len(table)
+
+    names_offset = HEADER_SIZE
+    winners_offset = _align(names_offset + len(names))
+    losers_offset = winners_offset + 4 * num_matches
+    weights_offset = losers_offset + 4 * num_matches if table.weights is not None else None
+
+    header = {
+        "version": VERSION,
+        "source_hash": source_hash,
+        "source_size": source_stat[0],
+        "source_mtime_ns": source_stat[1],
+        "num_teams": table.num_teams,
+        "num_matches": num_matches,
+        "names_offset": names_offset,
+        "names_length": len(names),
+        "winners_offset": winners_offset,
+        "losers_offset": losers_offset,
+        "weights_offset": weights_offset,
+    }
+    header_bytes = MAGIC + json.dumps(header).encode("ascii")
+    if len(header_bytes) > HEADER_SIZE:
+        raise ValueError("Заголовок .tgraph не вміщується у 4096 байт")
+
+    folder = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header_bytes.ljust(HEADER_SIZE, b" "))
+            f.write(names)
+            f.write(b"\0" * (winners_offset - names_offset - len(names)))
+            f.write(np.ascontiguousarray(table.winners, dtype=np.int32).tobytes())
+            f.write(np.ascontiguousarray(table.losers, dtype=np.int32).tobytes())
+            if weights_offset is not None:
+                f.write(np.ascontiguousarray(table.weights, dtype=np.float32).tobytes())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return header
+
+
+def read_header(path):
+    """JSON-заголовок .tgraph або None, якщо файл відсутній чи пошкоджений."""
+    try:
+        with open(path, "rb") as f:
+            raw = f.read(HEADER_SIZE)
+    except OSError:
+        return None
+    if not raw.startswith(MAGIC):
+        return None
+    try:
+        return json.loads(raw[len(MAGIC):].decode("ascii"))
+    except ValueError:
+        return None
+
+
+def _update_stat(path, header, source_stat):
+    """Оновлює розмір/mtime джерела в заголовку без перезапису масивів."""
+    header = dict(header, source_size=source_stat[0], source_mtime_ns=source_stat[1])
+    header_bytes = MAGIC + json.dumps(header).encode("ascii")
+    try:
+        with open(path, "r+b") as f:
+            f.write(header_bytes.ljust(HEADER_SIZE, b" "))
+    except OSError:
+        pass
+    return header
+
+
+def open_store(path, header=None):
+    """Відкриває .tgraph: масиви ребер — np.memmap без копіювання."""
+    if header is None:
+        header = read_header(path)
+        if header is None:
+            raise ValueError(f"'{path}' не є файлом .tgraph")
+
+    with open(path, "rb") as f:
+        f.seek(header["names_offset"])
+        names = f.read(header["names_length"]).decode("utf-8")
+    teams = names.split("\0") if header["num_teams"] else []
+
+    num_matches = header["num_matches"]
+    weights = None
+    if num_matches and header.get("weights_offset") is not None:
+        weights = np.memmap(path, dtype=np.float32, mode="r",
+                            offset=header["weights_offset"], shape=(num_matches,))
+    if num_matches:
+        winners = np.memmap(path, dtype=np.int32, mode="r",
+                            offset=header["winners_offset"], shape=(num_matches,))
+        losers = np.memmap(path, dtype=np.int32, mode="r",
+                           offset=header["losers_offset"], shape=(num_matches,))
+    else:
+        winners = np.zeros(0, dtype=np.int32)
+        losers = np.zeros(0, dtype=np.int32)
+    return MatchTable(teams, winners, losers, digest=header["source_hash"], weights=weights)
+
+
+@timed("csv.load_cached")
+def load_cached(csv_path):
+    """
+    Завантажує матчі з .tgraph поруч із CSV; перебудовує його,
+    лише якщо вміст CSV змінився. Повертає MatchTable.
+    """
+    path = store_path(csv_path)
+    source_stat = _source_stat(csv_path)
+    header = read_header(path)
+    if header is not None and header.get("version") != VERSION:
+        header = None
+
+    if header is not None:
+        if (header["source_size"], header["source_mtime_ns"]) == source_stat:
+            return open_store(path, header)
+        source_hash = file_digest(csv_path)
+        if header["source_hash"] == source_hash:
+            return open_store(path, _update_stat(path, header, source_stat))
+    else:
+        source_hash = file_digest(csv_path)
+
+    table = load_matches(csv_path)
+    try:
+        header = write_store(path, table, source_hash, source_stat)
+    except OSError:
+        return table
+    return open_store(path, header)
@@ -0,0 +1,195 @@
+'''
+Інкрементальний PageRank для покрокового перегляду турніру.
+
+Граф оновлюється на місці після кожного матчу, а розв'язок
+стартує з попереднього вектора замість рівномірного.
+'''
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from implementation.pagerank import aggregate_edges, converge, dangling_mask
+
+
+StepStats = namedtuple("StepStats", ["step", "iterations", "delta", "seconds", "new_teams"])
+
+
+class IncrementalPageRank:
+    """
+    Стан рейтингу, що оновлюється матч за матчем.
+    add_match(winner, loser) додає ребро і переобчислює scores з теплого старту.
+    """
+
+    def __init__(self, damping=0.85, epsilon=1e-8, capacity=1024):
+        self.damping = damping
+        self.epsilon = epsilon
+
+        self.teams = []
+        self.index = {}
+        self.num_matches = 0
+        self.history = []
+
+        self._pairs = {}
+        self._winners = np.empty(capacity, dtype=np.int32)
+        self._losers = np.empty(capacity, dtype=np.int32)
+        self._weights = np.empty(capacity)
+        self._num_edges = 0
+
+        self._out_degree = np.zeros(capacity)
+        self._scores = np.zeros(capacity)
+
+    def __len__(self):
+        return len(self.teams)
+
+    @property
+    def scores(self):
+        """Поточний вектор рейтингу (у порядку self.teams)."""
+        return self._scores[:len(self.teams)]
+
+    @property
+    def last_stats(self):
+        return self.history[-1] if self.history else None
+
+    def scores_dict(self):
+        return dict(zip(self.teams, self.scores.tolist()))
+
+    def edges(self):
+        """Злиті ребра (winners, losers, weights) — зрізи внутрішніх масивів."""
+        m = self._num_edges
+        return self._winners[:m], self._losers[:m], self._weights[:m]
+
+    def _intern(self, team, new_teams):
+        idx = self.index.get(team)
+        if idx is None:
+            idx = len(self.teams)
+            self.index[team] = idx
+            self.teams.append(team)
+            new_teams.append(team)
+        return idx
+
+    def _resize_teams(self, n_old):
+        n = len(self.teams)
+        if n > len(self._scores):
+            capacity = max(n, 2 * len(self._scores))
+            self._scores = np.resize(self._scores, capacity)
+            self._out_degree = np.resize(self._out_degree, capacity)
+            self._out_degree[n_old:] = 0
+
+        # Нові команди стартують з 1/n, старі масштабуються пропорційно
+        if n_old:
+            self._scores[:n_old] *= n_old / n
+        self._scores[n_old:n] = 1.0 / n
+
+    def _add_edge(self, w, l, weight):
+        """Нова пара — нове ребро, повторна — лише збільшення ваги."""
+        key = (l, w)
+        m = self._pairs.get(key)
+        if m is None:
+            m = self._num_edges
+            if m == len(self._winners):
+                self._winners = np.resize(self._winners, 2 * m)
+                self._losers = np.resize(self._losers, 2 * m)
+                self._weights = np.resize(self._weights, 2 * m)
+            self._winners[m] = w
+            self._losers[m] = l
+            self._weights[m] = 0.0
+            self._pairs[key] = m
+            self._num_edges = m + 1
+        self._weights[m] += weight
+        self._out_degree[l] += weight
+
+    def _matvec(self, scores):
+        m = self._num_edges
+        winners = self._winners[:m]
+        losers = self._losers[:m]
+        out_degree = self._out_degree[losers]
+        shares = np.divide(scores[losers] * self._weights[:m], out_degree,
+                           out=np.zeros(m), where=~dangling_mask(out_degree))
+        return np.bincount(winners, weights=shares, minlength=len(scores))
+
+    def add_match(self, winner, loser, weight=1.0, solve=True):
+        """
+        Додає матч у граф; повторний матч пари збільшує вагу її ребра.
+        Повертає StepStats цього кроку.
+        """
+        n_old = len(self.teams)
+        new_teams = []
+        w = self._intern(winner, new_teams)
+        l = self._intern(loser, new_teams)
+        if new_teams:
+            self._resize_teams(n_old)
+
+        self._add_edge(w, l, weight)
+        self.num_matches += 1
+        if solve:
+            stats = self.solve(new_teams)
+        else:
+            stats = StepStats(self.num_matches, 0, 0.0, 0.0, new_teams)
+            self.history.append(stats)
+        return stats
+
+    def extend(self, teams, winners, losers, weights=None, solve=True):
+        """
+        Додає порцію матчів одним викликом (векторизовано).
+        winners/losers — індекси в teams (як у MatchTable), weights — ваги матчів.
+        """
+        n_old = len(self.teams)
+        new_teams = []
+        ids = np.fromiter((self._intern(t, new_teams) for t in teams),
+                          dtype=np.int64, count=len(teams))
+        if new_teams:
+            self._resize_teams(n_old)
+
+        w = ids[np.asarray(winners, dtype=np.int64)]
+        l = ids[np.asarray(losers, dtype=np.int64)]
+        match_weights = (np.ones(len(w)) if weights is None
+                         else np.asarray(weights, dtype=np.float64))
+        e_w, e_l, sums = aggregate_edges(w, l, len(self.teams), match_weights)
+
+        # Нові пари отримують ребра в кінці, повторні лише збільшують вагу
+        pos = np.fromiter((self._pairs.get(key, -1) for key in zip(e_l.tolist(), e_w.tolist())),
+                          dtype=np.int64, count=len(e_w))
+        new = pos < 0
+        m = self._num_edges
+        needed = m + int(new.sum())
+        if needed > len(self._winners):
+            capacity = max(needed, 2 * len(self._winners))
+            self._winners = np.resize(self._winners, capacity)
+            self._losers = np.resize(self._losers, capacity)
+            self._weights = np.resize(self._weights, capacity)
+        pos[new] = np.arange(m, needed)
+        self._winners[pos[new]] = e_w[new]
+        self._losers[pos[new]] = e_l[new]
+        self._weights[pos[new]] = 0.0
+        self._pairs.update(zip(zip(e_l[new].tolist(), e_w[new].tolist()), pos[new].tolist()))
+        self._num_edges = needed
+
+        self._weights[pos] += sums
+        self._out_degree[:len(self.teams)] += np.bincount(l, weights=match_weights,
+                                                          minlength=len(self.teams))
+        self.num_matches += len(w)
+
+        if solve:
+            return self.solve(new_teams)
+        stats = StepStats(self.num_matches, 0, 0.0, 0.0, new_teams)
+        self.history.append(stats)
+        return stats
+
+    def solve(self, new_teams=()):
+        """Доводить поточний вектор до збіжності з теплого старту."""
+        n = len(self.teams)
+        start = time.perf_counter()
+        if n == 0:
+            scores, iterations, delta = np.zeros(0), 0, 0.0
+        else:
+            dangling = np.flatnonzero(dangling_mask(self._out_degree[:n]))
+            scores, iterations, delta = converge(
+                self._matvec, dangling, self._scores[:n].copy(),
+                self.damping, self.epsilon)
+            self._scores[:n] = scores
+
+        stats = StepStats(self.num_matches, iterations, float(delta),
+                          time.perf_counter() - start, list(new_teams))
+        self.history.append(stats)
+        return stats
@@ -0,0 +1,124 @@
+'''
+Розсування вузлів, що перекриваються.
+
+Для невеликої кількості команд пари шукаються numpy-бродкастингом,
+для великої — через KD-дерево (лише сусіди на відстані перекриття).
+Ітерації зупиняються, щойно перекриттів не лишилося.
+'''
+import numpy as np
+from scipy.spatial import cKDTree
+
+from implementation.profiler import count, timed
+
+
+BROADCAST_LIMIT = 64
+
+# Перекриття, менші за це (у пікселях), вважаються розв'язаними
+OVERLAP_TOL = 1e-3
+
+
+def _overlapping_pairs(pos, radii, padding):
+    """Пари (i, j), i < j, кола яких ближчі за r_i + r_j + padding."""
+    n = len(pos)
+    if n <= BROADCAST_LIMIT:
+        diff = pos[None, :, :] - pos[:, None, :]
+        dist = np.hypot(diff[..., 0], diff[..., 1])
+        min_dist = radii[:, None] + radii[None, :] + padding
+        close = (dist < min_dist - OVERLAP_TOL) & (dist > 0)
+        i, j = np.nonzero(np.triu(close, k=1))
+        return i, j
+
+    tree = cKDTree(pos)
+    pairs = tree.query_pairs(2 * radii.max() + padding, output_type="ndarray")
+    if len(pairs) == 0:
+        return pairs[:, 0], pairs[:, 1]
+    i, j = pairs[:, 0], pairs[:, 1]
+    dist = np.hypot(*(pos[j] - pos[i]).T)
+    keep = (dist < radii[i] + radii[j] + padding - OVERLAP_TOL) & (dist > 0)
+    return i[keep], j[keep]
+
+
+@timed("layout.resolve_collisions")
+def resolve_overlaps(pos, radii, padding=8.0, iterations=60):
+    """
+    Розсуває кола: pos — масив (n, 2), radii — (n,).
+    Повертає (нові позиції, кількість виконаних ітерацій).
+    """
+    pos = np.array(pos, dtype=np.float64)
+    radii = np.asarray(radii, dtype=np.float64)
+    if len(pos) < 2:
+        return pos, 0
+
+    for it in range(iterations):
+        i, j = _overlapping_pairs(pos, radii, padding)
+        if len(i) == 0:
+            count("layout.iterations", it)
+            return pos, it
+
+        diff = pos[j] - pos[i]
+        dist = np.hypot(diff[:, 0], diff[:, 1])
+        overlap = (radii[i] + radii[j] + padding - dist) * 0.5
+        correction = diff * (overlap / dist)[:, None]
+
+        delta = np.zeros_like(pos)
+        np.add.at(delta, i, -correction)
+        np.add.at(delta, j, correction)
+        pos += delta
+
+    count("layout.iterations", iterations)
+    return pos, iterations
+
+
+class CollisionResolver:
+    """
+    Розсування з теплим стартом: команди, чия цільова позиція не змінилася
+    з попереднього кадру, стартують з уже розсунутих координат.
+    """
+
+    def __init__(self, padding=8.0, iterations=60, tol=1e-6):
+        self.padding = padding
+        self.iterations = iterations
+        self.tol = tol
+        self.last_iterations = 0
+        self._index = {}
+        # Ціль і результат попереднього кадру за ID команди (NaN — не було в кадрі)
+        self._targets = np.zeros((0, 2))
+        self._resolved = np.zeros((0, 2))
+
+    def resolve_ids(self, ids, targets, radii):
+        """
+        ids — ID команд (сталі між кадрами), targets — цільові позиції (n, 2),
+        radii — (n,). Повертає розсунуті позиції (n, 2).
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.float64).reshape(-1, 2)
+        if len(ids) == 0:
+            return np.zeros((0, 2))
+
+        size = int(ids.max()) + 1
+        if size > len(self._targets):
+            grow = np.full((max(size, 2 * len(self._targets)) - len(self._targets), 2), np.nan)
+            self._targets = np.concatenate((self._targets, grow))
+            self._resolved = np.concatenate((self._resolved, grow))
+
+        # NaN у попередній цілі дає False — такі команди стартують з цілі
+        same = np.abs(self._targets[ids] - targets).sum(axis=1) < self.tol
+        start = np.where(same[:, None], self._resolved[ids], targets)
+        pos, self.last_iterations = resolve_overlaps(start, radii, self.padding, self.iterations)
+
+        self._targets[:] = np.nan
+        self._targets[ids] = targets
+        self._resolved[ids] = pos
+        return pos
+
+    def resolve(self, coords, radii):
+        """coords/radii — словники {team: ...}; повертає {team: np.array([x, y])}."""
+        teams = list(coords.keys())
+        if not teams:
+            return {}
+        ids = np.fromiter((self._index.setdefault(t, len(self._index)) for t in teams),
+                          dtype=np.int64, count=len(teams))
+        targets = np.array([coords[t] for t in teams], dtype=np.float64)
+        r = np.array([radii[t] for t in teams])
+        pos = self.resolve_ids(ids, targets, r)
+        return {t: pos[k].copy() for k, t in enumerate(teams)}
@@ -0,0 +1,155 @@
+'''
+Живий режим: стеження за CSV, до якого дописуються матчі.
+
+Файл опитується за розміром і mtime (без залежності від inotify),
+читаються лише нові байти після останнього повного рядка (останній рядок
+без \n береться, коли файл не змінювався tail_quiet секунд), а матчі
+додаються в IncrementalPageRank і розв'язуються одним теплим стартом
+на всю порцію. Історія не перечитується і не перераховується з нуля;
+якщо файл обрізали або підмінили, стан будується заново.
+'''
+import io
+import os
+import threading
+import time
+
+from implementation.incremental import IncrementalPageRank
+from implementation.loader import load_matches
+from implementation.standings import StandingsIndex
+
+
+class LiveStandings:
+    """
+    Рейтинг, що слідує за файлом. poll() підхоплює нові рядки,
+    start() робить це у фоновому потоці кожні poll_interval секунд.
+    version збільшується після кожного оновлення рейтингу.
+    """
+
+    def __init__(self, path, damping=0.85, epsilon=1e-8, margin=False, poll_interval=0.25,
+                 tail_quiet=2.0):
+        self.path = path
+        self.damping = damping
+        self.epsilon = epsilon
+        self.margin = margin
+        self.poll_interval = poll_interval
+        self.tail_quiet = tail_quiet
+
+        self.version = 0
+        self.updated_at = None
+        self.last_latency = None
+        self.error = None
+
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._thread = None
+        self._reset()
+
+    def _reset(self):
+        self.ranking = IncrementalPageRank(self.damping, self.epsilon)
+        self._offset = 0
+        self._tail = b""
+        self._file_id = None
+
+    @property
+    def num_matches(self):
+        return self.ranking.num_matches
+
+    def _read_new(self):
+        """
+        Нові повні рядки з файлу (bytes), час зміни файлу і стан читання
+        (offset, tail) після них. Сам стан не змінюється: poll() фіксує його
+        лише після успішного розбору, тож помилка не губить рядки.
+        """
+        st = os.stat(self.path)
+        file_id = (st.st_dev, st.st_ino)
+        if self._file_id is not None and (file_id != self._file_id or st.st_size < self._offset):
+            # Файл обрізано або замінено — починаємо спочатку
+            with self._lock:
+                self._reset()
+        self._file_id = file_id
+
+        data = b""
+        if st.st_size > self._offset:
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read(st.st_size - self._offset)
+        offset = self._offset + len(data)
+
+        data = self._tail + data
+        cut = data.rfind(b"\n") + 1
+        tail = data[cut:]
+        if tail and offset == st.st_size and time.time() - st.st_mtime >= self.tail_quiet:
+            # Файл не змінювався tail_quiet секунд — рядок без \n завершений
+            return data + b"\n", st.st_mtime, offset, b""
+        return data[:cut], st.st_mtime, offset, tail
+
+    def poll(self):
+        """Одна перевірка файлу; повертає кількість нових матчів."""
+        t0 = time.time()
+        chunk, mtime, offset, tail = self._read_new()
+        if not chunk.strip():
+            self._offset, self._tail = offset, tail
+            return 0
+
+        table = load_matches(io.BytesIO(chunk))
+        weights = table.match_weights(margin=self.margin)
+
+        with self._changed:
+            self.ranking.extend(table.teams, table.winners, table.losers, weights)
+            self._offset, self._tail = offset, tail
+
+            self.version += 1
+            self.updated_at = time.time()
+            # Для першого зчитування mtime — давній, тож рахуємо лише обробку
+            self.last_latency = self.updated_at - (mtime if self.version > 1 else t0)
+            self._changed.notify_all()
+        return len(table)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+                self.error = None
+            except (OSError, ValueError) as e:
+                self.error = str(e)
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        """Запускає опитування у фоновому потоці (ідемпотентно)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def wait(self, version, timeout=None):
+        """Чекає, доки version стане більшою за задану; повертає поточну."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version > version, timeout)
+            return self.version
+
+    def snapshot(self):
+        """
+        Узгоджений знімок стану: (version, teams, scores, (winners, losers, weights)).
+        Масиви — копії, тож їх можна читати без блокування.
+        """
+        with self._lock:
+            ranking = self.ranking
+            teams = list(ranking.teams)
+            winners, losers, weights = (a.copy() for a in ranking.edges())
+            return self.version, teams, ranking.scores.copy(), (winners, losers, weights)
+
+    def scores_dict(self):
+        with self._lock:
+            return self.ranking.scores_dict()
+
+    def top(self, k=10):
+        """k найкращих команд: [(team, score), ...]."""
+        with self._lock:
+            return StandingsIndex(self.ranking.teams, self.ranking.scores).top(k)
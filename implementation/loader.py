@@ -0,0 +1,185 @@
+'''
+Потокове читання CSV з матчами.
+
+Файл читається частинами, а назви команд інтернуються у щільні int32 ID,
+тож пам'ять залежить від кількості команд і матчів, а не від кількості
+Python-рядків. Обробляються BOM, заголовок winner,loser / winner,looser,
+пробіли навколо назв та Unicode. Необов'язкова третя числова колонка —
+вага матчу (наприклад, різниця в рахунку).
+'''
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from implementation.pagerank import MatchGraph
+from implementation.profiler import count, timed
+
+
+HEADER_NAMES = {"winner", "loser", "looser", "margin", "weight"}
+
+
+class MatchTable:
+    """
+    Матчі турніру: teams[i] — назва команди з ID i,
+    winners/losers — int32 ID переможця і переможеного для кожного матчу,
+    weights — float32 вага матчу з третьої колонки CSV або None.
+    ID видаються в порядку першої появи команди.
+    """
+
+    def __init__(self, teams, winners, losers, digest=None, weights=None):
+        self.teams = teams
+        self.winners = winners
+        self.losers = losers
+        self.weights = weights
+        self.digest = digest
+
+    def __len__(self):
+        return len(self.winners)
+
+    @property
+    def num_teams(self):
+        return len(self.teams)
+
+    def pairs(self, stop=None):
+        """Пари (winner, loser) назвами для перших stop матчів."""
+        teams = self.teams
+        for w, l in zip(self.winners[:stop].tolist(), self.losers[:stop].tolist()):
+            yield teams[w], teams[l]
+
+    def match_weights(self, margin=False, half_life=None, stop=None):
+        """
+        Ваги перших stop матчів: margin — брати вагу з CSV,
+        half_life — експоненційне згасання (вага старішого на half_life матчів удвічі менша).
+        None, якщо всі ваги одиничні.
+        """
+        m = len(self.winners[:stop])
+        weights = None
+        if margin and self.weights is not None:
+            weights = np.asarray(self.weights[:stop], dtype=np.float64)
+        if half_life:
+            # Вік відносно найновішого матчу (його вага — 1)
+            age = np.arange(m - 1, -1, -1, dtype=np.float64)
+            decay = np.exp2(-age / half_life)
+            weights = decay if weights is None else weights * decay
+            # Субнормальні ваги дають нескінченні 1 / out_degree — такі матчі відкидаються
+            weights[weights < np.finfo(np.float64).tiny] = 0.0
+        return weights
+
+    def graph(self, stop=None, margin=False, half_life=None):
+        """MatchGraph (зважений мультиграф) для перших stop матчів."""
+        return MatchGraph(self.teams, self.winners[:stop], self.losers[:stop],
+                          self.match_weights(margin, half_life, stop))
+
+    def fingerprint(self):
+        """Хеш вмісту: однакові матчі дають однаковий ключ."""
+        if self.digest is not None:
+            return self.digest
+        h = hashlib.blake2b(digest_size=16)
+        h.update("\n".join(self.teams).encode("utf-8"))
+        h.update(self.winners.tobytes())
+        h.update(self.losers.tobytes())
+        if self.weights is not None:
+            h.update(self.weights.tobytes())
+        return h.hexdigest()
+
+
+def _is_header(row):
+    return {str(v).strip().lower() for v in row} - {""} <= HEADER_NAMES
+
+
+def _count_columns(source, encoding):
+    """Кількість полів у першому непорожньому рядку; файловий об'єкт повертається на початок."""
+    pos = source.tell() if hasattr(source, "tell") else None
+    try:
+        head = pd.read_csv(source, header=None, nrows=1, dtype=str,
+                           keep_default_na=False, encoding=encoding)
+    except pd.errors.EmptyDataError:
+        return 2
+    finally:
+        if pos is not None:
+            source.seek(pos)
+    return head.shape[1]
+
+
+@timed("csv.parse")
+def load_matches(source, chunksize=500_000, encoding="utf-8-sig", progress=None):
+    """
+    Зчитує CSV (шлях або файловий об'єкт) частинами по chunksize рядків.
+    Перші дві колонки — Winner, Loser, третя (необов'язкова) — вага матчу
+    (від'ємна чи нескінченна — ValueError); заголовок необов'язковий. Повертає MatchTable.
+    progress(matches) викликається після кожної частини; виняток з нього
+    перериває зчитування.
+    """
+    index = {}
+    teams = []
+    winners_parts, losers_parts, weights_parts = [], [], []
+    has_weights = False
+
+    # Кількість колонок визначається за першим рядком: третя — вага матчу
+    num_columns = min(_count_columns(source, encoding), 3)
+    if num_columns < 2:
+        raise ValueError("CSV must have at least 2 columns (Winner, Loser)")
+    columns = list(range(num_columns))
+    reader = pd.read_csv(source, header=None, names=columns, usecols=columns,
+                         dtype=str, keep_default_na=False, skip_blank_lines=True,
+                         encoding=encoding, chunksize=chunksize)
+
+    first = True
+    with reader:
+        for chunk in reader:
+            if first:
+                first = False
+                if len(chunk) and _is_header(chunk.iloc[0]):
+                    chunk = chunk.iloc[1:]
+                if len(chunk) and (chunk[1] == "").all():
+                    raise ValueError("CSV must have at least 2 columns (Winner, Loser)")
+
+            w = chunk[0].str.strip().to_numpy()
+            l = chunk[1].str.strip().to_numpy()
+            if num_columns > 2:
+                weight = pd.to_numeric(chunk[2], errors="coerce").to_numpy(dtype=np.float32)
+                # Нечислова комірка — вага за замовчуванням, але число має бути придатним
+                bad = np.flatnonzero(np.isinf(weight) | (weight < 0))
+                if len(bad):
+                    row = chunk.index[bad[0]]
+                    raise ValueError(f"Вага матчу має бути скінченним невід'ємним числом "
+                                     f"(рядок {row + 1}: '{chunk[2].iloc[bad[0]]}')")
+            else:
+                weight = np.full(len(chunk), np.nan, dtype=np.float32)
+            valid = (w != "") & (l != "")
+            if not valid.all():
+                w, l, weight = w[valid], l[valid], weight[valid]
+            if len(w) == 0:
+                continue
+
+            known = ~np.isnan(weight)
+            has_weights = has_weights or bool(known.any())
+            weights_parts.append(np.where(known, weight, np.float32(1.0)))
+
+            # Чергуємо winner/loser, щоб ID відповідали порядку появи в матчах
+            names = np.empty(2 * len(w), dtype=object)
+            names[0::2] = w
+            names[1::2] = l
+            codes, uniques = pd.factorize(names)
+
+            lookup = np.empty(len(uniques), dtype=np.int32)
+            for i, name in enumerate(uniques):
+                idx = index.get(name)
+                if idx is None:
+                    idx = len(teams)
+                    index[name] = idx
+                    teams.append(name)
+                lookup[i] = idx
+
+            ids = lookup[codes]
+            winners_parts.append(ids[0::2].copy())
+            losers_parts.append(ids[1::2].copy())
+            if progress is not None:
+                progress(sum(len(part) for part in winners_parts))
+
+    winners = np.concatenate(winners_parts) if winners_parts else np.zeros(0, dtype=np.int32)
+    losers = np.concatenate(losers_parts) if losers_parts else np.zeros(0, dtype=np.int32)
+    weights = np.concatenate(weights_parts) if has_weights else None
+    count("csv.matches", len(winners))
+    return MatchTable(teams, winners, losers, weights=weights)
@@ -0,0 +1,217 @@
+'''
+Спільний рушій PageRank для web_app, visual і CLI.
+
+Граф будується один раз у розріджену CSR-матрицю переходів
+(рядок = переможець, стовпець = переможений), а кожна ітерація —
+це одне векторизоване множення матриці на вектор.
+'''
+import time
+
+import numpy as np
+from scipy import sparse
+
+from implementation.profiler import count, gauge, timed
+
+
+def aggregate_edges(winners, losers, n, weights=None):
+    """
+    Зливає повторні пари (winner, loser) одним сортуванням за ключем winner*n + loser.
+    Повертає (winners, losers, counts), впорядковані як рядки CSR;
+    якщо задано weights, counts — сума ваг матчів пари.
+    """
+    size = max(n, 1)
+    keys = (np.asarray(winners, dtype=np.int64) * size
+            + np.asarray(losers, dtype=np.int64))
+    if len(keys) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty if weights is None else np.zeros(0)
+
+    if weights is None:
+        keys = np.sort(keys)
+    else:
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    if weights is None:
+        counts = np.diff(np.append(starts, len(keys)))
+    else:
+        counts = np.add.reduceat(np.asarray(weights, dtype=np.float64)[order], starts)
+    winners, losers = np.divmod(keys[starts], size)
+    return winners, losers, counts
+
+
+def dangling_mask(out_degree):
+    """
+    Команди без поразок: нульова, субнормальна чи нескінченна сума ваг поразок
+    (1 / out_degree тоді не скінченне). Спільне для всіх рушіїв.
+    """
+    out_degree = np.asarray(out_degree)
+    return ~(np.isfinite(out_degree) & (out_degree >= np.finfo(np.float64).tiny))
+
+
+class MatchGraph:
+    """
+    Граф турніру у вигляді розрідженої матриці (зважений мультиграф).
+    Ребро йде від переможеного до переможця (Loser pays Winner);
+    вага ребра — кількість матчів пари або сума ваг цих матчів.
+    """
+
+    @timed("graph.build")
+    def __init__(self, teams, winners, losers, weights=None):
+        self.teams = list(teams)
+        self.index = {t: i for i, t in enumerate(self.teams)}
+        n = len(self.teams)
+
+        # Повторні матчі між парою зливаються в одне ребро з вагою
+        winners, losers, counts = aggregate_edges(winners, losers, n, weights)
+
+        self.winners = winners.astype(np.int32)
+        self.losers = losers.astype(np.int32)
+        self.weights = counts.astype(np.float64)
+
+        self.out_degree = np.bincount(self.losers, weights=self.weights, minlength=n)
+        self.dangling = dangling_mask(self.out_degree)
+        # Індекси команд без поразок: сума їхньої маси — один take() за ітерацію
+        self.dangling_index = np.flatnonzero(self.dangling)
+
+        coef = np.zeros(len(self.weights))
+        np.divide(self.weights, self.out_degree[self.losers], out=coef,
+                  where=~self.dangling[self.losers])
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.winners, minlength=n), out=indptr[1:])
+        self.matrix = sparse.csr_matrix((coef, self.losers, indptr), shape=(n, n))
+
+    def __len__(self):
+        return len(self.teams)
+
+    @property
+    def num_edges(self):
+        return len(self.winners)
+
+
+def build_graph(matches, teams=None):
+    """
+    Будує MatchGraph зі списку пар (winner, loser).
+    teams — необов'язковий набір команд (задає порядок і команди без матчів).
+    """
+    index = {}
+    names = []
+    if teams is not None:
+        for t in teams:
+            if t not in index:
+                index[t] = len(names)
+                names.append(t)
+
+    winners, losers = [], []
+    for w, l in matches:
+        for t in (w, l):
+            if t not in index:
+                index[t] = len(names)
+                names.append(t)
+        winners.append(index[w])
+        losers.append(index[l])
+
+    return MatchGraph(names, winners, losers)
+
+
+def teleport_vector(teams, prior):
+    """
+    Нормований вектор телепорту з апріорних ваг {team: weight}
+    (наприклад, рейтинг минулого сезону). Командам без ваги дістається
+    середня вага, тож новачки не опиняються в нулі.
+    """
+    known = [prior[t] for t in teams if t in prior]
+    if any(w < 0 for w in known):
+        raise ValueError("Ваги телепорту мають бути невід'ємними")
+    default = float(np.mean(known)) if known else 1.0
+    vector = np.fromiter((prior.get(t, default) for t in teams), dtype=np.float64,
+                         count=len(teams))
+    total = vector.sum()
+    if total <= 0:
+        raise ValueError("Сума ваг телепорту має бути додатною")
+    return vector / total
+
+
+def converge(matvec, dangling, scores, damping=0.85, epsilon=1e-8,
+             max_iter=None, deadline=None, teleport=None):
+    """
+    Ітерує scores до збіжності (L1-зміна < epsilon).
+    matvec(scores) — внесок переможених переможцям, dangling — індекси (або маска)
+    команд без поразок. teleport — нормований вектор персоналізації (None — рівномірний);
+    туди ж іде маса команд без поразок.
+    max_iter / deadline (time.perf_counter()) обмежують роботу: тоді повертається
+    останнє наближення; нескінченна чи NaN-зміна теж зупиняє ітерації.
+    Повертає (scores, iterations, delta).
+    """
+    n = len(scores)
+    dangling = np.asarray(dangling)
+    if dangling.dtype == bool:
+        dangling = np.flatnonzero(dangling)
+    iterations = 0
+
+    while True:
+        # Телепорт і маса команд без поразок — один скаляр на ітерацію
+        jump = (1 - damping) + damping * scores.take(dangling).sum()
+        new_scores = damping * matvec(scores)
+        if teleport is None:
+            new_scores += jump / n
+        else:
+            new_scores += jump * teleport
+
+        delta = np.abs(new_scores - scores).sum()
+        scores = new_scores
+        iterations += 1
+
+        if delta < epsilon or not np.isfinite(delta):
+            break
+        if max_iter is not None and iterations >= max_iter:
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+
+    scores /= scores.sum()
+    count("pagerank.iterations", iterations)
+    gauge("pagerank.delta", delta)
+    return scores, iterations, delta
+
+
+def power_iteration(graph, damping=0.85, epsilon=1e-8, start=None,
+                    max_iter=None, deadline=None, teleport=None):
+    """
+    Степеневий метод на CSR-матриці.
+    teleport — нормований вектор персоналізації (див. teleport_vector).
+    Повертає (scores, iterations, delta).
+    """
+    n = len(graph)
+    if n == 0:
+        return np.zeros(0), 0, 0.0
+
+    if start is not None:
+        scores = np.asarray(start, dtype=np.float64) / np.sum(start)
+    elif teleport is not None:
+        scores = np.array(teleport, dtype=np.float64)
+    else:
+        scores = np.full(n, 1.0 / n)
+
+    return converge(graph.matrix.dot, graph.dangling_index, scores, damping, epsilon,
+                    max_iter, deadline, teleport)
+
+
+def pagerank(graph, damping=0.85, epsilon=1e-8, teleport=None):
+    """PageRank-вектор для графа (сума = 1)."""
+    scores, _, _ = power_iteration(graph, damping, epsilon, teleport=teleport)
+    return scores
+
+
+def rank_matches(matches, teams=None, damping=0.85, epsilon=1e-8, prior=None):
+    """
+    Розраховує PageRank для списку матчів.
+    prior — необов'язкові апріорні ваги {team: weight} для телепорту.
+    Повертає {team: score}.
+    """
+    graph = build_graph(matches, teams)
+    teleport = None if prior is None else teleport_vector(graph.teams, prior)
+    scores = pagerank(graph, damping, epsilon, teleport)
+    return dict(zip(graph.teams, scores.tolist()))
@@ -0,0 +1,135 @@
+'''
+Фонова обробка завантаженого CSV для веб-дашборду.
+
+Файл проходить етапи parse → rank → layout → replay у робочому потоці,
+тож запуск Streamlit-скрипта не чекає на важкі обчислення. Після кожного
+етапу доступні часткові результати: таблиця лідерів — після rank,
+граф підсумкового стану — після layout, повтор — поки будується replay.
+Застаріла задача (новий файл, інша вага матчів) скасовується між
+частинами роботи.
+'''
+import io
+import threading
+import time
+
+import numpy as np
+
+from implementation.attributes import WEB_STYLE, VisualAttributes
+from implementation.components import rank_components
+from implementation.loader import load_matches
+from implementation.pagerank import aggregate_edges
+from implementation.result_cache import default_cache
+from implementation.timeline import ReplayTimeline
+
+
+STAGES = ("parse", "rank", "layout", "replay", "done")
+
+
+class Cancelled(Exception):
+    """Задачу скасовано — її результат уже нікому не потрібен."""
+
+
+class UploadJob:
+    """
+    Обробка одного файлу. stage — поточний етап зі STAGES,
+    fraction — частка виконаного в межах етапу (0..1).
+    table, scores, layout, timeline з'являються по мірі завершення етапів.
+    """
+
+    def __init__(self, data, use_margin=False, table=None):
+        """
+        data — байти CSV; table — вже розібрана MatchTable того самого файлу
+        (етап parse тоді пропускається, наприклад при зміні use_margin).
+        """
+        self.data = data
+        self.use_margin = use_margin
+        self.table = table
+        self.scores = None
+        self.layout = None
+        self.edges = None
+        self.timeline = None
+        self.error = None
+
+        self.stage = STAGES[0]
+        self.fraction = 0.0
+        self.timings = {}
+        self._cancelled = threading.Event()
+        self._thread = None
+
+    def reached(self, stage):
+        """Чи завершено етап stage (його результат уже доступний)."""
+        return STAGES.index(self.stage) > STAGES.index(stage)
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        if self.timeline is not None:
+            self.timeline.cancel()
+
+    def _check(self):
+        if self._cancelled.is_set():
+            raise Cancelled()
+
+    def _enter(self, stage):
+        self._check()
+        self.stage = stage
+        self.fraction = 0.0
+        return time.perf_counter()
+
+    def _parse(self):
+        buf = io.BytesIO(self.data)
+        size = max(len(self.data), 1)
+
+        def progress(matches):
+            self._check()
+            self.fraction = min(buf.tell() / size, 1.0)
+
+        self.table = load_matches(buf, progress=progress)
+        if len(self.table) == 0:
+            raise ValueError("CSV has no matches (Winner, Loser)")
+
+    def _rank(self):
+        table = self.table
+        result = rank_components(table.graph(margin=self.use_margin))
+        self.scores = dict(zip(table.teams, result.scores.tolist()))
+
+    def _layout(self):
+        table = self.table
+        vals = np.fromiter(self.scores.values(), dtype=np.float64, count=len(self.scores))
+        attrs = VisualAttributes(vals, WEB_STYLE)
+        self.layout = (attrs.radii, attrs.positions)
+        self._check()
+        names = np.array(table.teams, dtype=object)
+        e_w, e_l, counts = aggregate_edges(table.winners, table.losers, table.num_teams)
+        self.edges = (names[e_w], names[e_l], counts)
+
+    def _replay(self):
+        weights = self.table.match_weights(margin=self.use_margin)
+        self.timeline = ReplayTimeline(self.table, weights=weights, cache=default_cache())
+        if self._cancelled.is_set():
+            self.timeline.cancel()
+        self.timeline.build()
+
+    def run(self):
+        steps = [("rank", self._rank), ("layout", self._layout), ("replay", self._replay)]
+        if self.table is None:
+            steps.insert(0, ("parse", self._parse))
+        try:
+            for stage, step in steps:
+                start = self._enter(stage)
+                step()
+                self.timings[stage] = time.perf_counter() - start
+            self._enter("done")
+        except Cancelled:
+            pass
+        except Exception as e:
+            self.error = e
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+        return self
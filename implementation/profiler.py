@@ -0,0 +1,245 @@
+'''
+Вбудоване профілювання: іменовані таймери (span) і лічильники.
+
+    from implementation import profiler
+
+    with profiler.profiling() as prof:
+        ...                                  # код з інструментованими викликами
+    print(prof.report())
+    prof.write_trace("trace.json")           # chrome://tracing, Perfetto, speedscope
+
+Поки профілювання вимкнене, span() повертає спільний порожній контекст,
+а count()/gauge() лише перевіряють одну глобальну змінну, тож накладні
+витрати в гарячих шляхах майже нульові. Профайлер один на процес:
+увімкнений, він записує роботу всіх потоків (у тому числі фонових).
+'''
+import functools
+import json
+import os
+import threading
+import time
+
+
+_active = None
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "args", "start")
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.profiler._record(self.name, self.start, end - self.start, self.args)
+        return False
+
+    def set(self, **args):
+        """Додає аргументи до запису (видно в trace-event і звіті)."""
+        self.args.update(args)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Profiler:
+    """
+    Записи таймерів (name, start, duration, thread, args), лічильники
+    (сума) і датчики (останнє значення). Час — у наносекундах perf_counter.
+    """
+
+    def __init__(self, max_events=1_000_000):
+        self.max_events = max_events
+        self.events = []
+        self.counters = {}
+        self.gauges = {}
+        self.dropped = 0
+        self.origin = time.perf_counter_ns()
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def _record(self, name, start, duration, args):
+        with self._lock:
+            total = self._totals.get(name)
+            if total is None:
+                self._totals[name] = [1, duration, duration]
+            else:
+                total[0] += 1
+                total[1] += duration
+                total[2] = max(total[2], duration)
+            # Сумарна статистика — завжди, окремі події — до max_events
+            if len(self.events) < self.max_events:
+                self.events.append((name, start, duration, threading.get_ident(), args or None))
+            else:
+                self.dropped += 1
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    def reset(self):
+        with self._lock:
+            self.events = []
+            self.counters = {}
+            self.gauges = {}
+            self.dropped = 0
+            self._totals = {}
+            self.origin = time.perf_counter_ns()
+
+    def summary(self):
+        """[{"name", "calls", "total_ms", "mean_ms", "max_ms"}, ...] за спаданням total_ms."""
+        with self._lock:
+            totals = {name: list(t) for name, t in self._totals.items()}
+        rows = [{"name": name, "calls": calls, "total_ms": total / 1e6,
+                 "mean_ms": total / calls / 1e6, "max_ms": longest / 1e6}
+                for name, (calls, total, longest) in totals.items()]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def report(self):
+        """Текстова таблиця таймерів, лічильників і датчиків."""
+        lines = [f"{'Таймер':<32} {'викликів':>9} {'всього, мс':>12} {'середнє':>10} {'макс':>10}"]
+        for row in self.summary():
+            lines.append(f"{row['name']:<32} {row['calls']:>9} {row['total_ms']:>12.2f} "
+                         f"{row['mean_ms']:>10.3f} {row['max_ms']:>10.2f}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:<32} {value:>9}")
+        for name, value in sorted(self.gauges.items()):
+            lines.append(f"{name:<32} {value:>9.3g}")
+        if self.dropped:
+            lines.append(f"(не записано {self.dropped} подій понад max_events)")
+        return "\n".join(lines)
+
+    def trace_events(self):
+        """Словник у форматі Trace Event (Chrome tracing / Perfetto / speedscope)."""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+        trace = []
+        threads = {}
+        for name, start, duration, thread, args in events:
+            tid = threads.setdefault(thread, len(threads) + 1)
+            event = {"name": name, "cat": name.split(".", 1)[0], "ph": "X", "pid": pid,
+                     "tid": tid, "ts": (start - self.origin) / 1e3, "dur": duration / 1e3}
+            if args:
+                event["args"] = {k: _jsonable(v) for k, v in args.items()}
+            trace.append(event)
+
+        end = max(((start + duration - self.origin) / 1e3
+                   for _, start, duration, _, _ in events), default=0.0)
+        for name, value in {**counters, **gauges}.items():
+            trace.append({"name": name, "ph": "C", "pid": pid, "tid": 0, "ts": end,
+                          "args": {"value": _jsonable(value)}})
+        return {"traceEvents": trace, "displayTimeUnit": "ms",
+                "otherData": {"summary": self.summary(), "counters": counters,
+                              "gauges": {k: _jsonable(v) for k, v in gauges.items()}}}
+
+    def write_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.trace_events(), f, ensure_ascii=False)
+
+
+def _jsonable(value):
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def enable(profiler=None):
+    """Вмикає профілювання (новим або переданим Profiler) і повертає його."""
+    global _active
+    _active = profiler if profiler is not None else Profiler()
+    return _active
+
+
+def disable():
+    global _active
+    _active = None
+
+
+def active():
+    """Поточний Profiler або None."""
+    return _active
+
+
+class profiling:
+    """
+    Контекст, у межах якого профілювання увімкнене; повертає Profiler.
+    З enabled=False нічого не вмикає і повертає None.
+    """
+
+    def __init__(self, profiler=None, enabled=True):
+        self.profiler = profiler
+        self.enabled = enabled
+
+    def __enter__(self):
+        self._previous = _active
+        if not self.enabled:
+            return None
+        return enable(self.profiler)
+
+    def __exit__(self, *exc):
+        global _active
+        _active = self._previous
+        return False
+
+
+def span(name, **args):
+    """Таймер-контекст; без увімкненого профайлера — спільний порожній об'єкт."""
+    prof = _active
+    if prof is None:
+        return _NULL_SPAN
+    return _Span(prof, name, args)
+
+
+def timed(name):
+    """Декоратор: кожен виклик функції — таймер name."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            prof = _active
+            if prof is None:
+                return func(*args, **kwargs)
+            with _Span(prof, name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, value=1):
+    prof = _active
+    if prof is not None:
+        prof.count(name, value)
+
+
+def gauge(name, value):
+    prof = _active
+    if prof is not None:
+        prof.gauge(name, value)
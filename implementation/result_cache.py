@@ -0,0 +1,181 @@
+'''
+Дисковий кеш результатів (SQLite), спільний для web_app, CLI і visual.
+
+Ключ — хеш вмісту матчів (MatchTable.fingerprint(), для CSV це потоковий
+blake2b файлу) разом з параметрами розв'язку. Значення — набір numpy-масивів
+(.npz без стиснення) і JSON-метадані. Кеш переживає перезапуск процесу
+й контейнера, а розмір обмежено: найдавніше використані записи видаляються (LRU).
+'''
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from implementation.graph_store import cache_dir
+
+
+DEFAULT_MAX_BYTES = 512 * 2**20
+DB_NAME = "results.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    arrays BLOB NOT NULL,
+    meta TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+
+def make_key(kind, fingerprint, **params):
+    """Ключ запису: тип результату, хеш матчів і параметри (у стабільному порядку)."""
+    payload = json.dumps([kind, fingerprint, params], sort_keys=True, default=str)
+    return f"{kind}:{hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()}"
+
+
+def rank_key(fingerprint, margin=False, half_life=None, solver="auto", max_iter=1000,
+             teleport=None):
+    """Ключ рейтингу турніру: спільний для CLI, робочого простору та інших фронтендів."""
+    return make_key("rank", fingerprint, margin=margin, half_life=half_life, solver=solver,
+                    max_iter=max_iter, teleport=array_digest(teleport))
+
+
+def array_digest(array):
+    """Короткий хеш масиву (ваги матчів, вектор телепорту) для параметрів ключа."""
+    if array is None:
+        return None
+    data = np.ascontiguousarray(array)
+    return hashlib.blake2b(data.tobytes(), digest_size=8).hexdigest()
+
+
+class ResultCache:
+    """
+    SQLite-кеш результатів з LRU-витісненням за сумарним розміром.
+    Кожна операція відкриває власне з'єднання, тож кеш можна ділити між
+    потоками Streamlit і процесами-воркерами CLI. Помилки бази не фатальні:
+    get() тоді повертає None, put() нічого не робить.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or os.path.join(cache_dir(), DB_NAME)
+        self.max_bytes = max_bytes
+        self._ready = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._ready = True
+        return conn
+
+    def get(self, key):
+        """(arrays: dict, meta: dict) або None, якщо запису немає."""
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    row = conn.execute("SELECT arrays, meta FROM results WHERE key = ?",
+                                       (key,)).fetchone()
+                    if row is None:
+                        return None
+                    conn.execute("UPDATE results SET last_used = ? WHERE key = ?",
+                                 (time.time(), key))
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+
+        with np.load(io.BytesIO(row[0]), allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+        return arrays, json.loads(row[1])
+
+    def put(self, key, arrays, meta=None):
+        """Зберігає масиви й метадані; запис, більший за max_bytes, не кешується."""
+        buf = io.BytesIO()
+        np.savez(buf, **arrays)
+        blob = buf.getvalue()
+        if len(blob) > self.max_bytes:
+            return False
+
+        kind = key.split(":", 1)[0]
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (key, kind, blob, json.dumps(meta or {}), len(blob), now, now))
+                    self._evict(conn)
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute("SELECT key, size FROM results ORDER BY last_used").fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM results WHERE key = ?", stale)
+
+    def stats(self):
+        """{"entries": ..., "bytes": ...} або None, якщо база недоступна."""
+        try:
+            conn = self._connect()
+            try:
+                count, size = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+        return {"entries": count, "bytes": size}
+
+    def clear(self):
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM results")
+                conn.execute("VACUUM")
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+
+
+_DEFAULT = None
+
+
+def default_cache():
+    """
+    Спільний кеш у cache_dir() (STANDINGS_CACHE_DIR або ~/.cache/standings).
+    Розмір задається STANDINGS_RESULT_CACHE_MB; 0 вимикає кеш (повертає None).
+    """
+    global _DEFAULT
+    if _DEFAULT is None:
+        megabytes = float(os.getenv("STANDINGS_RESULT_CACHE_MB", DEFAULT_MAX_BYTES / 2**20))
+        if megabytes <= 0:
+            return None
+        try:
+            _DEFAULT = ResultCache(max_bytes=int(megabytes * 2**20))
+        except OSError:
+            return None
+    return _DEFAULT
@@ -0,0 +1,495 @@
+'''
+HTTP/JSON-сервіс рейтингів з "теплими" графами в пам'яті.
+
+Запуск:
+    python -m implementation.service data/league.csv data/cup.csv --port 8765
+
+Турніри завантажуються один раз і тримаються в пам'яті разом з вектором
+рейтингу. Нові матчі ставляться в чергу: окремий потік забирає все, що
+накопичилось, і розв'язує порцію одним теплим стартом. Читачі працюють
+з незмінним знімком стану без блокувань, тож опитування сотні разів на
+секунду не заважають записам.
+
+    GET  /tournaments                              список турнірів
+    POST /tournaments          {"name", "path"?}   завантажити CSV з --data-dir або створити порожній
+    GET  /tournaments/<name>                       зведення (матчі, команди, лідер)
+    GET  /tournaments/<name>/top?k=10              k найкращих
+    GET  /tournaments/<name>/rank?team=X           місце і рейтинг команди
+    GET  /tournaments/<name>/score?team=X&step=N   рейтинг команди після N матчів
+    GET  /tournaments/<name>/standings?offset=0&limit=100[&step=N]
+    POST /tournaments/<name>/matches {"matches": [[w, l], [w, l, weight]], "wait": true}
+    POST /batch                {"queries": [{"tournament", "op", ...}, ...]}
+
+Відповіді без step мають ETag (версію знімка): повторний запит з
+If-None-Match отримує 304 без тіла.
+'''
+import argparse
+import json
+import math
+import os
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from implementation.graph_store import load_cached
+from implementation.incremental import IncrementalPageRank
+from implementation.pagerank import MatchGraph, power_iteration
+from implementation.standings import StandingsIndex
+
+
+DEFAULT_PORT = 8765
+DEFAULT_LIMIT = 100
+
+
+class Standings(StandingsIndex):
+    """
+    Незмінний знімок рейтингу на певній версії. Порядок і місця
+    рахуються ліниво, один раз на знімок, і далі лише читаються.
+    """
+
+    def __init__(self, version, matches, teams, index, scores):
+        super().__init__(teams, scores, index)
+        self.version = version
+        self.matches = matches
+
+
+class Tournament:
+    """
+    Турнір у пам'яті: інкрементальний рейтинг, черга нових матчів
+    і журнал матчів для запитів "рейтинг після N матчів".
+    """
+
+    def __init__(self, name, table=None, margin=False, damping=0.85, epsilon=1e-8):
+        self.name = name
+        self.damping = damping
+        self.epsilon = epsilon
+        self.ranking = IncrementalPageRank(damping, epsilon)
+
+        self._queue = queue.Queue()
+        self._changed = threading.Condition()
+        self._submitted = 0
+        self._applied = 0
+        # Квитки порцій, які не вдалося додати, і текст останньої помилки
+        self._failed = set()
+        self.error = None
+        self._refined = {}
+        self._refined_lock = threading.Lock()
+
+        # Журнал усіх матчів порціями (ID рейтингу) — для запитів про минулі кроки
+        self._journal = []
+
+        if table is not None and len(table):
+            self._apply(table.teams, table.winners, table.losers,
+                        table.match_weights(margin=margin))
+        self.standings = self._publish(0)
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _apply(self, teams, winners, losers, weights=None):
+        ranking = self.ranking
+        ranking.extend(teams, winners, losers, weights)
+        ids = np.fromiter((ranking.index[t] for t in teams), dtype=np.int64, count=len(teams))
+        weights = np.ones(len(winners)) if weights is None else np.asarray(weights, np.float64)
+        self._journal.append((ids[winners], ids[losers], weights))
+
+    def _publish(self, version):
+        ranking = self.ranking
+        return Standings(version, ranking.num_matches, list(ranking.teams), ranking.index,
+                         ranking.scores.copy())
+
+    def _run(self):
+        stopped = False
+        while not stopped:
+            batch = [self._queue.get()]
+            # Усе, що накопичилось за час попереднього розв'язку, — однією порцією
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            # None — сигнал close(): матчі, поставлені раніше, ще додаються
+            stopped = None in batch
+            batch = [item for item in batch if item is not None]
+            if not batch:
+                continue
+
+            standings, error = self.standings, None
+            try:
+                self._apply_batch([matches for _, matches in batch])
+                standings = self._publish(self.standings.version + 1)
+            except Exception as e:
+                # Помилка порції не зупиняє потік: її отримують ті, хто чекає
+                error = f"{type(e).__name__}: {e}"
+            with self._changed:
+                self.standings = standings
+                if error is not None:
+                    self.error = error
+                    self._failed.update(ticket for ticket, _ in batch)
+                self._applied += len(batch)
+                self._changed.notify_all()
+
+    def _apply_batch(self, batch):
+        names = {}
+        winners, losers, weights = [], [], []
+        for w, l, weight in (match for matches in batch for match in matches):
+            winners.append(names.setdefault(w, len(names)))
+            losers.append(names.setdefault(l, len(names)))
+            weights.append(weight)
+        self._apply(list(names), np.array(winners), np.array(losers), np.array(weights))
+
+    def close(self):
+        """Зупиняє потік запису після матчів, що вже стоять у черзі."""
+        self._queue.put(None)
+
+    def submit(self, matches, wait=False, timeout=None):
+        """
+        Ставить матчі [(winner, loser[, weight]), ...] у чергу.
+        З wait=True чекає, доки вони потраплять у рейтинг; повертає знімок.
+        """
+        parsed = []
+        for match in matches:
+            if not isinstance(match, (list, tuple)) or len(match) not in (2, 3):
+                raise ValueError("Матч має вигляд [winner, loser] або [winner, loser, weight]")
+            try:
+                weight = float(match[2]) if len(match) == 3 else 1.0
+            except (TypeError, ValueError):
+                raise ValueError("Вага матчу має бути числом")
+            if not math.isfinite(weight) or weight < 0:
+                raise ValueError("Вага матчу має бути скінченним невід'ємним числом")
+            parsed.append((str(match[0]).strip(), str(match[1]).strip(), weight))
+        if not parsed:
+            return self.standings
+
+        with self._changed:
+            # Квиток і місце в черзі видаються разом, щоб порядок збігався
+            self._submitted += 1
+            ticket = self._submitted
+            self._queue.put((ticket, parsed))
+        if wait:
+            with self._changed:
+                self._changed.wait_for(lambda: self._applied >= ticket, timeout)
+                if ticket in self._failed:
+                    self._failed.discard(ticket)
+                    raise RuntimeError(f"Матчі не додано: {self.error}")
+        return self.standings
+
+    def scores_at(self, step, standings=None):
+        """Вектор рейтингу активних команд після step матчів."""
+        standings = standings or self.standings
+        if not 1 <= step <= standings.matches:
+            raise IndexError(f"Крок {step} поза межами 1..{standings.matches}")
+        if step == standings.matches:
+            return standings.scores
+
+        with self._refined_lock:
+            cached = self._refined.get(step)
+        if cached is not None:
+            return cached
+        winners, losers, weights = (np.concatenate(parts)[:step]
+                                    for parts in zip(*self._journal))
+        # ID видаються в порядку появи, тож активні — перші max(ID) + 1 команд
+        n = int(max(winners.max(), losers.max())) + 1
+        graph = MatchGraph(standings.teams[:n], winners, losers, weights)
+        scores, _, _ = power_iteration(graph, self.damping, self.epsilon,
+                                       start=standings.scores[:n] / standings.scores[:n].sum())
+        with self._refined_lock:
+            if len(self._refined) >= 64:
+                self._refined.pop(next(iter(self._refined)))
+            self._refined[step] = scores
+        return scores
+
+    def standings_at(self, step):
+        current = self.standings
+        if step is None or step == current.matches:
+            return current
+        scores = self.scores_at(step, current)
+        return Standings(current.version, step, current.teams[:len(scores)], self.ranking.index,
+                         scores)
+
+    def summary(self, standings=None):
+        if standings is None:
+            standings = self.standings
+        leader = _rows(standings.page(0, 1))
+        return {"name": self.name, "version": standings.version, "matches": standings.matches,
+                "teams": len(standings), "leader": leader[0] if leader else None,
+                "pending": self._queue.qsize(), "error": self.error}
+
+
+def _int(params, name, default=None):
+    value = params.get(name)
+    if value is None:
+        if default is None:
+            raise ValueError(f"Параметр '{name}' обов'язковий")
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Параметр '{name}' має бути цілим числом")
+
+
+def _step(params):
+    return None if params.get("step") is None else _int(params, "step")
+
+
+def _team(params):
+    team = params.get("team")
+    if team is None:
+        raise ValueError("Параметр 'team' обов'язковий")
+    return str(team)
+
+
+def _rows(rows):
+    return [{"rank": rank, "team": team, "score": score} for rank, team, score in rows]
+
+
+def _team_row(standings, team):
+    idx = standings.team_id(team)
+    return {"team": team, "rank": int(standings.ranks[idx]),
+            "score": float(standings.scores[idx]), "tier": int(standings.tiers[idx]),
+            "teams": len(standings)}
+
+
+def answer(tournament, op, params, standings=None):
+    """Відповідь на один запит-читання; standings — знімок, спільний для пакета."""
+    if standings is None or params.get("step") is not None:
+        standings = tournament.standings_at(_step(params))
+    if op == "top":
+        return {"version": standings.version, "matches": standings.matches,
+                "top": _rows(standings.page(0, _int(params, "k", 10)))}
+    if op == "rank":
+        return {"version": standings.version, "matches": standings.matches,
+                **_team_row(standings, _team(params))}
+    if op == "score":
+        return {"version": standings.version, "step": standings.matches,
+                **_team_row(standings, _team(params))}
+    if op == "standings":
+        offset = max(0, _int(params, "offset", 0))
+        limit = max(0, _int(params, "limit", DEFAULT_LIMIT))
+        return {"version": standings.version, "matches": standings.matches,
+                "teams": len(standings), "offset": offset,
+                "standings": _rows(standings.page(offset, limit))}
+    if op == "summary":
+        return tournament.summary(standings)
+    raise KeyError(f"Невідомий запит '{op}'")
+
+
+class RankingService:
+    """
+    Набір турнірів, до яких звертається HTTP-обробник.
+    data_dir — тека, з якої POST /tournaments може читати CSV (None — заборонено).
+    """
+
+    def __init__(self, margin=False, damping=0.85, epsilon=1e-8, data_dir=None):
+        self.margin = margin
+        self.damping = damping
+        self.epsilon = epsilon
+        self.data_dir = None if data_dir is None else os.path.realpath(data_dir)
+        self.tournaments = {}
+        self._lock = threading.Lock()
+
+    def load(self, name, path=None):
+        table = load_cached(path) if path else None
+        tournament = Tournament(name, table, self.margin, self.damping, self.epsilon)
+        with self._lock:
+            previous = self.tournaments.get(name)
+            self.tournaments[name] = tournament
+        # Замінений турнір звільняє свій потік і граф
+        if previous is not None:
+            previous.close()
+        return tournament
+
+    def resolve(self, path):
+        """
+        Шлях до CSV з запиту: лише .csv усередині data_dir (без виходу через .. чи
+        символьні посилання), інакше ValueError.
+        """
+        if self.data_dir is None:
+            raise ValueError("Завантаження файлів вимкнене: запустіть сервіс з --data-dir")
+        full = os.path.realpath(os.path.join(self.data_dir, str(path)))
+        if os.path.commonpath([full, self.data_dir]) != self.data_dir \
+                or not full.lower().endswith(".csv"):
+            raise ValueError(f"Дозволені лише .csv-файли з теки {self.data_dir}")
+        return full
+
+    def get(self, name):
+        tournament = self.tournaments.get(name)
+        if tournament is None:
+            raise KeyError(f"Турніру '{name}' немає")
+        return tournament
+
+    def batch(self, queries):
+        """
+        Кілька запитів за один виклик. Запити до одного турніру читають
+        той самий знімок; помилка одного запиту не зриває решту.
+        """
+        snapshots = {}
+        results = []
+        for query in queries:
+            try:
+                name = query.get("tournament")
+                tournament = self.get(name)
+                if name not in snapshots:
+                    snapshots[name] = tournament.standings
+                results.append(answer(tournament, query.get("op"), query, snapshots[name]))
+            except (KeyError, ValueError, IndexError, AttributeError) as e:
+                results.append({"error": _message(e)})
+        return results
+
+
+def _message(error):
+    return error.args[0] if isinstance(error, KeyError) and error.args else str(error)
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "StandingsService/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, payload=None, etag=None):
+        body = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            data = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise ValueError("Тіло запиту має бути JSON")
+        if not isinstance(data, dict):
+            raise ValueError("Тіло запиту має бути JSON-об'єктом")
+        return data
+
+    def _route(self):
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        return parts, params
+
+    def _handle(self, action):
+        try:
+            action()
+        except KeyError as e:
+            self._send(404, {"error": _message(e)})
+        except (ValueError, IndexError, OSError) as e:
+            self._send(400, {"error": str(e)})
+        except RuntimeError as e:
+            self._send(500, {"error": str(e)})
+
+    def do_GET(self):
+        self._handle(self._get)
+
+    def do_POST(self):
+        self._handle(self._post)
+
+    def _get(self):
+        parts, params = self._route()
+        if parts == ["tournaments"]:
+            self._send(200, {"tournaments": [t.summary()
+                                             for t in list(self.service.tournaments.values())]})
+            return
+        if len(parts) not in (2, 3) or parts[0] != "tournaments":
+            raise KeyError(f"Невідомий шлях {self.path}")
+
+        tournament = self.service.get(parts[1])
+        op = parts[2] if len(parts) == 3 else "summary"
+        # Один знімок і для ETag, і для тіла: публікація між ними не розсинхронізує їх
+        snapshot = tournament.standings
+        etag = None
+        if params.get("step") is None:
+            etag = f'"{tournament.name}-{snapshot.version}"'
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, etag=etag)
+                return
+        self._send(200, answer(tournament, op, params, snapshot), etag)
+
+    def _post(self):
+        parts, _ = self._route()
+        data = self._read_json()
+        if parts == ["batch"]:
+            queries = data.get("queries")
+            if not isinstance(queries, list):
+                raise ValueError("Очікується {\"queries\": [...]}")
+            self._send(200, {"results": self.service.batch(queries)})
+        elif parts == ["tournaments"]:
+            name = data.get("name")
+            if not name:
+                raise ValueError("Параметр 'name' обов'язковий")
+            path = data.get("path")
+            tournament = self.service.load(str(name),
+                                           None if path is None else self.service.resolve(path))
+            self._send(201, tournament.summary())
+        elif len(parts) == 3 and parts[0] == "tournaments" and parts[2] == "matches":
+            tournament = self.service.get(parts[1])
+            matches = data.get("matches")
+            if not isinstance(matches, list):
+                raise ValueError("Очікується {\"matches\": [[winner, loser], ...]}")
+            wait = bool(data.get("wait", False))
+            timeout = data.get("timeout")
+            standings = tournament.submit(matches, wait=wait,
+                                          timeout=None if timeout is None else float(timeout))
+            self._send(200 if wait else 202,
+                       {"accepted": len(matches), "version": standings.version,
+                        "matches": standings.matches})
+        else:
+            raise KeyError(f"Невідомий шлях {self.path}")
+
+
+def serve(service, host="127.0.0.1", port=DEFAULT_PORT, verbose=False):
+    """Створює (але не запускає) багатопотоковий HTTP-сервер для service."""
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/JSON-сервіс рейтингів турнірів.")
+    parser.add_argument("files", nargs="*", help="CSV-файли турнірів (ім'я турніру — ім'я файлу)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--margin", action="store_true",
+                        help="Зважувати матчі різницею рахунку (3-я колонка)")
+    parser.add_argument("--data-dir", default=None,
+                        help="Тека, з якої POST /tournaments може завантажувати CSV")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Логувати кожен запит")
+    args = parser.parse_args()
+
+    service = RankingService(margin=args.margin, data_dir=args.data_dir)
+    for path in args.files:
+        name = os.path.splitext(os.path.basename(path))[0]
+        tournament = service.load(name, path)
+        print(f"Завантажено '{name}': {tournament.standings.matches} матчів, "
+              f"{len(tournament.standings.teams)} команд")
+
+    server = serve(service, args.host, args.port, args.verbose)
+    print(f"Сервіс слухає http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
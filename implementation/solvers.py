@@ -0,0 +1,275 @@
+'''
+Розв'язувачі PageRank з прискоренням збіжності.
+
+Усі методи працюють з тим самим MatchGraph і дають той самий вектор
+(з точністю epsilon), але різною ціною:
+    power         — звичайний степеневий метод (Якобі)
+    gauss_seidel  — Гаусс-Зейдель для (I - d*M) y = 1, x = y / sum(y)
+    aitken        — степеневий метод з екстраполяцією Ейткена
+    quadratic     — степеневий метод з квадратичною екстраполяцією
+    adaptive      — адаптивний PageRank: збіжні команди "заморожуються"
+    direct        — прямий розріджений розв'язок (лише для малих графів)
+    auto          — direct для малих графів, інакше quadratic
+
+На мультиграфах середнього розміру quadratic зазвичай потребує на
+чверть-третину менше ітерацій, ніж power. gauss_seidel обходить команди
+від слабших до сильніших (переможені — раніше за переможців) і виграє
+лише на майже ациклічних графах (олімпійська, швейцарська система); на
+колових турнірах (new_table.csv, table_375.csv) йому потрібно в кілька
+разів більше ітерацій, ніж power, тож auto його ніколи не обирає.
+
+Лінійна форма точна і для команд без поразок: їхня маса розподіляється
+за вектором телепорту v, тож x пропорційний (I - d*M)^{-1} v.
+'''
+import time
+from collections import namedtuple
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import spsolve, spsolve_triangular
+
+from implementation.pagerank import converge
+from implementation.profiler import gauge, span
+
+
+# components — кількість слабко зв'язних компонент (див. components.rank_components)
+RankResult = namedtuple("RankResult",
+                        ["scores", "iterations", "residual", "solver", "seconds", "converged",
+                         "components"],
+                        defaults=(1,))
+
+SOLVERS = ("auto", "power", "gauss_seidel", "aitken", "quadratic", "adaptive", "direct")
+
+# До цього розміру прямий (точний) розв'язок не повільніший за ітерації
+DIRECT_LIMIT = 200
+
+# Як часто (в ітераціях) застосовується екстраполяція
+EXTRAPOLATE_EVERY = 10
+
+
+def _step(graph, scores, damping, teleport=None):
+    """Один крок степеневого методу (scores нормовано на 1)."""
+    jump = (1 - damping) + damping * scores.take(graph.dangling_index).sum()
+    new_scores = damping * graph.matrix.dot(scores)
+    if teleport is None:
+        new_scores += jump / len(scores)
+    else:
+        new_scores += jump * teleport
+    return new_scores
+
+
+def residual(graph, scores, damping=0.85, teleport=None):
+    """L1-нев'язка ||G x - x|| для нормованого вектора x."""
+    if len(scores) == 0:
+        return 0.0
+    return float(np.abs(_step(graph, scores, damping, teleport) - scores).sum())
+
+
+def _system(graph, damping):
+    return (sparse.identity(len(graph), format="csr") - damping * graph.matrix).tocsr()
+
+
+def _normalize(y):
+    return y / y.sum()
+
+
+def _rhs(graph, teleport):
+    return np.full(len(graph), 1.0 / len(graph)) if teleport is None else teleport
+
+
+def _power(graph, damping, epsilon, start, max_iter, deadline, teleport):
+    return converge(graph.matrix.dot, graph.dangling_index, start, damping, epsilon,
+                    max_iter, deadline, teleport)
+
+
+def _extrapolated(graph, damping, epsilon, start, max_iter, deadline, teleport, quadratic):
+    """
+    Степеневий метод, де кожні EXTRAPOLATE_EVERY кроків останні ітерати
+    екстраполюються до границі (Kamvar et al., 2003).
+    """
+    scores = start
+    history = [scores]
+    depth = 4 if quadratic else 3
+    iterations = 0
+
+    while True:
+        new_scores = _step(graph, scores, damping, teleport)
+        delta = np.abs(new_scores - scores).sum()
+        scores = new_scores
+        iterations += 1
+        if delta < epsilon or not np.isfinite(delta):
+            break
+        if max_iter is not None and iterations >= max_iter:
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+
+        history = history[-(depth - 1):] + [scores]
+        if iterations % EXTRAPOLATE_EVERY == 0 and len(history) == depth:
+            guess = (_quadratic_guess if quadratic else _aitken_guess)(*history)
+            # Екстраполяція може дати від'ємні компоненти — тоді її пропускаємо
+            if guess is not None and np.all(guess > 0):
+                scores = _normalize(guess)
+                history = [scores]
+
+    return _normalize(scores), iterations, delta
+
+
+def _aitken_guess(x0, x1, x2):
+    """Покомпонентна Δ²-екстраполяція Ейткена."""
+    denom = x2 - 2 * x1 + x0
+    safe = np.abs(denom) > 1e-300
+    guess = x2.copy()
+    guess[safe] -= (x2[safe] - x1[safe]) ** 2 / denom[safe]
+    return guess
+
+
+def _quadratic_guess(x0, x1, x2, x3):
+    """Квадратична екстраполяція з чотирьох останніх ітератів."""
+    y = np.column_stack((x1 - x0, x2 - x0))
+    rhs = -(x3 - x0)
+    (g1, g2), *_ = np.linalg.lstsq(y, rhs, rcond=None)
+    g3 = 1.0
+    beta0, beta1, beta2 = g1 + g2 + g3, g2 + g3, g3
+    if not np.isfinite(beta0 + beta1):
+        return None
+    return beta0 * x1 + beta1 * x2 + beta2 * x3
+
+
+def _gauss_seidel(graph, damping, epsilon, start, max_iter, deadline, teleport):
+    """
+    Гаусс-Зейдель: (D + L) y_{k+1} = v - U y_k, кожен крок — один
+    трикутний розв'язок. Рядки впорядковані за балансом перемог, щоб
+    переможений (від кого залежить переможець) оновлювався першим.
+    Зупинка — за L1-зміною нормованого вектора.
+    """
+    n = len(graph)
+    balance = (np.bincount(graph.winners, weights=graph.weights, minlength=n)
+               - graph.out_degree)
+    perm = np.argsort(balance, kind="stable")
+    a = _system(graph, damping)[perm][:, perm].tocsr()
+    lower = sparse.tril(a, format="csr")
+    upper = sparse.triu(a, k=1, format="csr")
+    b = _rhs(graph, teleport)[perm]
+
+    # y пропорційний x з множником 1 / (1 - d * маса команд з поразками): старт у тому ж масштабі
+    active = np.ones(n, dtype=bool)
+    active[graph.dangling_index] = False
+    y = (start / (1 - damping * start[active].sum()))[perm]
+    scores = start[perm]
+    iterations = 0
+    while True:
+        y = spsolve_triangular(lower, b - upper.dot(y), lower=True)
+        new_scores = _normalize(y)
+        delta = np.abs(new_scores - scores).sum()
+        scores = new_scores
+        iterations += 1
+        if delta < epsilon or not np.isfinite(delta):
+            break
+        if max_iter is not None and iterations >= max_iter:
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+
+    result = np.empty(n)
+    result[perm] = scores
+    return result, iterations, delta
+
+
+def _adaptive(graph, damping, epsilon, start, max_iter, deadline, teleport, refresh=5):
+    """
+    Адаптивний PageRank (Kamvar et al., 2004): кожні refresh ітерацій
+    команди, чия зміна вже менша за epsilon / n, виключаються з перерахунку.
+    Наприкінці повні кроки доводять вектор до epsilon.
+    """
+    n = len(graph)
+    scores = start.copy()
+    rows = np.arange(n)
+    sub = graph.matrix
+    v = _rhs(graph, teleport)
+    iterations = 0
+    delta = np.inf
+
+    while len(rows) and delta >= epsilon:
+        if max_iter is not None and iterations >= max_iter:
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+
+        jump = (1 - damping) + damping * scores.take(graph.dangling_index).sum()
+        new_values = damping * sub.dot(scores)
+        new_values += jump * v[rows]
+        change = np.abs(new_values - scores[rows])
+        scores[rows] = new_values
+        delta = change.sum()
+        iterations += 1
+
+        if iterations % refresh == 0:
+            active = change >= epsilon / n
+            if not active.all():
+                rows = rows[active]
+                sub = graph.matrix[rows]
+
+    remaining = None if max_iter is None else max(1, max_iter - iterations)
+    scores, polish, delta = converge(graph.matrix.dot, graph.dangling_index, scores,
+                                     damping, epsilon, remaining, deadline, teleport)
+    return scores, iterations + polish, delta
+
+
+def _direct(graph, damping, epsilon, start, max_iter, deadline, teleport):
+    y = spsolve(_system(graph, damping).tocsc(), _rhs(graph, teleport))
+    scores = _normalize(np.asarray(y))
+    return scores, 1, residual(graph, scores, damping, teleport)
+
+
+def _pick(graph):
+    return "direct" if len(graph) <= DIRECT_LIMIT else "quadratic"
+
+
+def rank(graph, damping=0.85, epsilon=1e-8, solver="auto", max_iter=1000,
+         time_budget=None, start=None, teleport=None):
+    """
+    Розв'язує PageRank обраним методом з обмеженням на кількість
+    ітерацій і час (секунди). teleport — нормований вектор персоналізації.
+    Повертає RankResult: scores, iterations, residual, solver (фактично
+    використаний), seconds, converged.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Невідомий розв'язувач '{solver}'. Доступні: {', '.join(SOLVERS)}")
+
+    t0 = time.perf_counter()
+    n = len(graph)
+    if n == 0:
+        return RankResult(np.zeros(0), 0, 0.0, solver, 0.0, True)
+
+    if solver == "auto":
+        solver = _pick(graph)
+    deadline = None if time_budget is None else t0 + time_budget
+
+    if teleport is not None:
+        teleport = np.asarray(teleport, dtype=np.float64)
+    if start is not None:
+        start = _normalize(np.asarray(start, dtype=np.float64))
+    elif teleport is not None:
+        start = teleport.copy()
+    else:
+        start = np.full(n, 1.0 / n)
+
+    args = (graph, damping, epsilon, start, max_iter, deadline, teleport)
+    with span("pagerank.solve", solver=solver, teams=n) as timer:
+        if solver == "power":
+            scores, iterations, delta = _power(*args)
+        elif solver == "gauss_seidel":
+            scores, iterations, delta = _gauss_seidel(*args)
+        elif solver in ("aitken", "quadratic"):
+            scores, iterations, delta = _extrapolated(*args, quadratic=solver == "quadratic")
+        elif solver == "adaptive":
+            scores, iterations, delta = _adaptive(*args)
+        else:
+            scores, iterations, delta = _direct(*args)
+        error = residual(graph, scores, damping, teleport)
+        timer.set(iterations=iterations, residual=error)
+    gauge("pagerank.residual", error)
+
+    return RankResult(scores, iterations, error, solver, time.perf_counter() - t0,
+                      bool(delta < epsilon))
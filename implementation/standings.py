@@ -0,0 +1,106 @@
+'''
+Індекс над порахованим рейтингом: top-k, місце команди, сторінки таблиці і яруси.
+
+Будується один раз на результат і не копіює вектор. Top-k рахується
+через argpartition (O(n + k log k)); повний порядок і масив місць
+будуються ліниво при першому запиті сторінки чи місця, а далі кожен
+запит — O(1) на команду.
+'''
+from functools import cached_property
+
+import numpy as np
+
+
+# Межі ярусів за часткою місця (0 — лідер, 1 — останній), як у get_team_color
+TIER_BOUNDS = (0.33, 0.66)
+
+
+class StandingsIndex:
+    """
+    teams[i] — назва команди з ID i, scores[i] — її рейтинг.
+    index — необов'язковий словник team -> ID (інакше будується при потребі).
+    Рівні рейтинги впорядковуються за ID (порядком появи).
+    """
+
+    def __init__(self, teams, scores, index=None):
+        self.teams = teams
+        self.scores = np.asarray(scores, dtype=np.float64)
+        self._index = index
+
+    @classmethod
+    def from_dict(cls, scores):
+        return cls(list(scores), np.fromiter(scores.values(), dtype=np.float64,
+                                             count=len(scores)))
+
+    def __len__(self):
+        return len(self.scores)
+
+    @cached_property
+    def order(self):
+        """ID команд від найкращої до найгіршої."""
+        return np.argsort(-self.scores, kind="stable")
+
+    @cached_property
+    def ranks(self):
+        """Місце (з 1) для кожного ID команди."""
+        ranks = np.empty(len(self.scores), dtype=np.int64)
+        ranks[self.order] = np.arange(1, len(self.scores) + 1)
+        return ranks
+
+    @cached_property
+    def tiers(self):
+        """Ярус (0 — верхня третина, 1 — середня, 2 — нижня) для кожного ID."""
+        ratio = (self.ranks - 1) / max(len(self.scores) - 1, 1)
+        return np.searchsorted(TIER_BOUNDS, ratio, side="right")
+
+    def team_id(self, team):
+        if self._index is None:
+            self._index = {t: i for i, t in enumerate(self.teams)}
+        idx = self._index.get(team)
+        # Спільний словник може знати команди, яких у цьому знімку ще немає
+        if idx is None or idx >= len(self.scores):
+            raise KeyError(f"Команди '{team}' немає в турнірі")
+        return idx
+
+    def top_ids(self, k):
+        """ID k найкращих команд за спаданням рейтингу."""
+        k = min(max(k, 0), len(self.scores))
+        if k == 0:
+            return np.zeros(0, dtype=np.int64)
+        if "order" in self.__dict__ or k == len(self.scores):
+            return self.order[:k]
+        # Повний порядок ще не потрібен — лише k найкращих (рівні — за ID)
+        part = np.argpartition(-self.scores, k - 1)[:k]
+        threshold = self.scores[part].min()
+        part = np.union1d(part, np.flatnonzero(self.scores == threshold))
+        return part[np.argsort(-self.scores[part], kind="stable")][:k]
+
+    def top(self, k=10):
+        """[(team, score), ...] для k найкращих."""
+        return [(self.teams[i], float(self.scores[i])) for i in self.top_ids(k).tolist()]
+
+    def leader(self):
+        top = self.top(1)
+        return top[0] if top else None
+
+    def page(self, offset=0, limit=None):
+        """[(rank, team, score), ...] для місць offset + 1 ... offset + limit."""
+        offset = max(offset, 0)
+        stop = len(self.scores) if limit is None else offset + max(limit, 0)
+        if offset == 0:
+            ids = self.top_ids(stop)
+        else:
+            ids = self.order[offset:stop]
+        return [(offset + r, self.teams[i], float(self.scores[i]))
+                for r, i in enumerate(ids.tolist(), 1)]
+
+    def rank(self, team):
+        """Місце команди (з 1)."""
+        return int(self.ranks[self.team_id(team)])
+
+    def rank_ratio(self, team):
+        """Частка місця: 0 — лідер, 1 — останній."""
+        return (self.rank(team) - 1) / max(len(self.scores) - 1, 1)
+
+    def tier(self, team):
+        return int(self.tiers[self.team_id(team)])
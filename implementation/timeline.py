@@ -0,0 +1,230 @@
+'''
+Попередньо обчислена шкала часу для повтору турніру.
+
+Вектори рейтингу рахуються один раз (у фоновому потоці) лише в контрольних
+точках кожні stride кроків: матчі між точками додаються однією порцією
+і розв'язуються одним теплим стартом. Точки зберігаються як float32-матриця
+«точки × команди»; крок у точці віддається пошуком, а між точками —
+дорахунком з теплого старту на вимогу. Злиті ребра кроку рахуються за
+заздалегідь знайденою парою кожного матчу, без сортування префікса.
+З дисковим кешем (result_cache) матриця переживає перезапуск застосунку.
+'''
+import math
+import threading
+
+import numpy as np
+
+from implementation.incremental import IncrementalPageRank
+from implementation.pagerank import MatchGraph, power_iteration
+from implementation.profiler import timed
+from implementation.result_cache import array_digest, make_key
+
+
+# Не більше стількох розв'язків на побудову шкали (крок між точками росте з турніром)
+MAX_CHECKPOINTS = 500
+
+class ReplayTimeline:
+    """
+    Рейтинги для кожного кроку повтору.
+    Команди пронумеровані в порядку першої появи, тому на кроці s
+    активні рівно перші active_count(s) стовпців.
+    """
+
+    def __init__(self, table, stride=None, max_bytes=256 * 2**20,
+                 damping=0.85, epsilon=1e-8, weights=None, cache=None):
+        """
+        table — MatchTable із loader.load_matches (ID у порядку появи),
+        weights — необов'язкові ваги матчів (див. MatchTable.match_weights),
+        cache — необов'язковий ResultCache для контрольних точок.
+        """
+        self.damping = damping
+        self.epsilon = epsilon
+        self.table = table
+        self.weights = weights
+        self.cache = cache
+
+        self.teams = table.teams
+        self.winners = table.winners
+        self.losers = table.losers
+        self.num_steps = len(table)
+
+        # Перша поява кожної команди серед чергованих winner/loser
+        ids = np.empty(2 * self.num_steps, dtype=np.int64)
+        ids[0::2] = self.winners
+        ids[1::2] = self.losers
+        first_pos = np.full(len(self.teams), len(ids), dtype=np.int64)
+        np.minimum.at(first_pos, ids, np.arange(len(ids)))
+        self.first_step = (first_pos // 2 + 1).astype(np.int32)
+
+        n = len(self.teams)
+        if stride is None:
+            full_bytes = self.num_steps * n * 4
+            stride = max(1, math.ceil(full_bytes / max_bytes),
+                         math.ceil(self.num_steps / MAX_CHECKPOINTS))
+        self.stride = stride
+
+        # Рядок k відповідає кроку (k + 1) * stride; останній крок — завжди окремий рядок
+        rows = self.num_steps // stride
+        if self.num_steps % stride:
+            rows += 1
+        self.checkpoints = np.zeros((rows, n), dtype=np.float32)
+
+        self.progress = 0
+        self.ready = threading.Event()
+        self._cancelled = threading.Event()
+        self._thread = None
+        self._refined = {}
+        self._pairs = None
+        self._edge_cursor = None
+        self._lock = threading.Lock()
+
+    def _row_step(self, row):
+        return min((row + 1) * self.stride, self.num_steps)
+
+    def _step_row(self, step):
+        """Рядок контрольної точки для кроку або None, якщо кроку там немає."""
+        if step == self.num_steps:
+            return len(self.checkpoints) - 1
+        if step % self.stride == 0:
+            return step // self.stride - 1
+        return None
+
+    def active_count(self, step):
+        """Кількість команд, що з'явилися до кроку step включно."""
+        return int(np.searchsorted(self.first_step, step, side="right"))
+
+    def cache_key(self):
+        return make_key("timeline", self.table.fingerprint(), stride=self.stride,
+                        damping=self.damping, epsilon=self.epsilon,
+                        weights=array_digest(self.weights))
+
+    def _load_cached(self):
+        hit = self.cache.get(self.cache_key())
+        if hit is None:
+            return False
+        checkpoints = hit[0].get("checkpoints")
+        if checkpoints is None or checkpoints.shape != self.checkpoints.shape:
+            return False
+        self.checkpoints = checkpoints
+        self.progress = self.num_steps
+        self.ready.set()
+        return True
+
+    @timed("replay.build")
+    def build(self):
+        """
+        Проганяє турнір порціями між контрольними точками і заповнює їх
+        (або бере їх із кешу, якщо цей турнір уже рахувався).
+        """
+        if self.cache is not None and self._load_cached():
+            return
+
+        ranking = IncrementalPageRank(self.damping, self.epsilon)
+        for row in range(len(self.checkpoints)):
+            if self._cancelled.is_set():
+                return
+            lo, hi = self.progress, self._row_step(row)
+            n = self.active_count(hi)
+            weights = None if self.weights is None else self.weights[lo:hi]
+            # ID рейтингу збігаються з ID таблиці: команди інтернуються в порядку появи
+            ranking.extend(self.teams[:n], self.winners[lo:hi], self.losers[lo:hi], weights)
+            self.checkpoints[row, :n] = ranking.scores
+            self.progress = hi
+
+        if self.cache is not None:
+            self.cache.put(self.cache_key(), {"checkpoints": self.checkpoints},
+                           {"steps": self.num_steps, "teams": len(self.teams)})
+        self.ready.set()
+
+    def start(self):
+        """Запускає build() у фоновому потоці."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.build, daemon=True)
+            self._thread.start()
+        return self
+
+    def cancel(self):
+        """Зупиняє build(); вже пораховані кроки лишаються доступними."""
+        self._cancelled.set()
+
+    def _pair_index(self):
+        """
+        Пара (winner, loser) кожного матчу: (pairs, winners, losers), де pairs[i] —
+        номер пари матчу i, а пари впорядковані як рядки CSR (як у aggregate_edges).
+        """
+        with self._lock:
+            if self._pairs is None:
+                n = max(len(self.teams), 1)
+                keys = self.winners.astype(np.int64) * n + self.losers
+                unique, pairs = np.unique(keys, return_inverse=True)
+                winners, losers = np.divmod(unique, n)
+                self._pairs = (pairs.ravel(), winners, losers)
+            return self._pairs
+
+    def edges_at(self, step, weighted=False):
+        """
+        Злиті ребра перших step матчів (winners, losers, counts) у порядку
+        aggregate_edges, без сортування префікса. Кількості зсуваються від
+        попереднього запитаного кроку лише на матчі між ними (повзунок рухається
+        малими кроками); weighted=True — сума ваг матчів пари замість кількості.
+        """
+        pairs, winners, losers = self._pair_index()
+        if weighted:
+            weights = None if self.weights is None else self.weights[:step]
+            values = np.bincount(pairs[:step], weights=weights, minlength=len(winners))
+            counts = values if weights is None else np.bincount(pairs[:step],
+                                                                minlength=len(winners))
+        else:
+            with self._lock:
+                cursor = self._edge_cursor
+            if cursor is not None and abs(step - cursor[0]) < step:
+                last, counts = cursor[0], cursor[1].copy()
+                lo, hi = sorted((last, step))
+                np.add.at(counts, pairs[lo:hi], 1 if step > last else -1)
+            else:
+                counts = np.bincount(pairs[:step], minlength=len(winners))
+            with self._lock:
+                self._edge_cursor = (step, counts)
+            values = counts
+        live = counts > 0
+        return winners[live], losers[live], values[live]
+
+    def _refine(self, step):
+        """Дораховує крок між контрольними точками з найближчої попередньої."""
+        with self._lock:
+            cached = self._refined.get(step)
+        if cached is not None:
+            return cached
+
+        n = self.active_count(step)
+        start = np.full(n, 1.0 / n)
+        done_rows = min(step, self.progress) // self.stride
+        if done_rows:
+            prev = self.checkpoints[done_rows - 1]
+            m = self.active_count(self._row_step(done_rows - 1))
+            start[:m] = prev[:m]
+
+        # Граф з уже злитих ребер кроку: без повторного злиття всього префікса
+        winners, losers, weights = self.edges_at(step, weighted=True)
+        graph = MatchGraph(self.teams[:n], winners, losers, weights)
+        scores, _, _ = power_iteration(graph, self.damping, self.epsilon, start=start)
+
+        with self._lock:
+            if len(self._refined) >= 64:
+                self._refined.pop(next(iter(self._refined)))
+            self._refined[step] = scores
+        return scores
+
+    def scores_at(self, step):
+        """Вектор рейтингу активних команд на кроці step (1..num_steps)."""
+        if not 1 <= step <= self.num_steps:
+            raise IndexError(f"Крок {step} поза межами 1..{self.num_steps}")
+
+        row = self._step_row(step)
+        if row is not None and step <= self.progress:
+            return self.checkpoints[row, :self.active_count(step)].astype(np.float64)
+        return self._refine(step)
+
+    def scores_dict(self, step):
+        scores = self.scores_at(step)
+        return dict(zip(self.teams[:len(scores)], scores.tolist()))
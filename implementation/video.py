@@ -0,0 +1,101 @@
+'''
+Кодування кадрів повтору у GIF або MP4 потоково, кадр за кадром.
+
+Якщо є ffmpeg, кадри передаються йому через pipe одразу після рендеру.
+Без ffmpeg можна записати лише GIF (через Pillow, у зменшеному розмірі):
+кожен кадр з власною палітрою дописується у файл одразу, тож пам'ять
+не залежить від довжини повтору.
+'''
+import io
+import shutil
+import subprocess
+
+from PIL import GifImagePlugin, Image, ImageOps
+
+
+GIF_FALLBACK_WIDTH = 800
+
+
+class VideoWriter:
+    """
+    Приймає PNG-кадри (bytes) по одному і пише .gif або .mp4.
+    Кадри різного розміру доповнюються до розміру першого кадру.
+    """
+
+    def __init__(self, path, fps=2, bg="#FADEC9"):
+        self.path = path
+        self.fps = fps
+        self.bg = bg
+        self.size = None
+        self._gif = None
+        self._ffmpeg = None
+
+        ext = path.lower().rsplit(".", 1)[-1]
+        if ext not in ("mp4", "gif"):
+            raise ValueError(f"Непідтримуваний формат відео: '{path}' (.mp4 або .gif)")
+        self.use_ffmpeg = shutil.which("ffmpeg") is not None
+        if ext == "mp4" and not self.use_ffmpeg:
+            raise RuntimeError("Для .mp4 потрібен ffmpeg у PATH (або оберіть .gif)")
+
+    def _fit(self, png_bytes):
+        img = Image.open(io.BytesIO(png_bytes)).convert("RGB")
+        if self.size is None:
+            width, height = img.size
+            if not self.use_ffmpeg and width > GIF_FALLBACK_WIDTH:
+                height = height * GIF_FALLBACK_WIDTH // width
+                width = GIF_FALLBACK_WIDTH
+            # yuv420p вимагає парних розмірів
+            self.size = (width // 2 * 2, height // 2 * 2)
+        if img.size != self.size:
+            img = ImageOps.pad(img, self.size, color=self.bg)
+        return img
+
+    def _start_ffmpeg(self):
+        cmd = ["ffmpeg", "-y", "-loglevel", "error",
+               "-f", "image2pipe", "-framerate", str(self.fps), "-i", "-"]
+        if self.path.lower().endswith(".mp4"):
+            cmd += ["-c:v", "libx264", "-pix_fmt", "yuv420p"]
+        cmd.append(self.path)
+        self._ffmpeg = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    def _write_gif(self, img):
+        """Дописує кадр у GIF: заголовок — з першим кадром, далі кадри з локальною палітрою."""
+        frame = img.quantize(colors=255)
+        if self._gif is None:
+            self._gif = open(self.path, "wb")
+            header, _ = GifImagePlugin.getheader(frame.copy(), info={"loop": 0})
+            self._gif.write(b"".join(header))
+        for chunk in GifImagePlugin.getdata(frame, duration=int(1000 / self.fps),
+                                            include_color_table=True):
+            self._gif.write(chunk)
+
+    def add(self, png_bytes):
+        """Додає один PNG-кадр."""
+        img = self._fit(png_bytes)
+        if not self.use_ffmpeg:
+            self._write_gif(img)
+            return
+
+        if self._ffmpeg is None:
+            self._start_ffmpeg()
+        buf = io.BytesIO()
+        img.save(buf, format="PNG", compress_level=1)
+        self._ffmpeg.stdin.write(buf.getvalue())
+
+    def close(self):
+        if self._gif is not None:
+            self._gif.write(b";")
+            self._gif.close()
+            self._gif = None
+        if self._ffmpeg is not None:
+            self._ffmpeg.stdin.close()
+            code = self._ffmpeg.wait()
+            self._ffmpeg = None
+            if code != 0:
+                raise RuntimeError(f"ffmpeg завершився з помилкою під час запису {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
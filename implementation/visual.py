@@ -1,58 +1,29 @@
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection, PolyCollection
 from matplotlib.patches import Circle, FancyArrowPatch, FancyBboxPatch
 import numpy as np
-import math
+import argparse
+import hashlib
+import io
+import json
 import os
-import csv
-
-def calculate_pagerank(matches_dict, teams, damping=0.85, epsilon=1e-8):
-    """
-    Розраховує PageRank для команд на основі перемог.
-    matches_dict: {loser: {winners who beat them}}
-    """
-    n = len(teams)
-    if n == 0:
-        return {}
-
-    teams_list = list(teams)
-    team_idx = {t: i for i, t in enumerate(teams_list)}
-
-    scores = np.ones(n) / n
-
-    out_degree = {t: 0 for t in teams}
-
-    for loser, winners in matches_dict.items():
-        out_degree[loser] = len(winners)
-
-    while True:
-        new_scores = np.ones(n) * (1 - damping) / n
-
-        for loser, winners in matches_dict.items():
-            if out_degree[loser] > 0:
-                loser_idx = team_idx[loser]
-                contribution = damping * scores[loser_idx] / out_degree[loser]
-
-                for winner in winners:
-                    winner_idx = team_idx[winner]
-                    new_scores[winner_idx] += contribution
-
-        dangling_sum = 0
-        for t in teams:
-            if t not in matches_dict or len(matches_dict.get(t, set())) == 0:
-                dangling_sum += scores[team_idx[t]]
-
-        new_scores += damping * dangling_sum / n
-
-        delta = np.sum(np.abs(new_scores - scores))
-        scores = new_scores
-
-        if delta < epsilon:
-            break
-
-    scores = scores / scores.sum()
-
-    return {teams_list[i]: scores[i] for i in range(n)}
-
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from implementation.attributes import (FRAME_STYLE, TIER_COLORS, VisualAttributes,
+                                       ring_positions, scale_radii)
+from implementation.force import ForceLayout
+from implementation.form import FormRanking
+from implementation.incremental import IncrementalPageRank
+from implementation.layout import CollisionResolver, resolve_overlaps
+from implementation.video import VideoWriter
+from implementation.graph_store import load_cached
+from implementation.profiler import profiling, span, timed
+from implementation.result_cache import default_cache, make_key
+from implementation.standings import TIER_BOUNDS, StandingsIndex
 
 STYLE = {
     "bg": "#FADEC9",
@@ -64,15 +35,7 @@ STYLE = {
 
 def get_team_color(rank_ratio):
     """Колір на основі рангу (0 = топ, 1 = низ)"""
-
-    if rank_ratio < 0.33:
-        return {"inner": "#7DFF7A", "outer": "#1F8A0A"} 
-
-    elif rank_ratio < 0.66:
-        return {"inner": "#FFE66D", "outer": "#E1B800"}  
-
-    else:
-        return {"inner": "#FF4C4C", "outer": "#8A0000"} 
+    return TIER_COLORS[int(np.searchsorted(TIER_BOUNDS, rank_ratio, side="right"))]
 
 def draw_sphere(ax, center, radius, colors, zorder=5):
     """Малює сферу з градієнтом"""
@@ -92,69 +55,96 @@ def draw_sphere(ax, center, radius, colors, zorder=5):
         circle = Circle((cx, cy), r, facecolor=color, edgecolor='none', zorder=zorder)
         ax.add_patch(circle)
 
-def get_circular_positions(scores, radii):
-    """Розташування по колу"""
-    sorted_teams = sorted(scores.keys(), key=lambda t: scores[t], reverse=True)
-    n = len(sorted_teams)
+@lru_cache(maxsize=16)
+def sphere_sprite(inner, outer, size=128):
+    """Кешоване RGBA-зображення сфери з тим самим градієнтом, що й у draw_sphere"""
+    c_inner = np.array(plt.cm.colors.to_rgb(inner))
+    c_outer = np.array(plt.cm.colors.to_rgb(outer))
 
-    if n == 0:
-        return {}
-    if n == 1:
-        return {sorted_teams[0]: np.array([0.0, 0.0])}
-
-    max_r = max(radii.values()) if radii else 30
-    circle_radius = max(90, n * max_r * 0.6)
+    ax_vals = (np.arange(size) + 0.5) / size * 2 - 1
+    rho = np.hypot(ax_vals[None, :], ax_vals[:, None])
+    t = np.clip(rho, 0, 1) ** 0.7
 
-    positions = {}
-    for i, team in enumerate(sorted_teams):
-        angle = 2 * math.pi * i / n - math.pi / 2
-        x = circle_radius * math.cos(angle)
-        y = circle_radius * math.sin(angle)
-        positions[team] = np.array([x, y])
-
-    return positions
-
-def resolve_collisions(coords, radii, iterations=60):
-    """Розсування кіл"""
-    pos = {k: v.copy() for k, v in coords.items()}
-    keys = list(pos.keys())
+    sprite = np.empty((size, size, 4))
+    sprite[..., :3] = c_outer * (1 - t[..., None]) + c_inner * t[..., None]
+    # М'який край кола для згладжування
+    sprite[..., 3] = np.clip((1 - rho) * size / 2, 0, 1)
+    return sprite
 
-    for _ in range(iterations):
-        for i in range(len(keys)):
-            for j in range(i + 1, len(keys)):
-                t1, t2 = keys[i], keys[j]
-                p1, p2 = pos[t1], pos[t2]
-                r1, r2 = radii[t1], radii[t2]
+def draw_sphere_fast(ax, center, radius, colors, zorder=5):
+    """Сфера одним зображенням замість 35 кіл"""
+    cx, cy = center
+    sprite = sphere_sprite(colors["inner"], colors["outer"])
+    ax.imshow(sprite, extent=(cx - radius, cx + radius, cy - radius, cy + radius),
+              interpolation='bilinear', zorder=zorder)
 
-                diff = p2 - p1
-                dist = np.linalg.norm(diff)
-                min_dist = r1 + r2 + 8
+def draw_edges_fast(ax, edge_counts, coords, radii, current=None):
+    """
+    Усі ребра однією LineCollection, наконечники — однією PolyCollection.
+    Повторні матчі між парою зливаються в одну товщу лінію.
+    """
+    pairs = [(w, l) for (w, l) in edge_counts if w in coords and l in coords and w != l]
+    if not pairs:
+        return
 
-                if dist < min_dist and dist > 0:
-                    overlap = (min_dist - dist) * 0.5
-                    correction = (diff / dist) * overlap
-                    pos[t1] = pos[t1] - correction
-                    pos[t2] = pos[t2] + correction
+    p1 = np.array([coords[w] for w, _ in pairs])
+    p2 = np.array([coords[l] for _, l in pairs])
+    r1 = np.array([radii.get(w, 15) for w, _ in pairs])
+    r2 = np.array([radii.get(l, 15) for _, l in pairs])
+    counts = np.array([edge_counts[p] for p in pairs], dtype=np.float64)
+
+    diff = p2 - p1
+    dist = np.hypot(diff[:, 0], diff[:, 1])
+    keep = dist > 0
+    if not keep.all():
+        p1, p2, r1, r2, counts, diff, dist = (v[keep] for v in (p1, p2, r1, r2, counts, diff, dist))
+        pairs = [p for p, k in zip(pairs, keep) if k]
+
+    dir_vec = diff / dist[:, None]
+    start_p = p1 + dir_vec * r1[:, None]
+    end_p = p2 - dir_vec * r2[:, None]
+
+    is_current = np.array([p == current for p in pairs])
+    widths = 2.0 + 1.5 * np.log2(counts)
+    widths[is_current] += 0.5
+    colors = np.where(is_current[:, None],
+                      np.array(plt.cm.colors.to_rgba('#e74c3c', 1.0)),
+                      np.array(plt.cm.colors.to_rgba(STYLE["arrow_color"], 0.75)))
+
+    head_len = 9.0 + 2.0 * widths
+    head_w = 0.5 * head_len
+    normal = np.stack([-dir_vec[:, 1], dir_vec[:, 0]], axis=1)
+    base = end_p - dir_vec * head_len[:, None]
+    heads = np.stack([end_p,
+                      base + normal * head_w[:, None],
+                      base - normal * head_w[:, None]], axis=1)
+
+    lines = np.stack([start_p, base], axis=1)
+    ax.add_collection(LineCollection(lines, colors=colors, linewidths=widths, zorder=15))
+    ax.add_collection(PolyCollection(heads, facecolors=colors, edgecolors='none', zorder=15))
 
-    return pos
+def get_circular_positions(scores, radii):
+    """Розташування по колу"""
+    vals = np.fromiter(scores.values(), dtype=np.float64, count=len(scores))
+    order = np.argsort(-vals, kind="stable")
+    max_r = max(radii.values()) if radii else 30
+    positions = ring_positions(order, max_r, FRAME_STYLE.min_ring, FRAME_STYLE.spread)
+    return dict(zip(scores, positions))
 
-def compute_radii(scores, min_r=18, max_r=55):
-    """Радіуси на основі score"""
-    vals = np.array(list(scores.values()))
-    if len(vals) == 0:
+def resolve_collisions(coords, radii, iterations=60):
+    """Розсування кіл (векторизовано, з ранньою зупинкою)"""
+    teams = list(coords.keys())
+    if not teams:
         return {}
+    pos = np.array([coords[t] for t in teams], dtype=np.float64)
+    r = np.array([radii[t] for t in teams])
+    pos, _ = resolve_overlaps(pos, r, iterations=iterations)
+    return {t: pos[k] for k, t in enumerate(teams)}
 
-    s_min, s_max = vals.min(), vals.max()
-    radii = {}
-
-    for t, s in scores.items():
-        if s_max == s_min:
-            norm = 0.5
-        else:
-            norm = (s - s_min) / (s_max - s_min)
-        radii[t] = min_r + (norm ** 0.5) * (max_r - min_r)
-
-    return radii
+def compute_radii(scores, min_r=FRAME_STYLE.min_r, max_r=FRAME_STYLE.max_r):
+    """Радіуси на основі score"""
+    vals = np.fromiter(scores.values(), dtype=np.float64, count=len(scores))
+    return dict(zip(scores, scale_radii(vals, min_r, max_r).tolist()))
 
 def draw_portal(ax, x_pos, y_range):
     """Крива портала"""
@@ -162,7 +152,7 @@ def draw_portal(ax, x_pos, y_range):
     x = x_pos + 10 * np.sin(y * 0.03)
     ax.plot(x, y, color=STYLE["portal_color"], lw=2.5, alpha=0.7, zorder=1)
 
-def draw_new_node_box(ax, center, radius):
+def draw_new_node_box(ax, center, radius, fast=False):
     """Новий вузол у рамці"""
     x, y = center
     box_size = radius * 3
@@ -178,15 +168,20 @@ def draw_new_node_box(ax, center, radius):
     ax.add_patch(rect)
 
     colors = {"inner": "#FF8C42", "outer": "#D64A00"}
-    draw_sphere(ax, center, radius, colors, zorder=4)
+    (draw_sphere_fast if fast else draw_sphere)(ax, center, radius, colors, zorder=4)
 
     ax.text(x, y - box_size/2 - 8, "new node",
             ha='center', va='top', fontsize=9,
             color=STYLE["text_color"], style='italic')
 
+@timed("render.draw_frame")
 def draw_frame(ax, scores, history_matches, coords, radii, total_matches,
-               new_teams=None, is_final_static=False, match_num=0):
-    """Малює кадр"""
+               new_teams=None, is_final_static=False, match_num=0, fast=False):
+    """
+    Малює кадр.
+    fast=True: ребра агрегуються в колекції, сфери — кешовані спрайти,
+    тож кількість об'єктів залежить від кількості команд, а не матчів.
+    """
     ax.clear()
     ax.set_facecolor(STYLE["bg"])
     ax.axis('off')
@@ -212,10 +207,6 @@ def draw_frame(ax, scores, history_matches, coords, radii, total_matches,
             ha='center', va='top', fontsize=20, fontweight='bold',
             color=STYLE["text_color"])
 
-    sorted_teams = sorted(scores.keys(), key=lambda t: scores[t], reverse=True)
-    n = len(sorted_teams)
-    rank_map = {t: i / max(n - 1, 1) for i, t in enumerate(sorted_teams)}
-
     portal_x = x_max - 60
 
     if new_teams and len(new_teams) > 0:
@@ -227,7 +218,7 @@ def draw_frame(ax, scores, history_matches, coords, radii, total_matches,
         for i, team in enumerate(display_new):
             if i < len(y_positions):
                 node_center = np.array([portal_x + 35, y_positions[i]])
-                draw_new_node_box(ax, node_center, 12)
+                draw_new_node_box(ax, node_center, 12, fast=fast)
 
                 if team in coords:
                     target = coords[team]
@@ -244,40 +235,50 @@ def draw_frame(ax, scores, history_matches, coords, radii, total_matches,
                                [line_start[1], line_end[1]],
                                '--', color=STYLE["portal_color"], lw=1.5, alpha=0.5, zorder=16)
 
-    for idx, (winner, loser) in enumerate(history_matches):
-        if winner in coords and loser in coords:
-            p1, p2 = coords[winner], coords[loser]
-            r1, r2 = radii.get(winner, 15), radii.get(loser, 15)
-
-            diff = p2 - p1
-            dist = np.linalg.norm(diff)
-
-            if dist > 0:
-                dir_vec = diff / dist
-                start_p = p1 + dir_vec * r1
-                end_p = p2 - dir_vec * r2
-            else:
-                continue
-
-            is_current = (idx == len(history_matches) - 1) and not is_final_static
+    if fast:
+        current = history_matches[-1] if history_matches and not is_final_static else None
+        draw_edges_fast(ax, Counter(history_matches), coords, radii, current)
+    else:
+        for idx, (winner, loser) in enumerate(history_matches):
+            if winner in coords and loser in coords:
+                p1, p2 = coords[winner], coords[loser]
+                r1, r2 = radii.get(winner, 15), radii.get(loser, 15)
 
-            arrow = FancyArrowPatch(
-                posA=start_p, posB=end_p,
-                arrowstyle='-|>,head_width=1.0,head_length=0.6',
-                color='#e74c3c' if is_current else STYLE["arrow_color"],
-                lw=2.5 if is_current else 2.0,
-                alpha=1.0 if is_current else 0.75,
-                zorder=15
-            )
-            ax.add_patch(arrow)
+                diff = p2 - p1
+                dist = np.linalg.norm(diff)
 
-    for team in sorted(scores.keys(), key=lambda t: radii[t]):
+                if dist > 0:
+                    dir_vec = diff / dist
+                    start_p = p1 + dir_vec * r1
+                    end_p = p2 - dir_vec * r2
+                else:
+                    continue
+
+                is_current = (idx == len(history_matches) - 1) and not is_final_static
+
+                arrow = FancyArrowPatch(
+                    posA=start_p, posB=end_p,
+                    arrowstyle='-|>,head_width=1.0,head_length=0.6',
+                    color='#e74c3c' if is_current else STYLE["arrow_color"],
+                    lw=2.5 if is_current else 2.0,
+                    alpha=1.0 if is_current else 0.75,
+                    zorder=15
+                )
+                ax.add_patch(arrow)
+
+    teams = list(scores)
+    vals = np.fromiter(scores.values(), dtype=np.float64, count=len(teams))
+    sizes = np.fromiter((radii[t] for t in teams), dtype=np.float64, count=len(teams))
+    tiers = StandingsIndex(teams, vals).tiers.tolist()
+    # Менші сфери малюються першими, щоб більші лягали зверху
+    for k in np.argsort(sizes, kind="stable").tolist():
+        team = teams[k]
         p = coords[team]
-        r = radii[team]
-        score = scores[team]
+        r = sizes[k]
+        score = vals[k]
 
-        colors = get_team_color(rank_map[team])
-        draw_sphere(ax, p, r, colors)
+        colors = TIER_COLORS[tiers[k]]
+        (draw_sphere_fast if fast else draw_sphere)(ax, p, r, colors)
 
         label = f"{team}\n{score*100:.1f}%"
         ax.text(p[0], p[1], label, ha='center', va='center',
@@ -293,97 +294,336 @@ def draw_frame(ax, scores, history_matches, coords, radii, total_matches,
                 f"⚔️ Match {match_num}/{total_matches}: {last_w} defeats {last_l}",
                 ha='center', fontsize=13, fontweight='bold', color='#c0392b')
 
-def run_visualization(csv_path="data/test_matches.csv"):
-    if not os.path.exists(csv_path):
-        print(f"Помилка: файл {csv_path} не знайдено!")
-        return
-
-    output_dir = "frames"
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    raw_matches = []
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        header = next(reader, None)
-        for row in reader:
-            if len(row) >= 2:
-                w, l = row[0].strip(), row[1].strip()
-                raw_matches.append((w, l))
-
-    print(f"Зчитано {len(raw_matches)} матчів. Починаємо візуалізацію...\n")
-
-    matches_dict = {}
-    all_teams = set()
+def compute_states(raw_matches, verbose=True, form=None, layout="force"):
+    """
+    Перший етап: рейтинг, радіуси та координати для кожного кроку.
+    form — необов'язковий FormRanking (рейтинг за вікном / зі згасанням).
+    layout — "ring" (коло за рейтингом) або "force" (силова розкладка з теплим стартом).
+    Повертає список станів кадрів (без малювання): ids — ID активних команд
+    у порядку першої появи (як MatchTable.teams), scores/radii/coords — масиви за ids.
+    """
+    ranking = IncrementalPageRank() if form is None else form
+    resolver = CollisionResolver()
+    engine = ForceLayout() if layout == "force" else None
     total_matches = len(raw_matches)
-
-    fig, ax = plt.subplots(figsize=(16, 12))
-    fig.patch.set_facecolor(STYLE["bg"])
-
-    final_scores = {}
-    final_coords = {}
-    final_radii = {}
-
     recently_added = []
+    seen = set()
+    states = []
 
     for i in range(total_matches):
         winner, loser = raw_matches[i]
 
-        new_this_round = []
-        for t in [winner, loser]:
-            if t not in all_teams:
-                all_teams.add(t)
-                new_this_round.append(t)
-                recently_added.append(t)
+        if form is None:
+            stats = ranking.add_match(winner, loser)
+            new_teams = stats.new_teams
+            ids = np.arange(len(ranking))
+            scores = ranking.scores.copy()
+            changed = [ranking.index[winner], ranking.index[loser]]
+        else:
+            retired = form.start
+            stats = ranking.advance(i + 1)
+            # Рухаються учасники нового матчу і матчів, що випали з вікна
+            changed = np.concatenate((form.table.winners[retired:form.start],
+                                      form.table.losers[retired:form.start],
+                                      form.table.winners[i:i + 1], form.table.losers[i:i + 1]))
+            new_teams = [t for t in (winner, loser) if t not in seen]
+            seen.update(new_teams)
+            ids = np.flatnonzero(ranking.active)
+            scores = ranking.scores[ids]
+        recently_added.extend(new_teams)
+        recently_added = recently_added[-5:]
 
+        attrs = VisualAttributes(scores)
+        if engine is None:
+            coords = resolver.resolve_ids(ids, attrs.positions, attrs.radii)
+        else:
+            e_w, e_l, e_weights = ranking.edges()
+            coords = engine.layout(ids, e_w, e_l, e_weights, attrs.radii, changed)
+
+        states.append({
+            "ids": ids,
+            "scores": scores,
+            "coords": coords,
+            "radii": attrs.radii,
+            "first": 0 if form is None else form.start,
+            "history": i + 1,
+            "new_teams": list(recently_added),
+            "match_num": i + 1,
+        })
+
+        if verbose:
+            print(f"Match {i+1}: {winner} → {loser} ({stats.iterations} ітерацій)")
+            names = ranking.teams
+            for rank, k in enumerate(attrs.order.tolist(), 1):
+                print(f"  {rank}. {names[ids[k]]}: {scores[k]*100:.2f}%")
+            print()
+
+    return states
+
+def _pack_states(states, teams):
+    """Стани кадрів -> масиви для кешу: scores (кроки × команди, NaN — ще не грала) і coords."""
+    scores = np.full((len(states), len(teams)), np.nan)
+    coords = np.full((len(states), len(teams), 2), np.nan)
+    for i, state in enumerate(states):
+        scores[i, state["ids"]] = state["scores"]
+        coords[i, state["ids"]] = state["coords"]
+    return {"scores": scores, "coords": coords}
+
+def _unpack_states(arrays, teams, raw_matches, window=None):
+    """Відновлює стани з кешу; радіуси і нові команди перераховуються дешево."""
+    scores, coords = arrays["scores"], arrays["coords"]
+    seen = set()
+    recently_added = []
+    states = []
+    for i, (winner, loser) in enumerate(raw_matches):
+        for team in (winner, loser):
+            if team not in seen:
+                seen.add(team)
+                recently_added.append(team)
         recently_added = recently_added[-5:]
 
-        if loser not in matches_dict:
-            matches_dict[loser] = set()
-        matches_dict[loser].add(winner)
+        ids = np.flatnonzero(~np.isnan(scores[i]))
+        states.append({
+            "ids": ids,
+            "scores": scores[i, ids],
+            "coords": coords[i, ids],
+            "radii": scale_radii(scores[i, ids], FRAME_STYLE.min_r, FRAME_STYLE.max_r),
+            "first": 0 if window is None else max(0, i + 1 - window),
+            "history": i + 1,
+            "new_teams": list(recently_added),
+            "match_num": i + 1,
+        })
+    return states
+
+def frame_signature(state, total_matches, is_final, fast=False):
+    """Хеш усього, що впливає на вигляд кадру (для пропуску незмінних)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((total_matches, is_final, fast, state["first"], state["history"],
+                   state["match_num"], state["new_teams"])).encode("utf-8"))
+    h.update(np.asarray(state["ids"], dtype=np.int64).tobytes())
+    # +0.0 зводить -0.0 до 0.0, щоб округлення не давало різних байтів
+    h.update((np.round(state["scores"], 6) + 0.0).tobytes())
+    h.update((np.round(state["coords"], 2) + 0.0).tobytes())
+    h.update((np.round(state["radii"], 2) + 0.0).tobytes())
+    return h.hexdigest()
+
+def state_dicts(state, teams):
+    """Стан кадру -> (scores, coords, radii) як словники {team: ...} для draw_frame."""
+    names = [teams[k] for k in state["ids"].tolist()]
+    return (dict(zip(names, state["scores"].tolist())),
+            dict(zip(names, state["coords"])),
+            dict(zip(names, state["radii"].tolist())))
+
+_WORKER = {}
+
+def _init_worker(raw_matches, total_matches, fast=False, teams=()):
+    """Ініціалізація процесу-рендерера: власна фігура, копія матчів і назв команд."""
+    fig = Figure(figsize=(16, 12))
+    FigureCanvasAgg(fig)
+    fig.patch.set_facecolor(STYLE["bg"])
+    _WORKER["fig"] = fig
+    _WORKER["ax"] = fig.add_subplot()
+    _WORKER["raw_matches"] = raw_matches
+    _WORKER["total_matches"] = total_matches
+    _WORKER["fast"] = fast
+    _WORKER["teams"] = teams
+
+def render_frame(job):
+    """
+    Малює один кадр на фігурі воркера і повертає (fname, PNG bytes).
+    """
+    fname, state, is_final, dpi = job
+    ax = _WORKER["ax"]
+    history = _WORKER["raw_matches"][state["first"]:state["history"]]
+
+    scores, coords, radii = state_dicts(state, _WORKER["teams"])
+    draw_frame(ax, scores, history, coords, radii, _WORKER["total_matches"],
+               new_teams=state["new_teams"] or None,
+               is_final_static=is_final, match_num=state["match_num"],
+               fast=_WORKER["fast"])
+
+    buf = io.BytesIO()
+    with span("render.savefig", frame=fname):
+        _WORKER["fig"].savefig(buf, format="png", dpi=dpi, bbox_inches='tight',
+                               facecolor=STYLE["bg"])
+    return fname, buf.getvalue()
+
+def _load_manifest(output_dir):
+    path = os.path.join(output_dir, "manifest.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-        current_scores = calculate_pagerank(matches_dict, all_teams)
+def _save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, "manifest.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
 
-        radii = compute_radii(current_scores)
-        coords = get_circular_positions(current_scores, radii)
-        coords = resolve_collisions(coords, radii)
+def run_visualization(csv_path="data/test_matches.csv", output_dir="frames",
+                      frames=None, workers=None, video=None, fps=2,
+                      skip_unchanged=True, write_png=True, fast=False, use_cache=True,
+                      window=None, half_life=None, layout="force"):
+    """
+    Повтор турніру: спершу рахуються стани всіх кроків, потім кадри
+    малюються пулом процесів (кожен зі своєю фігурою).
+    frames — (перший, останній) номер кадру включно, None = усі.
+    video — шлях .mp4/.gif, куди кадри пишуться потоково.
+    skip_unchanged — не перемальовувати кадри, чий PNG уже збігається з manifest.json.
+    fast — швидкий режим малювання (колекції ребер і спрайти сфер).
+    use_cache — брати стани кроків із дискового кешу результатів.
+    window / half_life — рейтинг форми: лише останні window матчів
+    та/або згасання ваги старих (див. form.FormRanking).
+    layout — "ring" або "force" (силова розкладка, стабільна між кроками).
+    """
+    if not os.path.exists(csv_path):
+        print(f"Помилка: файл {csv_path} не знайдено!")
+        return
 
-        final_scores = current_scores
-        final_coords = coords
-        final_radii = radii
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
 
-        history_so_far = raw_matches[:i+1]
-        draw_frame(ax, current_scores, history_so_far, coords, radii, total_matches,
-                  new_teams=recently_added if recently_added else None,
-                  is_final_static=False, match_num=i+1)
+    table = load_cached(csv_path)
+    raw_matches = list(table.pairs())
+    total_matches = len(raw_matches)
 
-        fname = os.path.join(output_dir, f"step_{i+1:03d}.png")
-        plt.savefig(fname, dpi=120, bbox_inches='tight', facecolor=STYLE["bg"])
+    print(f"Зчитано {total_matches} матчів. Починаємо візуалізацію...\n")
 
-        print(f"Match {i+1}: {winner} → {loser}")
-        sorted_scores = sorted(current_scores.items(), key=lambda x: x[1], reverse=True)
-        for rank, (team, score) in enumerate(sorted_scores, 1):
-            print(f"  {rank}. {team}: {score*100:.2f}%")
-        print()
+    cache = default_cache() if use_cache else None
+    key = make_key("states", table.fingerprint(), window=window, half_life=half_life,
+                   layout=layout)
+    hit = cache.get(key) if cache is not None else None
+    if hit is not None:
+        print("Стани кроків узято з кешу.")
+        states = _unpack_states(hit[0], table.teams, raw_matches, window)
+    else:
+        form = None
+        if window is not None or half_life is not None:
+            form = FormRanking(table, window, half_life)
+        states = compute_states(raw_matches, form=form, layout=layout)
+        if cache is not None and states:
+            cache.put(key, _pack_states(states, table.teams))
+    if not states:
+        print("Немає матчів для візуалізації.")
+        return
+
+    final_state = states[-1]
 
     print("=" * 50)
     print("FINAL RANKING:")
     print("=" * 50)
-    sorted_final = sorted(final_scores.items(), key=lambda x: x[1], reverse=True)
-    for rank, (team, score) in enumerate(sorted_final, 1):
+    final_names = [table.teams[k] for k in final_state["ids"].tolist()]
+    for rank, team, score in StandingsIndex(final_names, final_state["scores"]).page():
         print(f"{rank}. {team}: {score*100:.2f}%")
 
+    first, last = frames if frames else (1, total_matches)
+    first, last = max(first, 1), min(last, total_matches)
+
+    jobs = [(f"step_{i:03d}.png", states[i - 1], False, 120) for i in range(first, last + 1)]
+    if frames is None or last == total_matches:
+        jobs.append(("final_result.png", final_state, True, 150))
+
+    manifest = _load_manifest(output_dir) if skip_unchanged else {}
+    signatures = {}
+    todo = []
+    for job in jobs:
+        fname, state, is_final, _ = job
+        sig = frame_signature(state, total_matches, is_final, fast)
+        signatures[fname] = sig
+        path = os.path.join(output_dir, fname)
+        if not (skip_unchanged and manifest.get(fname) == sig and os.path.exists(path)):
+            todo.append(job)
+
+    print(f"\nКадрів: {len(jobs)}, малюємо {len(todo)}, пропущено незмінних {len(jobs) - len(todo)}")
+
+    writer = VideoWriter(video, fps=fps, bg=STYLE["bg"]) if video else None
+    todo_names = {job[0] for job in todo}
+
+    def rendered():
+        if workers == 1 or len(todo) <= 1:
+            _init_worker(raw_matches, total_matches, fast, table.teams)
+            yield from map(render_frame, todo)
+            return
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(raw_matches, total_matches, fast, table.teams)) as pool:
+            yield from pool.map(render_frame, todo, chunksize=4)
+
+    fresh = rendered()
+    try:
+        for fname, _, _, _ in jobs:
+            path = os.path.join(output_dir, fname)
+            if fname in todo_names:
+                _, png = next(fresh)
+                if write_png:
+                    with open(path, "wb") as f:
+                        f.write(png)
+                    manifest[fname] = signatures[fname]
+            elif writer is not None:
+                with open(path, "rb") as f:
+                    png = f.read()
+            else:
+                continue
 
-    draw_frame(ax, final_scores, raw_matches, final_coords, final_radii,
-               total_matches, is_final_static=True)
+            if writer is not None:
+                writer.add(png)
+    finally:
+        fresh.close()
+        if writer is not None:
+            writer.close()
+        if write_png:
+            _save_manifest(output_dir, manifest)
 
     final_name = os.path.join(output_dir, "final_result.png")
-    plt.savefig(final_name, dpi=150, bbox_inches='tight', facecolor=STYLE["bg"])
-
     print(f"\nГотово! Фінальний файл: {final_name}")
-    plt.close()
+    if video:
+        print(f"Відео: {video}")
 
     return final_name
 
+def _parse_frames(value):
+    """'10:50' -> (10, 50); '10:' -> (10, inf); ':50' -> (1, 50)."""
+    start, _, stop = value.partition(":")
+    return int(start or 1), int(stop) if stop else float("inf")
+
 if __name__ == "__main__":
-    run_visualization()
+    parser = argparse.ArgumentParser(description="Replay tournament PageRank as frames.")
+    parser.add_argument("csv_path", nargs="?", default="data/test_matches.csv",
+                        help="CSV з матчами (Winner, Loser)")
+    parser.add_argument("--output-dir", default="frames", help="Тека для PNG-кадрів")
+    parser.add_argument("--frames", type=_parse_frames, default=None,
+                        help="Діапазон кадрів, напр. 10:50")
+    parser.add_argument("--workers", type=int, default=None, help="Кількість процесів-рендерерів")
+    parser.add_argument("--video", default=None, help="Записати відео .mp4 або .gif")
+    parser.add_argument("--fps", type=int, default=2)
+    parser.add_argument("--no-skip", action="store_true",
+                        help="Перемалювати всі кадри, навіть незмінні")
+    parser.add_argument("--fast", action="store_true",
+                        help="Швидкий рендер: агреговані ребра і спрайти сфер")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Не використовувати дисковий кеш результатів")
+    parser.add_argument("--window", type=int, default=None,
+                        help="Рейтинг форми: лише останні N матчів")
+    parser.add_argument("--half-life", type=float, default=None,
+                        help="Згасання ваги старих матчів: вага вдвічі менша кожні N матчів")
+    parser.add_argument("--layout", choices=("ring", "force"), default="force",
+                        help="Розкладка: коло за рейтингом або силова (стабільна між кроками)")
+    parser.add_argument("--profile", nargs="?", const="", metavar="TRACE.json",
+                        help="Вивести профіль (таймери, лічильники); з шляхом — ще й trace-event JSON")
+    args = parser.parse_args()
+
+    # Профайлер бачить лише свій процес, тож кадри тоді малюються тут же
+    workers = 1 if args.profile is not None else args.workers
+    with profiling(enabled=args.profile is not None) as prof:
+        run_visualization(args.csv_path, args.output_dir, frames=args.frames,
+                          workers=workers, video=args.video, fps=args.fps,
+                          skip_unchanged=not args.no_skip, fast=args.fast,
+                          use_cache=not args.no_cache, window=args.window,
+                          half_life=args.half_life, layout=args.layout)
+
+    if prof is not None:
+        print("\n=== PROFILE ===")
+        print(prof.report())
+        if args.profile:
+            prof.write_trace(args.profile)
+            print(f"Trace-event JSON записано у {args.profile}")
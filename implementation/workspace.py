@@ -0,0 +1,218 @@
+'''
+Робочий простір з кількох турнірів зі спільним реєстром команд.
+
+Однакові клуби в різних змаганнях і сезонах отримують один глобальний ID,
+а назви зберігаються в одному екземплярі. Рейтинги всіх турнірів
+рахуються паралельно (і беруться з дискового кешу результатів, якщо вже
+рахувалися), після чого порівняння місць між будь-якими турнірами —
+лише операції над готовими векторами, без повторного розбору чи розв'язку.
+'''
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from implementation.components import rank_components
+from implementation.graph_store import load_cached
+from implementation.loader import MatchTable, load_matches
+from implementation.result_cache import default_cache, rank_key
+from implementation.standings import StandingsIndex
+
+
+class TeamRegistry:
+    """Спільні для всіх турнірів ID команд: names[i] — назва команди з ID i."""
+
+    def __init__(self):
+        self.names = []
+        self.index = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def intern(self, names):
+        """Глобальні ID для назв (нові команди реєструються); повертає int64-масив."""
+        with self._lock:
+            ids = np.empty(len(names), dtype=np.int64)
+            for k, name in enumerate(names):
+                idx = self.index.get(name)
+                if idx is None:
+                    idx = len(self.names)
+                    self.index[name] = idx
+                    self.names.append(name)
+                ids[k] = idx
+            return ids
+
+    def id(self, name):
+        idx = self.index.get(name)
+        if idx is None:
+            raise KeyError(f"Команди '{name}' немає в жодному турнірі")
+        return idx
+
+
+class Tournament:
+    """
+    Турнір у робочому просторі: table — MatchTable, team_ids — глобальні ID
+    його команд (у порядку table.teams), fingerprint — хеш вмісту джерела,
+    standings — StandingsIndex після ранжування.
+    """
+
+    def __init__(self, name, table, team_ids, fingerprint=None):
+        self.name = name
+        self.table = table
+        self.team_ids = team_ids
+        self.fingerprint = fingerprint if fingerprint is not None else table.fingerprint()
+        self.result = None
+        self.standings = None
+        self.cached = False
+
+    @property
+    def ranked(self):
+        return self.standings is not None
+
+    def by_id(self, values, size, fill=np.nan):
+        """Вектор values (по командах турніру) у глобальній нумерації розміру size."""
+        out = np.full(size, fill, dtype=np.float64)
+        out[self.team_ids] = values
+        return out
+
+
+class Workspace:
+    """
+    Кілька турнірів зі спільним TeamRegistry.
+    add() завантажує турнір, rank_all() рахує ще не пораховані паралельно,
+    compare()/rank_matrix() порівнюють готові рейтинги.
+    """
+
+    def __init__(self, registry=None, margin=False, solver="auto", cache=None):
+        self.registry = registry if registry is not None else TeamRegistry()
+        self.margin = margin
+        self.solver = solver
+        self.cache = cache if cache is not None else default_cache()
+        self.tournaments = {}
+
+    def __len__(self):
+        return len(self.tournaments)
+
+    def __contains__(self, name):
+        return name in self.tournaments
+
+    @property
+    def names(self):
+        return list(self.tournaments)
+
+    def get(self, name):
+        tournament = self.tournaments.get(name)
+        if tournament is None:
+            raise KeyError(f"Турніру '{name}' немає в робочому просторі")
+        return tournament
+
+    def add(self, name, source=None, table=None):
+        """
+        Додає турнір з CSV (шлях або файловий об'єкт) чи готової MatchTable.
+        Турнір з тим самим ім'ям і вмістом лишається як є (разом з рейтингом),
+        зі зміненим вмістом — замінюється. Передана таблиця не змінюється:
+        у простір іде копія з назвами команд зі спільного реєстру.
+        """
+        existing = self.tournaments.get(name)
+        fingerprint = None
+        if table is None and not isinstance(source, (str, os.PathLike)):
+            # Файловий об'єкт: хеш байтів, щоб не розбирати вже доданий файл
+            data = source.read()
+            fingerprint = hashlib.blake2b(data, digest_size=16).hexdigest()
+            if existing is not None and existing.fingerprint == fingerprint:
+                return existing
+            table = load_matches(io.BytesIO(data))
+        elif table is None:
+            table = load_cached(source)
+        if fingerprint is None:
+            fingerprint = table.fingerprint()
+            if existing is not None and existing.fingerprint == fingerprint:
+                return existing
+
+        ids = self.registry.intern(table.teams)
+        names = self.registry.names
+        shared = MatchTable([names[i] for i in ids.tolist()], table.winners, table.losers,
+                            table.digest, table.weights)
+
+        tournament = Tournament(name, shared, ids, fingerprint)
+        self.tournaments[name] = tournament
+        return tournament
+
+    def remove(self, name):
+        self.tournaments.pop(name, None)
+
+    def _rank(self, tournament):
+        table = tournament.table
+        key = rank_key(table.fingerprint(), self.margin, solver=self.solver)
+        hit = self.cache.get(key) if self.cache is not None else None
+        if hit is not None:
+            scores = hit[0]["scores"]
+            tournament.cached = True
+        else:
+            result = rank_components(table.graph(margin=self.margin), solver=self.solver)
+            scores = result.scores
+            tournament.result = result
+            if self.cache is not None and result.converged:
+                self.cache.put(key, {"scores": scores},
+                               {"solver": result.solver, "iterations": result.iterations,
+                                "residual": result.residual, "converged": result.converged,
+                                "components": result.components})
+        tournament.standings = StandingsIndex(table.teams, scores)
+        return tournament
+
+    def rank_all(self, workers=None):
+        """Рахує всі ще не ранжовані турніри (паралельно в потоках)."""
+        todo = [t for t in self.tournaments.values() if not t.ranked]
+        if not todo:
+            return []
+        if workers is None:
+            workers = min(len(todo), os.cpu_count() or 1)
+        if workers <= 1:
+            return [self._rank(t) for t in todo]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(self._rank, todo))
+
+    def compare(self, first, second, common_only=True):
+        """
+        Місця команд у двох турнірах: DataFrame з колонками team, rank_<first>,
+        rank_<second>, delta (додатна — команда піднялася в second), score_*.
+        common_only=False залишає і команди, що грали лише в одному.
+        """
+        a, b = self.get(first), self.get(second)
+        size = len(self.registry)
+        rank_a = a.by_id(a.standings.ranks, size)
+        rank_b = b.by_id(b.standings.ranks, size)
+        present = ~np.isnan(rank_a) & ~np.isnan(rank_b) if common_only \
+            else ~np.isnan(rank_a) | ~np.isnan(rank_b)
+        ids = np.flatnonzero(present)
+
+        names = self.registry.names
+        df = pd.DataFrame({
+            "team": [names[i] for i in ids.tolist()],
+            f"rank_{first}": rank_a[ids],
+            f"rank_{second}": rank_b[ids],
+            "delta": rank_a[ids] - rank_b[ids],
+            f"score_{first}": a.by_id(a.standings.scores, size)[ids],
+            f"score_{second}": b.by_id(b.standings.scores, size)[ids],
+        })
+        return df.sort_values(f"rank_{second}", na_position="last").reset_index(drop=True)
+
+    def rank_matrix(self, names=None, min_tournaments=1):
+        """
+        Місця кожної команди в кожному турнірі (команди × турніри, NaN — не грала).
+        min_tournaments відкидає команди, що грали в меншій кількості турнірів.
+        """
+        names = list(names) if names is not None else self.names
+        size = len(self.registry)
+        columns = {name: self.get(name).by_id(self.get(name).standings.ranks, size)
+                   for name in names}
+        matrix = pd.DataFrame(columns, index=pd.Index(self.registry.names, name="team"))
+        return matrix[matrix.notna().sum(axis=1) >= min_tournaments]
@@ -11,13 +11,13 @@ def main():
     input_dir = Path("//app//data")
 
     files = [f for f in input_dir.iterdir() if f.is_file()]
-    path_to_script = "implementation/visual.py"
+    visual_module = "implementation.visual"
 
     input_file_path_str = files[0].as_posix()
 
     print(f"Передаю файл для обробки: {input_file_path_str}")
 
-    command = ["python", path_to_script, input_file_path_str]
+    command = ["python", "-m", visual_module, input_file_path_str]
 
     try:
         subprocess.run(command, check=True)
@@ -29,8 +29,13 @@ def main():
     local_output_dir = os.path.join(os.getcwd(), 'output')
     os.makedirs(local_output_dir, exist_ok=True)
 
+    # Кеш результатів і .tgraph живе на хості, тож переживає перезапуск контейнера
+    local_cache_dir = os.path.join(os.getcwd(), 'cache')
+    os.makedirs(local_cache_dir, exist_ok=True)
+
     container_data_dir = "/app/data"
     container_frames_dir = "/app/frames"
+    container_cache_dir = "/app/cache"
 
     print(f"Вхідний файл: {csv_filename}")
     print("Створюю Docker image")
@@ -46,8 +51,10 @@ def main():
         f'docker run --rm '
         f'-p 8501:8501 '
         f'-e CSV_FILENAME="{csv_filename}" '
+        f'-e STANDINGS_CACHE_DIR="{container_cache_dir}" '
         f'-v "{host_data_dir}":"{container_data_dir}":ro '
         f'-v "{local_output_dir}":"{container_frames_dir}" '
+        f'-v "{local_cache_dir}":"{container_cache_dir}" '
         f'standings')
 
     print("Запускаю веб-сайт")
@@ -0,0 +1,48 @@
+import glob
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from implementation.generators import knockout, power_law, round_robin, swiss  # noqa: E402
+from implementation.loader import load_matches  # noqa: E402
+from implementation.pagerank import MatchGraph, power_iteration  # noqa: E402
+
+
+DATA_FILES = sorted(glob.glob(os.path.join(ROOT, "app", "data", "*.csv")))
+
+
+def small_tables():
+    """Усі CSV з app/data і кілька синтетичних турнірів: (назва, MatchTable)."""
+    tables = [(os.path.basename(path), load_matches(path)) for path in DATA_FILES]
+    tables += [("round_robin", round_robin(12, rounds=2, seed=1)),
+               ("swiss", swiss(40, seed=2)),
+               ("knockout", knockout(32, seed=3)),
+               ("power_law", power_law(60, seed=4))]
+    return tables
+
+
+TABLES = small_tables()
+
+
+@pytest.fixture(params=TABLES, ids=[name for name, _ in TABLES])
+def table(request):
+    return request.param[1]
+
+
+def reference(table, stop=None, weights=None, teams=None):
+    """Точний вектор для перших stop матчів: степеневий метод з epsilon 1e-13."""
+    winners, losers = table.winners[:stop], table.losers[:stop]
+    if teams is None:
+        teams = table.teams
+    graph = MatchGraph(teams, winners, losers, None if weights is None else weights[:stop])
+    scores, _, _ = power_iteration(graph, epsilon=1e-13)
+    return scores
+
+
+def l1(a, b):
+    return float(np.abs(np.asarray(a) - np.asarray(b)).sum())
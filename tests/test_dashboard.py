@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+
+from conftest import ROOT
+from implementation.attributes import WEB_STYLE, VisualAttributes
+from implementation.dashboard import EDGE_WIDTH_BUCKETS, create_stylish_graph, edge_buckets
+from implementation.form import FormRanking
+from implementation.loader import load_matches
+
+
+def _drawn_edges(fig):
+    """Кількість відрізків у трасах ребер (кожен закінчується NaN-розривом)."""
+    return sum(int(np.isnan(np.asarray(trace.x, dtype=np.float64)).sum())
+               for trace in fig.data if trace.mode == "lines")
+
+
+def _figure(scores, edges):
+    attrs = VisualAttributes(np.fromiter(scores.values(), dtype=np.float64), WEB_STYLE)
+    return create_stylish_graph(scores, edges, attrs.positions, attrs.radii)
+
+
+def test_every_weight_gets_a_bucket():
+    counts = np.array([0.3, 1.0, 1.41, 1.74, 2.0, 3.5, 3.99, 4.0, 17.2])
+    buckets = edge_buckets(counts)
+    assert buckets.tolist() == [0, 0, 0, 0, 1, 1, 1, 2, 2]
+    assert buckets.max() < len(EDGE_WIDTH_BUCKETS)
+
+
+def test_fractional_edges_are_drawn():
+    scores = {t: 1.0 / (k + 1) for k, t in enumerate("ABCDE")}
+    winners = np.array(list("ABCDA"), dtype=object)
+    losers = np.array(list("BCDEC"), dtype=object)
+    counts = np.array([1.0, 1.74, 2.5, 3.99, 6.0])
+    assert _drawn_edges(_figure(scores, (winners, losers, counts))) == len(counts)
+
+
+def test_form_window_edges_are_all_drawn():
+    table = load_matches(os.path.join(ROOT, "app", "data", "new_table.csv"))
+    form = FormRanking(table, window=100, half_life=10)
+    form.advance(len(table))
+    e_w, e_l, counts = form.edges()
+    names = np.array(table.teams, dtype=object)
+    fig = _figure(form.scores_dict(), (names[e_w], names[e_l], counts))
+    assert _drawn_edges(fig) == len(counts)
@@ -0,0 +1,131 @@
+import io
+import os
+import time
+
+import numpy as np
+import pytest
+
+from implementation.generators import GENERATORS, power_law, write_csv
+from implementation.graph_store import MAGIC, load_cached, store_path
+from implementation.live import LiveStandings
+from implementation.loader import load_matches
+from implementation.timeline import ReplayTimeline
+
+
+def _load(text):
+    return load_matches(io.BytesIO(text.encode("utf-8")))
+
+
+@pytest.mark.parametrize("header", ["", "winner,loser\n", "Winner,Looser\n", "﻿Winner,Loser\n"])
+def test_header_is_optional(header):
+    table = _load(header + "A,B\nC,A\n")
+    assert table.teams == ["A", "B", "C"]
+    assert table.winners.tolist() == [0, 2] and table.losers.tolist() == [1, 0]
+
+
+def test_names_are_stripped_and_ids_follow_first_appearance():
+    table = _load("winner,loser\n  Team A  ,Team B\nTeam B,   Team C\n\nКоманда Я,Team A\n")
+    assert table.teams == ["Team A", "Team B", "Team C", "Команда Я"]
+    assert table.winners.tolist() == [0, 1, 3]
+
+
+def test_single_column_is_rejected():
+    with pytest.raises(ValueError):
+        _load("winner\nA\nB\n")
+
+
+def test_margin_column():
+    table = _load("winner,loser,margin\nA,B,3\nB,C,\nC,A,abc\n")
+    assert table.weights.tolist() == [3.0, 1.0, 1.0]
+    assert table.match_weights(margin=True).tolist() == [3.0, 1.0, 1.0]
+    assert _load("A,B\n").weights is None
+
+
+@pytest.mark.parametrize("value", ["-1", "inf", "-inf", "1e400"])
+def test_bad_margin_is_rejected(value):
+    with pytest.raises(ValueError, match="скінченним невід'ємним"):
+        _load(f"winner,loser,margin\nA,B,1\nB,C,{value}\n")
+
+
+@pytest.mark.parametrize("kind", sorted(GENERATORS))
+def test_generated_ids_follow_first_appearance(kind):
+    table = GENERATORS[kind](200, seed=3)
+    buf = io.StringIO()
+    write_csv(table, buf)
+    loaded = _load(buf.getvalue())
+    assert loaded.teams == table.teams
+    np.testing.assert_array_equal(loaded.winners, table.winners)
+    np.testing.assert_array_equal(loaded.losers, table.losers)
+    # Кожна команда в таблиці грала хоча б раз
+    played = np.union1d(table.winners, table.losers)
+    assert len(played) == table.num_teams
+
+
+def test_timeline_builds_on_generated_table():
+    table = power_law(2000, 20000, seed=1)
+    timeline = ReplayTimeline(table)
+    timeline.build()
+    assert timeline.progress == len(table)
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_tgraph_is_reused_and_rebuilt(tmp_path):
+    csv = tmp_path / "league.csv"
+    _write(csv, "winner,loser\nA,B\nB,C\n")
+    first = load_cached(str(csv))
+    path = store_path(str(csv))
+    assert os.path.exists(path)
+    assert load_cached(str(csv)).teams == first.teams == ["A", "B", "C"]
+
+    # Новий вміст — новий граф
+    _write(csv, "winner,loser\nC,D\n")
+    assert load_cached(str(csv)).teams == ["C", "D"]
+
+    # Пошкоджений заголовок — перебудова з CSV
+    with open(path, "r+b") as f:
+        f.write(b"garbage!")
+    assert load_cached(str(csv)).teams == ["C", "D"]
+    with open(path, "rb") as f:
+        assert f.read(len(MAGIC)) == MAGIC
+
+
+def test_live_holds_unterminated_line_until_quiet(tmp_path):
+    path = tmp_path / "live.csv"
+    _write(path, "winner,loser\nA,B\nC,Dr")
+    live = LiveStandings(str(path), tail_quiet=3600)
+    assert live.poll() == 1
+    assert live.poll() == 0
+    assert live.ranking.teams == ["A", "B"]
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("agons\n")
+    assert live.poll() == 1
+    assert live.ranking.teams == ["A", "B", "C", "Dragons"]
+
+    # Рядок без \n після тиші tail_quiet — завершений матч
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("E,F")
+    assert live.poll() == 0
+    past = time.time() - 7200
+    os.utime(path, (past, past))
+    assert live.poll() == 1
+    assert live.num_matches == 3
+
+
+def test_live_keeps_position_after_parse_error(tmp_path):
+    path = tmp_path / "live.csv"
+    _write(path, "winner,loser\nA,B\n")
+    live = LiveStandings(str(path))
+    assert live.poll() == 1
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("E\n")
+    with pytest.raises(ValueError):
+        live.poll()
+    # Рядки не загубилися: та сама помилка, доки файл не виправлено
+    with pytest.raises(ValueError):
+        live.poll()
+    assert live.num_matches == 1
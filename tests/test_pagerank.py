@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+from conftest import l1, reference
+from implementation.components import rank_components
+from implementation.form import FormRanking
+from implementation.incremental import IncrementalPageRank
+from implementation.loader import MatchTable
+from implementation.pagerank import MatchGraph, converge, dangling_mask, power_iteration
+from implementation.solvers import SOLVERS, rank
+from implementation.timeline import ReplayTimeline
+
+
+@pytest.mark.parametrize("solver", SOLVERS)
+def test_solvers_match_power_iteration(table, solver):
+    result = rank(table.graph(), solver=solver)
+    assert result.converged
+    assert l1(result.scores, reference(table)) < 1e-6
+
+
+def test_components_match_power_iteration(table):
+    assert l1(rank_components(table.graph()).scores, reference(table)) < 1e-6
+
+
+def test_incremental_add_match_matches_rebuild(table):
+    ranking = IncrementalPageRank()
+    checks = set(np.linspace(1, len(table), 5).astype(int).tolist())
+    for step, (w, l) in enumerate(table.pairs(), 1):
+        ranking.add_match(w, l)
+        if step in checks:
+            n = len(ranking)
+            assert ranking.teams == table.teams[:n]
+            assert l1(ranking.scores, reference(table, step, teams=table.teams[:n])) < 1e-6
+
+
+def test_incremental_extend_with_weights(table):
+    weights = np.linspace(0.5, 3.0, len(table))
+    ranking = IncrementalPageRank()
+    half = len(table) // 2
+    ranking.extend(table.teams, table.winners[:half], table.losers[:half], weights[:half])
+    ranking.extend(table.teams, table.winners[half:], table.losers[half:], weights[half:])
+    expected = reference(table, weights=weights)
+    assert l1(ranking.scores[:len(expected)], expected) < 1e-6
+
+
+@pytest.mark.parametrize("stride", [1, 3])
+def test_timeline_scores_at_every_step(table, stride):
+    weights = np.linspace(0.5, 3.0, len(table))
+    timeline = ReplayTimeline(table, stride=stride, weights=weights)
+    timeline.build()
+    for step in range(1, len(table) + 1, max(1, len(table) // 40)):
+        n = timeline.active_count(step)
+        expected = reference(table, step, weights, teams=table.teams[:n])
+        # Контрольні точки — float32
+        assert l1(timeline.scores_at(step), expected) < 1e-6
+
+
+def test_timeline_edges_match_aggregate(table):
+    from implementation.pagerank import aggregate_edges
+
+    timeline = ReplayTimeline(table, stride=4)
+    # Вперед, назад і стрибок — зсув від попереднього кроку і повний перерахунок
+    for step in (len(table), 1, len(table) // 2, len(table) // 2 + 1, len(table) // 3):
+        step = max(step, 1)
+        expected = aggregate_edges(table.winners[:step], table.losers[:step], table.num_teams)
+        for got, want in zip(timeline.edges_at(step), expected):
+            np.testing.assert_array_equal(got, want)
+
+
+def _form_reference(table, form, half_life=None):
+    """Рейтинг вікна form напряму: MatchGraph лише на командах і матчах вікна."""
+    ids = np.flatnonzero(form.active)
+    local = np.full(table.num_teams, -1)
+    local[ids] = np.arange(len(ids))
+    window = slice(form.start, form.step)
+    weights = None
+    if half_life:
+        weights = np.exp2((np.arange(form.start, form.step) - form.step) / half_life)
+    graph = MatchGraph([table.teams[i] for i in ids], local[table.winners[window]],
+                       local[table.losers[window]], weights)
+    scores, _, _ = power_iteration(graph, epsilon=1e-13)
+    return ids, scores
+
+
+@pytest.mark.parametrize("window,half_life", [(10, None), (None, 5.0), (25, 8.0)])
+def test_form_ranking_matches_window_rebuild(table, window, half_life):
+    form = FormRanking(table, window=window, half_life=half_life)
+    steps = sorted(set(np.linspace(1, len(table), 8).astype(int).tolist()))
+    # Вперед крок за кроком і один крок назад (повна перебудова вікна)
+    for step in steps + steps[-2:-1]:
+        form.advance(step)
+        ids, expected = _form_reference(table, form, half_life)
+        assert l1(form.scores[ids], expected) < 1e-6
+        assert form.scores[~form.active].sum() == 0
+
+
+def test_decayed_weights_do_not_hang():
+    rng = np.random.default_rng(0)
+    winners = rng.integers(0, 30, 1040).astype(np.int32)
+    losers = ((winners + rng.integers(1, 30, 1040)) % 30).astype(np.int32)
+    table = MatchTable([f"T{i}" for i in range(30)], winners, losers)
+    weights = table.match_weights(half_life=1)
+    assert np.all((weights == 0) | (weights >= np.finfo(np.float64).tiny))
+    scores, _, _ = power_iteration(table.graph(half_life=1), max_iter=10_000)
+    assert np.isfinite(scores).all()
+
+
+def test_converge_stops_on_nan():
+    scores, iterations, delta = converge(lambda x: x * np.nan, np.zeros(0, dtype=np.int64),
+                                         np.full(3, 1 / 3))
+    assert iterations == 1 and not np.isfinite(delta)
+
+
+def test_dangling_predicate_is_shared():
+    teams = ["A", "B", "C"]
+    winners, losers = np.array([0, 1, 2]), np.array([1, 2, 0])
+    weights = np.array([1.0, 5e-320, 2.0])
+    graph = MatchGraph(teams, winners, losers, weights)
+    np.testing.assert_array_equal(graph.dangling, dangling_mask(graph.out_degree))
+    assert graph.dangling.tolist() == [False, False, True]
+
+    ranking = IncrementalPageRank()
+    ranking.extend(teams, winners, losers, weights)
+    expected, _, _ = power_iteration(graph, epsilon=1e-13)
+    assert l1(ranking.scores, expected) < 1e-6
@@ -1,10 +1,24 @@
 '''visualisation'''
 import streamlit as st
-import plotly.graph_objects as go
 import numpy as np
-import math
 import pandas as pd
 import os
+import io
+import json
+
+from implementation.attributes import WEB_STYLE, VisualAttributes, scale_radii
+from implementation.dashboard import create_stylish_graph
+from implementation.force import ForceLayout
+from implementation.form import FormRanking
+from implementation.graph_store import load_cached
+from implementation.live import LiveStandings
+from implementation.pagerank import aggregate_edges
+from implementation.pipeline import STAGES, UploadJob
+from implementation.profiler import Profiler, active, disable, enable
+from implementation.result_cache import default_cache
+from implementation.standings import StandingsIndex
+from implementation.timeline import ReplayTimeline
+from implementation.workspace import Workspace
 
 
 st.set_page_config(
@@ -31,132 +45,264 @@ st.markdown("""
 
 
 
-@st.cache_data 
-def calculate_pagerank(matches_data, teams_tuple, damping=0.85, epsilon=1e-8):
+@st.cache_resource
+def get_timeline(data_hash, _table, use_margin=False):
     """
-    Розраховує PageRank (while loop convergence).
+    Шкала рейтингів для всіх кроків: рахується один раз на файл у фоні,
+    а з дискового кешу береться одразу (і після перезапуску контейнера).
     """
-    teams = list(teams_tuple)
-    n = len(teams)
-    if n == 0: return {}
-
-    matches_dict = {}
-    for w, l in matches_data:
-        if l not in matches_dict:
-            matches_dict[l] = set()
-        matches_dict[l].add(w)
-    
-    teams_list = list(teams)
-    team_idx = {t: i for i, t in enumerate(teams_list)}
-
-    scores = np.ones(n) / n
-    out_degree = {t: 0 for t in teams}
-    for loser, winners in matches_dict.items():
-        out_degree[loser] = len(winners)
+    weights = _table.match_weights(margin=use_margin)
+    return ReplayTimeline(_table, weights=weights, cache=default_cache()).start()
 
-    while True:
-        new_scores = np.ones(n) * (1 - damping) / n
+@st.cache_resource
+def get_live(file_path, use_margin=False):
+    """Фонове стеження за файлом, спільне для всіх сесій."""
+    return LiveStandings(file_path, margin=use_margin).start()
 
-        for loser, winners in matches_dict.items():
-            if out_degree[loser] > 0:
-                loser_idx = team_idx[loser]
-                contribution = damping * scores[loser_idx] / out_degree[loser]
-
-                for winner in winners:
-                    winner_idx = team_idx[winner]
-                    new_scores[winner_idx] += contribution
+def get_form(data_hash, table, window, half_life, use_margin=False):
+    """
+    Ковзне вікно форми для сесії: крок повтору вперед лише додає і знімає
+    кілька матчів, а не перебудовує граф вікна.
+    """
+    key = (data_hash, window, half_life, use_margin)
+    form = st.session_state.get("form")
+    if form is None or st.session_state.get("form_key") != key:
+        form = FormRanking(table, window, half_life, margin=use_margin)
+        st.session_state.form = form
+        st.session_state.form_key = key
+    return form
+
+# Далі за стільки кроків від попереднього кадру розслабляється весь граф
+FORCE_MAX_STEPS = 50
+
+def get_force_layout(data_hash, table, ids, edges, scores, step, form_key=(None, None)):
+    """
+    Силова розкладка сесії з теплим стартом: на кроці повтору рухаються лише
+    нові команди й учасники матчів між попереднім і поточним кроком.
+    """
+    state = st.session_state.get("force_layout")
+    if state is None or state["hash"] != data_hash:
+        state = {"hash": data_hash, "engine": ForceLayout(), "step": None, "form": None}
+        st.session_state.force_layout = state
+
+    changed = None
+    last, window = state["step"], form_key[0]
+    if last is not None and state["form"] == form_key and abs(step - last) <= FORCE_MAX_STEPS:
+        lo, hi = sorted((last, step))
+        spans = [(lo, hi)]
+        if window:
+            # Матчі, що ввійшли у вікно форми або випали з нього
+            spans.append((max(lo - window, 0), max(hi - window, 0)))
+        changed = np.concatenate([np.concatenate((table.winners[a:b], table.losers[a:b]))
+                                  for a, b in spans])
+
+    vals = np.fromiter(scores.values(), dtype=np.float64, count=len(scores))
+    radii = scale_radii(vals, WEB_STYLE.min_r, WEB_STYLE.max_r)
+    pos = state["engine"].layout(ids, *edges, radii, changed)
+    state["step"], state["form"] = step, form_key
+    return radii, pos
+
+
+def get_upload_job(uploaded_file):
+    """
+    Фонова обробка завантаженого файлу. Новий файл або інша вага матчів
+    скасовують попередню задачу (розібрана таблиця того самого файлу не губиться).
+    """
+    use_margin = st.session_state.get("use_margin", False)
+    key = (uploaded_file.file_id, use_margin)
+    job = st.session_state.get("upload_job")
+    if job is not None and st.session_state.upload_key == key:
+        return job
+
+    table = None
+    if job is not None:
+        job.cancel()
+        if st.session_state.upload_key[0] == key[0]:
+            table = job.table
+    job = UploadJob(uploaded_file.getvalue(), use_margin, table).start()
+    st.session_state.upload_job = job
+    st.session_state.upload_key = key
+    return job
+
+
+LEADERBOARD_PAGE = 100
+
+
+def render_leaderboard(standings):
+    """Таблиця лідерів посторінково: у DataFrame потрапляє лише поточна сторінка."""
+    st.markdown("#### 🏆 Leaderboard")
+    if not len(standings):
+        st.info("No data yet.")
+        return
+
+    pages = -(-len(standings) // LEADERBOARD_PAGE)
+    page = 1
+    if pages > 1:
+        c_page, c_find = st.columns(2)
+        page = c_page.number_input(f"Page (of {pages})", min_value=1, max_value=pages,
+                                   value=1, key="leaderboard_page")
+        team = c_find.text_input("Find team", key="leaderboard_find").strip()
+        if team:
+            try:
+                st.caption(f"**{team}**: #{standings.rank(team)} of {len(standings)}")
+            except KeyError:
+                st.caption(f"No team named **{team}**")
+
+    rows = standings.page((page - 1) * LEADERBOARD_PAGE, LEADERBOARD_PAGE)
+    df_res = pd.DataFrame(rows, columns=["Rank", "Team", "Score"]).set_index("Rank")
+
+    multiplier = 10000
+    df_res["Score"] = (df_res["Score"] * multiplier).astype(int)
+    max_score = standings.leader()[1] * multiplier
+
+    st.dataframe(
+        df_res,
+        use_container_width=True,
+        height=600,
+        column_config={
+            "Score": st.column_config.ProgressColumn(
+                "Dominance Points",
+                format="%d",
+                min_value=0,
+                max_value=max_score, 
+            ),
+            "Team": st.column_config.TextColumn("Team Name", width="medium")
+        }
+    )
 
-        dangling_sum = 0
-        for t in teams:
-            if t not in matches_dict or len(matches_dict.get(t, set())) == 0:
-                dangling_sum += scores[team_idx[t]]
 
-        new_scores += damping * dangling_sum / n
+def render_standings(scores, edges, matches_label, layout=None):
+    """Метрики, граф і таблиця лідерів для одного стану рейтингу."""
+    standings = StandingsIndex.from_dict(scores)
+    if layout is None:
+        attrs = VisualAttributes(standings.scores, WEB_STYLE, standings)
+        layout = (attrs.radii, attrs.positions)
+    radii, pos = layout
 
-        delta = np.sum(np.abs(new_scores - scores))
-        scores = new_scores
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Matches Played", matches_label)
+    m2.metric("Active Teams", len(scores))
+    leader = standings.leader()
+    m3.metric("Current Leader", leader[0] if leader else "N/A")
 
-        if delta < epsilon:
-            break
+    st.markdown("---")
 
-    scores = scores / scores.sum()
-    return {teams_list[i]: scores[i] for i in range(n)}
+    row_graph, row_table = st.columns([2, 1])
 
-@st.cache_data
-def get_layout(scores, radii):
-    sorted_teams = sorted(scores.keys(), key=lambda t: scores[t], reverse=True)
-    n = len(sorted_teams)
-    if n == 0: return {}
-    
-    max_r = max(radii.values()) if radii else 30
-    R = max(100, n * max_r * 0.7)
+    with row_graph:
+        st.markdown("#### 🕸️ Interaction Graph")
+        fig = create_stylish_graph(scores, edges, pos, radii, label_top_k,
+                                   max_nodes or None, max_edges or None)
+        st.plotly_chart(fig, use_container_width=True)
     
-    pos = {}
-    for i, team in enumerate(sorted_teams):
-        theta = 2 * math.pi * i / n - math.pi / 2
-        pos[team] = np.array([R * math.cos(theta), R * math.sin(theta)])
-        
-    return pos
+    with row_table:
+        render_leaderboard(standings)
+
+
+STAGE_LABELS = {
+    "parse": "Parsing CSV",
+    "rank": "Ranking teams",
+    "layout": "Laying out graph",
+    "replay": "Precomputing replay",
+}
+
+
+@st.fragment(run_every=0.5)
+def upload_progress(job):
+    """Хід фонової обробки і часткові результати, поки повтор ще не готовий."""
+    if job.error is not None or job.timeline is not None:
+        st.rerun()
+
+    done = STAGES.index(job.stage)
+    overall = (done + job.fraction) / (len(STAGES) - 1)
+    st.progress(min(overall, 1.0), text=f"{STAGE_LABELS.get(job.stage, job.stage)}…")
+    if job.layout is not None:
+        render_standings(job.scores, job.edges, f"{len(job.table)}", job.layout)
+    elif job.scores is not None:
+        render_leaderboard(StandingsIndex.from_dict(job.scores))
+
+
+def render_profile(profiler):
+    """Таймери й лічильники профайлера та експорт trace-event JSON."""
+    rows = profiler.summary()
+    if rows:
+        df_prof = pd.DataFrame(rows).set_index("name")
+        st.dataframe(df_prof.round(3), use_container_width=True)
+    else:
+        st.caption("Nothing recorded yet.")
+    for name, value in sorted({**profiler.counters, **profiler.gauges}.items()):
+        st.caption(f"`{name}`: {value:.4g}")
 
+    st.download_button("Download trace (JSON)", json.dumps(profiler.trace_events()),
+                       file_name="standings-trace.json", mime="application/json")
+    st.button("Reset", on_click=profiler.reset, key="profile_reset")
 
 
-def create_stylish_graph(scores, matches, pos, radii):
-    fig = go.Figure()
-    
-    edge_x, edge_y = [], []
-    for w, l in matches:
-        if w in pos and l in pos:
-            p1, p2 = pos[w], pos[l]
-            edge_x.extend([p1[0], p2[0], None])
-            edge_y.extend([p1[1], p2[1], None])
-            
-    fig.add_trace(go.Scatter(
-        x=edge_x, y=edge_y,
-        mode='lines',
-        line=dict(color='#444', width=1),
-        hoverinfo='none',
-        opacity=0.5
-    ))
-    
-    node_x, node_y, node_text, node_size, node_color = [], [], [], [], []
-    
-    for team, score in scores.items():
-        p = pos[team]
-        node_x.append(p[0])
-        node_y.append(p[1])
-        node_text.append(f"<b>{team}</b><br>Score: {score:.4f}")
-        node_size.append(radii[team] * 2.2)
-        node_color.append(score)
-
-    fig.add_trace(go.Scatter(
-        x=node_x, y=node_y,
-        mode='markers+text',
-        marker=dict(
-            size=node_size,
-            color=node_color,
-            colorscale='Viridis',
-            showscale=False,
-            line=dict(color='white', width=1.5)
-        ),
-        text=list(scores.keys()),
-        textposition="middle center",
-        textfont=dict(size=12, color='white', family="Arial"),
-        hovertext=node_text,
-        hoverinfo='text'
-    ))
-
-    fig.update_layout(
-        template="plotly_dark",
-        showlegend=False,
-        margin=dict(l=0, r=0, t=30, b=0),
-        xaxis=dict(showgrid=False, visible=False),
-        yaxis=dict(showgrid=False, visible=False),
-        height=650,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        dragmode='pan'
+def render_workspace(auto_table, auto_name):
+    """
+    Порівняння кількох турнірів: усі вони живуть у робочому просторі сесії
+    зі спільним реєстром команд, тож перемикання між ними нічого не перераховує.
+    """
+    st.markdown("### 🆚 Tournament Comparison")
+    files = st.file_uploader("Add tournaments", type=['csv'], accept_multiple_files=True,
+                             key="workspace_files")
+
+    workspace = st.session_state.setdefault("workspace", Workspace())
+    wanted = {f.name: f for f in files or []}
+    if auto_table is not None:
+        wanted.setdefault(auto_name, None)
+    for name in workspace.names:
+        if name not in wanted:
+            workspace.remove(name)
+    for name, f in wanted.items():
+        # Той самий вміст лишає готовий рейтинг, новий вміст під тим самим ім'ям — замінює
+        try:
+            if f is None:
+                workspace.add(name, table=auto_table)
+            else:
+                workspace.add(name, io.BytesIO(f.getvalue()))
+        except Exception as e:
+            st.error(f"Error reading {name}: {e}")
+
+    with st.spinner("Ranking tournaments..."):
+        workspace.rank_all()
+
+    if len(workspace) < 2:
+        st.info("Add at least two tournaments to compare.")
+        return
+
+    names = workspace.names
+    c1, c2 = st.columns(2)
+    first = c1.selectbox("Baseline", names, index=0)
+    second = c2.selectbox("Compare with", names, index=1)
+    if first == second:
+        st.info("Pick two different tournaments.")
+        return
+
+    df_cmp = workspace.compare(first, second)
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Teams in both", len(df_cmp))
+    if len(df_cmp):
+        riser = df_cmp.loc[df_cmp["delta"].idxmax()]
+        faller = df_cmp.loc[df_cmp["delta"].idxmin()]
+        m2.metric("Biggest riser", riser["team"], f"{int(riser['delta']):+d} places")
+        m3.metric("Biggest faller", faller["team"], f"{int(faller['delta']):+d} places")
+
+    st.dataframe(
+        df_cmp,
+        use_container_width=True,
+        height=500,
+        column_config={
+            f"rank_{first}": st.column_config.NumberColumn(f"Rank ({first})", format="%d"),
+            f"rank_{second}": st.column_config.NumberColumn(f"Rank ({second})", format="%d"),
+            "delta": st.column_config.NumberColumn("Δ places", format="%+d"),
+            f"score_{first}": st.column_config.NumberColumn(f"Score ({first})", format="%.4f"),
+            f"score_{second}": st.column_config.NumberColumn(f"Score ({second})", format="%.4f"),
+        }
     )
-    return fig
+
+    with st.expander(f"Rank matrix: teams in 2+ of {len(workspace)} tournaments"):
+        st.dataframe(workspace.rank_matrix(min_tournaments=2), use_container_width=True)
 
 
 def increment_idx():
@@ -176,17 +322,18 @@ def end_idx():
 # --- SIDEBAR & DATA LOADING LOGIC ---
 with st.sidebar:
     st.title("🏆 Setup")
+    view = st.radio("View", ["Replay", "Compare tournaments"], horizontal=True)
     
     
     target_filename = os.getenv("CSV_FILENAME")
     data_folder = "/app/data"
-    auto_df = None
+    auto_table = None
     
     if target_filename:
         file_path = os.path.join(data_folder, target_filename)
         if os.path.exists(file_path):
             try:
-                auto_df = pd.read_csv(file_path)
+                auto_table = load_cached(file_path)
 
             except Exception as e:
                 st.error(f"Error loading {target_filename}: {e}")
@@ -195,45 +342,108 @@ with st.sidebar:
     uploaded_file = st.file_uploader("Upload NEW Match CSV", type=['csv'])
     
 
-    if uploaded_file is None and auto_df is not None:
+    if uploaded_file is None and auto_table is not None:
          st.sidebar.info(f"📂 Using auto-loaded file: **{target_filename}**")
          st.sidebar.caption("Upload a new file above to override.")
     elif uploaded_file is not None:
          st.sidebar.success("Using uploaded file!")
 
+    live_mode = False
+    if uploaded_file is None and target_filename and os.path.exists(file_path):
+        live_mode = st.checkbox("🔴 Live mode (follow file)", value=False,
+                                help="Pick up matches appended to the CSV without reloading")
+
     st.markdown("---")
+    with st.expander("🕸️ Graph detail"):
+        graph_layout = st.radio("Layout", ["Force-directed", "Ring"], horizontal=True,
+                                help="Force-directed keeps teams in place between replay steps")
+        label_top_k = st.slider("Labels for top-k teams", 0, 200, 20)
+        max_nodes = st.number_input("Max nodes (0 = all)", min_value=0, value=1000, step=100)
+        max_edges = st.number_input("Max edges (0 = all)", min_value=0, value=5000, step=500)
+
+    with st.expander("🛠️ Profiler"):
+        profiling_on = st.checkbox("Enable profiling", key="profiling",
+                                   help="Time parsing, ranking, layout and figure building")
+        profile_panel = st.container()
+
     st.markdown("**Controls:** Use buttons to replay.")
     st.info("Built with Streamlit & Plotly")
 
 
-df = None
+# Профайлер один на процес: поки ввімкнений, пише роботу всіх сесій і фонових потоків
+if profiling_on:
+    enable(st.session_state.setdefault("profiler", Profiler()))
+elif active() is not None and active() is st.session_state.get("profiler"):
+    disable()
 
+table = None
 
+
+job = None
 if uploaded_file is not None:
-    try:
-        df = pd.read_csv(uploaded_file)
-    except Exception as e:
-        st.error(f"Error reading uploaded CSV: {e}")
-elif auto_df is not None:
-    df = auto_df
+    job = get_upload_job(uploaded_file)
+    table = job.table
+    if job.error is not None:
+        st.error(f"Error reading uploaded CSV: {job.error}")
+elif auto_table is not None:
+    table = auto_table
+if uploaded_file is None and "upload_job" in st.session_state:
+    st.session_state.pop("upload_job").cancel()
+
+use_margin = False
+if table is not None and table.weights is not None:
+    use_margin = st.sidebar.checkbox("Weight matches by margin column", value=False,
+                                     key="use_margin")
+
+form_window = form_half_life = None
+if table is not None and not live_mode and view == "Replay":
+    with st.sidebar.expander("📈 Form"):
+        if st.checkbox("Rank on recent form", key="form_mode",
+                       help="Rank only the latest matches and/or let old results fade"):
+            form_window = st.number_input("Last N matches (0 = all)", min_value=0,
+                                          value=min(100, len(table)), step=10) or None
+            form_half_life = st.number_input("Half-life in matches (0 = no decay)",
+                                             min_value=0.0, value=0.0, step=5.0) or None
 
 # main
 col_title, col_logo = st.columns([3, 1])
 with col_title:
     st.title("Tournament PageRank Analytics")
 
-if df is not None:
+if view == "Compare tournaments":
+    render_workspace(auto_table, target_filename)
 
-    if len(df.columns) >= 2:
-        raw_matches = list(zip(df.iloc[:, 0].astype(str), df.iloc[:, 1].astype(str)))
-    else:
-        st.error("CSV must have at least 2 columns (Winner, Loser)")
+elif live_mode:
+    live = get_live(file_path, use_margin)
+    st.markdown("### 🔴 Live Standings")
+
+    @st.fragment(run_every=1.0)
+    def live_view():
+        version, teams, live_scores, (w, l, weights) = live.snapshot()
+        if live.error:
+            st.error(f"Error reading {target_filename}: {live.error}")
+        if live.last_latency is not None:
+            st.caption(f"Update #{version} · {live.num_matches} matches · "
+                       f"file-to-standings latency {live.last_latency * 1000:.0f} ms")
+        names = np.array(teams, dtype=object)
+        e_w, e_l, counts = aggregate_edges(w, l, len(teams), weights)
+        render_standings(dict(zip(teams, live_scores.tolist())),
+                         (names[e_w], names[e_l], counts), f"{live.num_matches}")
+
+    live_view()
+
+elif job is not None and job.error is None and job.timeline is None:
+    upload_progress(job)
+
+elif table is not None and (job is None or job.error is None):
+
+    total_matches = len(table)
+    if total_matches == 0:
+        st.error("CSV has no matches (Winner, Loser)")
         st.stop()
-    
-    total_matches = len(raw_matches)
-    
 
-    data_hash = hash(tuple(raw_matches))
+
+    data_hash = table.fingerprint()
     if 'last_hash' not in st.session_state or st.session_state.last_hash != data_hash:
         st.session_state.last_hash = data_hash
         st.session_state.idx = 1 
@@ -252,71 +462,39 @@ if df is not None:
 
 
     current_step = st.session_state.idx
-    current_matches = raw_matches[:current_step]
-    
-    teams = set()
-    for w, l in current_matches:
-        teams.add(w); teams.add(l)
-    
-    scores = calculate_pagerank(current_matches, tuple(sorted(list(teams))))
-    
-
-    vals = list(scores.values())
-    radii = {}
-    if vals:
-        mn, mx = min(vals), max(vals)
-        for t, s in scores.items():
-            norm = (s - mn)/(mx - mn) if mx > mn else 0.5
-            radii[t] = 15 + math.sqrt(norm) * 35
-            
-    pos = get_layout(scores, radii)
-
+    names = np.array(table.teams, dtype=object)
+
+    if form_window or form_half_life:
+        form = get_form(data_hash, table, form_window, form_half_life, use_margin)
+        form.advance(current_step)
+        scores = form.scores_dict()
+        ids = np.flatnonzero(form.active)
+        e_w, e_l, counts = form.edges()
+        st.caption(f"Form over matches {form.start + 1}–{current_step}"
+                   + (f", half-life {form_half_life:g} matches" if form_half_life else ""))
+    else:
+        if job is not None:
+            timeline = job.timeline
+        else:
+            timeline = get_timeline(data_hash, table, use_margin)
+        if not timeline.ready.is_set():
+            st.caption(f"Precomputing replay: {timeline.progress} / {total_matches} steps")
 
-    m1, m2, m3 = st.columns(3)
-    m1.metric("Matches Played", f"{current_step} / {total_matches}")
-    m2.metric("Active Teams", len(teams))
-    top_team = max(scores, key=scores.get) if scores else "N/A"
-    m3.metric("Current Leader", top_team)
+        scores = timeline.scores_dict(current_step)
+        ids = np.arange(len(scores))
 
-    st.markdown("---")
-    
-    row_graph, row_table = st.columns([2, 1])
-    
-    with row_graph:
-        st.markdown("#### 🕸️ Interaction Graph")
-        fig = create_stylish_graph(scores, current_matches, pos, radii)
-        st.plotly_chart(fig, use_container_width=True)
-        
-    with row_table:
-        st.markdown("#### 🏆 Leaderboard")
-        if scores:
-            df_res = pd.DataFrame(list(scores.items()), columns=["Team", "Score"])
-            
-            multiplier = 10000
-            df_res["Score"] = (df_res["Score"] * multiplier).astype(int)
-            
-            df_res = df_res.sort_values(by="Score", ascending=False).reset_index(drop=True)
-            df_res.index += 1
-            
-            max_score = max(vals) * multiplier if vals else multiplier
-            
-            st.dataframe(
-                df_res,
-                use_container_width=True,
-                height=600,
-                column_config={
-                    "Score": st.column_config.ProgressColumn(
-                        "Dominance Points",
-                        format="%d",
-                        min_value=0,
-                        max_value=max_score, 
-                    ),
-                    "Team": st.column_config.TextColumn("Team Name", width="medium")
-                }
-            )
-        else:
-            st.info("No data yet.")
+        e_w, e_l, counts = timeline.edges_at(current_step)
+    edges = (names[e_w], names[e_l], counts)
+    layout = None
+    if graph_layout == "Force-directed":
+        layout = get_force_layout(data_hash, table, ids, (e_w, e_l, counts), scores,
+                                  current_step, (form_window, form_half_life))
+    render_standings(scores, edges, f"{current_step} / {total_matches}", layout)
 
 else:
     st.markdown("<br><br>", unsafe_allow_html=True)
     st.info("👆 Upload CSV to start (or run via start.py).")
+
+if profiling_on:
+    with profile_panel:
+        render_profile(st.session_state.profiler)